@@ -0,0 +1,303 @@
+import numpy as np
+
+from ShallowOceanExpedition.rules import rules_from
+from ShallowOceanExpedition.utils.exceptions import Cheating, RuleViolation
+
+# position used for players that can't block a move (the current player and players at home)
+NOT_ON_BOARD = -1000
+
+
+class BatchBoard:
+    """
+    Plays many independent games in lockstep with the state of every board held in NumPy arrays.
+
+    Each step advances the current player of every board by one turn under the same rules as Board. Tiles are
+    stored by their flattened level (the sum of the levels in a stack) with 0 for a blank tile, position 0 is
+    always home. Strategies must provide batch_decide_direction, batch_tile_collect and batch_tile_drop, see
+    BatchDefaultStrategy. Rules are given as for Board.
+    """
+
+    def __init__(self, strategies, n_boards, rules=None, seed=None, **rule_params):
+        self.rules = rules = rules_from(rules, **rule_params)
+        if len(strategies) < rules.min_players:
+            raise ValueError(f'Must supply at least {rules.min_players} strategies')
+        if len(strategies) > rules.max_players:
+            raise ValueError(f'Must supply at most {rules.max_players} strategies')
+        for strategy in strategies:
+            if not hasattr(strategy, 'batch_decide_direction'):
+                raise TypeError(f'Strategy for {strategy.player_name} does not support batch play.')
+        self.strategies = strategies
+        self.n_boards = n_boards
+        self.n_players = len(strategies)
+        self.original_oxygen = rules.oxygen
+        self.random_generator = np.random.default_rng(seed)
+        self._dice_highs = np.array(rules.dice)[:, np.newaxis] + 1
+
+        levels = np.array([sum(level) for level in rules.layout[1:]], dtype=np.int16)
+        max_tiles = len(levels) + 1
+        self.tile_levels = np.zeros((n_boards, max_tiles), dtype=np.int16)
+        self.tile_levels[:, 1:] = levels
+        self.tile_values = np.zeros((n_boards, max_tiles), dtype=np.int16)
+        value_lows, value_highs = np.array(rules.value_lows), np.array(rules.value_highs)
+        offsets = self.random_generator.integers(0, value_highs - value_lows, size=(n_boards, len(levels)))
+        self.tile_values[:, 1:] = value_lows + offsets
+        self.n_tiles = np.full(n_boards, max_tiles, dtype=np.int16)
+
+        shape = (n_boards, self.n_players)
+        self.positions = np.zeros(shape, dtype=np.int16)
+        self.directions = np.ones(shape, dtype=np.int16)
+        self.n_turns = np.zeros(shape, dtype=np.int16)
+        self.back_home = np.zeros(shape, dtype=bool)
+        self.banks = np.zeros(shape, dtype=np.int32)
+        self.held_levels = np.zeros(shape + (max_tiles - 1,), dtype=np.int16)
+        self.held_values = np.zeros(shape + (max_tiles - 1,), dtype=np.int16)
+        self.held_counts = np.zeros(shape, dtype=np.int16)
+        self.deaths = np.zeros(shape + (0,), dtype=bool)
+
+        self.oxygen = np.full(n_boards, rules.oxygen, dtype=np.int32)
+        self.round_numbers = np.zeros(n_boards, dtype=np.int16)
+        self.current_players = np.zeros(n_boards, dtype=np.int16)
+
+    def play_rounds(self, n):
+        target = self.round_numbers + n
+        self.deaths = np.concatenate([self.deaths, np.zeros(self.deaths.shape[:2] + (n,), dtype=bool)], axis=2)
+        playing = np.flatnonzero(self.round_numbers < target)
+        while len(playing):
+            self._step(playing)
+            playing = playing[self.round_numbers[playing] < target[playing]]
+
+    def _step(self, rows):
+        out_of_oxygen = self.oxygen[rows] <= 0
+        self._end_rounds(rows[out_of_oxygen])
+        rows = rows[~out_of_oxygen]
+
+        seats = self.current_players[rows]
+        playing = ~self.back_home[rows, seats]
+        self._take_turns(rows[playing], seats[playing])
+
+        all_home = self.back_home[rows].all(axis=1)
+        self._end_rounds(rows[all_home])
+        rows = rows[~all_home]
+        self.current_players[rows] = (self.current_players[rows] + 1) % self.n_players
+
+    def _take_turns(self, rows, seats):
+        self.oxygen[rows] -= self.held_counts[rows, seats]
+        self._apply_direction_strategies(rows, seats)
+        new_positions = self._advance_players(rows, seats)
+
+        landed_home = new_positions == 0
+        self._reached_home(rows[landed_home], seats[landed_home])
+        rows, seats, new_positions = rows[~landed_home], seats[~landed_home], new_positions[~landed_home]
+
+        on_blank = self.tile_levels[rows, new_positions] == 0
+        self._apply_drop_strategies(rows[on_blank], seats[on_blank], new_positions[on_blank])
+        self._apply_collect_strategies(rows[~on_blank], seats[~on_blank], new_positions[~on_blank])
+
+    def _apply_direction_strategies(self, rows, seats):
+        change = self._ask_strategies('batch_decide_direction', rows, seats)
+        if (change & (self.directions[rows, seats] == -1)).any():
+            raise Cheating('You cant turn around again you cheating bugger!')
+        self.directions[rows[change], seats[change]] = -1
+
+    def _apply_collect_strategies(self, rows, seats, positions):
+        pickup = self._ask_strategies('batch_tile_collect', rows, seats)
+        rows, seats, positions = rows[pickup], seats[pickup], positions[pickup]
+        slots = self.held_counts[rows, seats]
+        self.held_levels[rows, seats, slots] = self.tile_levels[rows, positions]
+        self.held_values[rows, seats, slots] = self.tile_values[rows, positions]
+        self.held_counts[rows, seats] += 1
+        self.tile_levels[rows, positions] = 0
+        self.tile_values[rows, positions] = 0
+
+    def _apply_drop_strategies(self, rows, seats, positions):
+        drop = np.zeros(len(rows), dtype=bool)
+        slots = np.zeros(len(rows), dtype=np.intp)
+        for seat, strategy in enumerate(self.strategies):
+            mask = seats == seat
+            if mask.any():
+                drop[mask], slots[mask] = strategy.batch_tile_drop(BatchTurnState(self, rows[mask], seat))
+        rows, seats, positions, slots = rows[drop], seats[drop], positions[drop], slots[drop]
+        counts = self.held_counts[rows, seats]
+        if (slots >= counts).any():
+            raise RuleViolation('No tiles to drop.')
+        self.tile_levels[rows, positions] = self.held_levels[rows, seats, slots]
+        self.tile_values[rows, positions] = self.held_values[rows, seats, slots]
+
+        # shuffle the remaining tiles down to keep them in the order they were collected
+        max_held = self.held_levels.shape[2]
+        held_slots = np.arange(max_held)
+        source = np.minimum(held_slots + (held_slots >= slots[:, None]), max_held - 1)
+        last = (np.arange(len(rows)), counts - 1)
+        for held in (self.held_levels, self.held_values):
+            remaining = np.take_along_axis(held[rows, seats], source, axis=1)
+            remaining[last] = 0
+            held[rows, seats] = remaining
+        self.held_counts[rows, seats] -= 1
+
+    def _ask_strategies(self, decision, rows, seats):
+        answers = np.zeros(len(rows), dtype=bool)
+        for seat, strategy in enumerate(self.strategies):
+            mask = seats == seat
+            if mask.any():
+                answers[mask] = getattr(strategy, decision)(BatchTurnState(self, rows[mask], seat))
+        return answers
+
+    def _advance_players(self, rows, seats):
+        new_positions = self._calculate_new_positions(rows, seats)
+        self.positions[rows, seats] = new_positions
+        self.n_turns[rows, seats] += 1
+        return new_positions
+
+    def _calculate_new_positions(self, rows, seats):
+        dice_highs = self._dice_highs
+        rolls = self.random_generator.integers(1, dice_highs, size=(len(dice_highs), len(rows))).sum(axis=0)
+        moves = rolls - self.held_counts[rows, seats]
+        distance = self.directions[rows, seats] * np.maximum(moves, 0)
+
+        positions = self.positions[rows]
+        current = positions[np.arange(len(rows)), seats]
+        others = np.where(positions > 0, positions, NOT_ON_BOARD)
+        others[np.arange(len(rows)), seats] = NOT_ON_BOARD
+        others.sort(axis=1)
+
+        # moving forwards, hop over players in the way then limit to the end of the tiles, stepping back from
+        # any players already sat at the end. Each loop is a no-op for players moving the other way.
+        for other in others.T:
+            distance += (current <= other) & (other <= current + distance)
+        end = self.n_tiles[rows] - 1
+        distance = np.minimum(end - current, distance)
+        for other in others.T[::-1]:
+            blocked = (other == end) & (other <= current + distance)
+            distance = np.where(blocked, np.maximum(distance - 1, 0), distance)
+            end -= blocked
+
+        # moving backwards, hop over players in the way
+        for other in others.T[::-1]:
+            distance -= (current >= other) & (other >= current + distance)
+
+        return np.maximum(0, current + distance)
+
+    def _reached_home(self, rows, seats):
+        self.back_home[rows, seats] = True
+        self.banks[rows, seats] += self.held_values[rows, seats].sum(axis=1)
+        self._clear_players(rows, seats)
+
+    def _clear_players(self, rows, seats):
+        self.positions[rows, seats] = 0
+        self.directions[rows, seats] = 1
+        self.n_turns[rows, seats] = 0
+        self.held_counts[rows, seats] = 0
+        self.held_levels[rows, seats] = 0
+        self.held_values[rows, seats] = 0
+
+    def _end_rounds(self, rows):
+        if not len(rows):
+            return
+        stack_levels, stack_values, n_stacks = self._kill_players_gather_tiles(rows)
+        self._reform_tiles(rows, stack_levels, stack_values, n_stacks)
+        self.round_numbers[rows] += 1
+        self.oxygen[rows] = self.original_oxygen
+        self.back_home[rows] = False
+
+    def _kill_players_gather_tiles(self, rows):
+        killed = ~self.back_home[rows]
+        self.deaths[rows, :, self.round_numbers[rows]] = killed
+
+        has_stack = killed & (self.held_counts[rows] > 0)
+        order = np.argsort(np.where(has_stack, self.positions[rows], np.iinfo(np.int16).max), axis=1, kind='stable')
+        stack_levels = np.take_along_axis(self.held_levels[rows].sum(axis=2), order, axis=1)
+        stack_values = np.take_along_axis(self.held_values[rows].sum(axis=2), order, axis=1)
+
+        all_seats = np.arange(self.n_players)
+        self._clear_players(np.repeat(rows, self.n_players), np.tile(all_seats, len(rows)))
+        return stack_levels, stack_values, has_stack.sum(axis=1)
+
+    def _reform_tiles(self, rows, stack_levels, stack_values, n_stacks):
+        levels = self.tile_levels[rows]
+        keep = levels > 0
+        keep[:, 0] = True
+        order = np.argsort(~keep, axis=1, kind='stable')
+        n_kept = keep.sum(axis=1)
+        unused = np.arange(levels.shape[1]) >= n_kept[:, None]
+        for tiles in (self.tile_levels, self.tile_values):
+            reformed = np.take_along_axis(tiles[rows], order, axis=1)
+            reformed[unused] = 0
+            tiles[rows] = reformed
+
+        for stack in range(self.n_players):
+            has_stack = stack < n_stacks
+            stack_rows, stack_positions = rows[has_stack], n_kept[has_stack] + stack
+            self.tile_levels[stack_rows, stack_positions] = stack_levels[has_stack, stack]
+            self.tile_values[stack_rows, stack_positions] = stack_values[has_stack, stack]
+        self.n_tiles[rows] = n_kept + n_stacks
+
+    def get_ranks(self):
+        """
+        Rank of each player on each board, matching Board.get_stats with 0 for players without a score.
+        """
+        ranks = 1 + (self.banks[:, None, :] > self.banks[:, :, None]).sum(axis=2)
+        return np.where(self.banks > 0, ranks, 0)
+
+    def get_stats(self):
+        ranks = self.get_ranks()
+        stats = []
+        for board in range(self.n_boards):
+            stats.append({
+                strategy.player_name: {
+                    'score': int(self.banks[board, seat]),
+                    'rank': int(ranks[board, seat]) or None,
+                    'deaths': self.deaths[board, seat].tolist()
+                } for seat, strategy in enumerate(self.strategies)
+            })
+        return stats
+
+
+class BatchTurnState:
+    """
+    The current player's view of a set of boards, passed to batch strategies. Each property is an array with one
+    entry per board.
+    """
+
+    def __init__(self, board, rows, seat):
+        self._board = board
+        self._rows = rows
+        self._seat = seat
+
+    @property
+    def round_number(self):
+        return self._board.round_numbers[self._rows]
+
+    @property
+    def oxygen(self):
+        return self._board.oxygen[self._rows]
+
+    @property
+    def position(self):
+        return self._board.positions[self._rows, self._seat]
+
+    @property
+    def bank(self):
+        return self._board.banks[self._rows, self._seat]
+
+    @property
+    def changed_direction(self):
+        return self._board.directions[self._rows, self._seat] < 0
+
+    @property
+    def turn_number(self):
+        return self._board.n_turns[self._rows, self._seat]
+
+    @property
+    def tile_count(self):
+        return self._board.held_counts[self._rows, self._seat]
+
+    @property
+    def tile_levels(self):
+        """
+        Flattened levels of the tiles held, in the order collected, padded with 0.
+        """
+        return self._board.held_levels[self._rows, self._seat]
+
+    @property
+    def board_tile_levels(self):
+        return self._board.tile_levels[self._rows]
@@ -1,39 +1,191 @@
-from itertools import cycle
+from types import MappingProxyType
 
 from ShallowOceanExpedition.components.player import Player
-from ShallowOceanExpedition.components.tiles import Home, TileStack, Tile, BlankTile
+from ShallowOceanExpedition.components.tiles import HOME, TileTable, stack_tiles
+from ShallowOceanExpedition.components.views import BoardView, SequenceView, state_key
+from ShallowOceanExpedition.rules import rules_from
 from ShallowOceanExpedition.utils.exceptions import RoundOver, Cheating, RuleViolation
 from ShallowOceanExpedition.utils.logging import logger, GAME, TURN, ROUND
+from ShallowOceanExpedition.utils.random_source import RandomSource
 
 
 class Board:
-    def __init__(self, strategies, oxygen=25, n_level_1=5, n_level_2=5, n_level_3=5, n_level_4=5):
-        if len(strategies) < 2:
-            raise ValueError('Must supply at least two strategies')
-        self.players = [Player(strategy) for strategy in strategies]
-        self.tiles = \
-            [Home()] + \
-            [Tile(1)] * n_level_1 + \
-            [Tile(2)] * n_level_2 + \
-            [Tile(3)] * n_level_3 + \
-            [Tile(4)] * n_level_4
+    def __init__(self, strategies, rules=None, seed=None, random_source=None, timings=None, **rule_params):
+        """
+        Played under rules, a RuleSet, or one made from rule_params (e.g. oxygen=20) if not given.
+        """
+        self.rules = rules = rules_from(rules, **rule_params)
+        if len(strategies) < rules.min_players:
+            raise ValueError(f'Must supply at least {rules.min_players} strategies')
+        if len(strategies) > rules.max_players:
+            raise ValueError(f'Must supply at most {rules.max_players} strategies')
+        self.random_source = RandomSource(seed) if random_source is None else random_source
+        self.occupancy = {}
+        if timings is not None:
+            # opt in, so untimed games pay nothing for it
+            strategies = [timings.time_strategy(strategy) for strategy in strategies]
+            self._take_turn = timings.time_turn(self._take_turn)
+        self.players = [Player(strategy, self.random_source, self.occupancy, rules.dice) for strategy in strategies]
+        self.tiles = TileTable.new(rules, self.random_source)
         self.round_number = 0
-        self.original_oxygen = oxygen
-        self.oxygen = oxygen
-        self.player_cycle = cycle(self.players)
-        self.current_player = next(self.player_cycle)
-        logger.log(GAME, f'Welcome players {", ".join([player.name for player in self.players])} for round '
-                         f'{self.round_number}!!')
+        self.original_oxygen = rules.oxygen
+        self.oxygen = rules.oxygen
+        self._seat = 0
+        self.current_player = self.players[0]
+        self._reset_ring()
+        self._deciding = None  # the callback of the decision being made, if any
+        self.rollouts = Rollouts(self)
+        self._views = self._create_views()
+        # strategies that keep state per game can be told when one starts
+        self._new_game_hooks = [strategy.new_game for strategy in strategies if hasattr(strategy, 'new_game')]
+        self._start_game()
+
+    def reset(self, random_source=None):
+        """
+        Set the board up for a new game with the same strategies in the same seats, under the same rules, reusing
+        its players, tiles and views rather than making new ones. Draws from random_source if given, playing exactly
+        as a new board given the same random source would.
+        """
+        if random_source is not None:
+            self.random_source = random_source
+        self.occupancy.clear()
+        for player in self.players:
+            player.reset(self.random_source)
+        self.tiles.reset(self.rules, self.random_source)
+        self.round_number = 0
+        self.oxygen = self.original_oxygen
+        self._seat = 0
+        self.current_player = self.players[0]
+        self._reset_ring()
+        self._start_game()
+
+    def _start_game(self):
+        for new_game in self._new_game_hooks:
+            new_game()
+        if logger.isEnabledFor(GAME):
+            logger.log(GAME, 'Welcome players %s for round %s!!', ", ".join([player.name for player in self.players]),
+                       self.round_number)
+            for player in self.players:
+                logger.log(GAME, player)
+
+    @property
+    def tiles(self):
+        return self._tiles
+
+    @tiles.setter
+    def tiles(self, tiles):
+        self._tiles = tiles
+        self.tile_levels = SequenceView(tiles.levels)
+
+    def _create_views(self):
+        board_view = BoardView(self)
+        views = {}
+        for player in self.players:
+            others = MappingProxyType({other.name: other.view for other in self.players if other is not player})
+            views[player] = player.view, board_view, others
+        return views
+
+    def _reset_ring(self):
+        """
+        Link the seats of the players still out this round into a ring in turn order, players are unlinked as they
+        get home so turns only go to players still out.
+        """
+        seats = [seat for seat, player in enumerate(self.players) if not player.back_home]
+        n_players = len(self.players)
+        self._next_seats = [(seat + 1) % n_players for seat in range(n_players)]
+        self._previous_seats = [(seat - 1) % n_players for seat in range(n_players)]
+        for previous_seat, seat in zip(seats, seats[1:] + seats[:1]):
+            self._next_seats[previous_seat] = seat
+            self._previous_seats[seat] = previous_seat
+        self._n_out = len(seats)
+
+    def _leave_ring(self):
+        seat = self._seat
+        self._next_seats[self._previous_seats[seat]] = self._next_seats[seat]
+        self._previous_seats[self._next_seats[seat]] = self._previous_seats[seat]
+        self._n_out -= 1
+
+    def snapshot(self):
+        """
+        A copy of everything that changes during a game: the tiles, each player's position, direction, tiles, bank
+        and deaths, the oxygen, whose turn it is and the state of the random source, with the rules and number of
+        players. Restoring it to this board, or any other with as many players under the same rules, carries on the
+        game from the same point.
+
+        Play out futures on a board of cheap strategies by restoring a snapshot of the real game to it and calling
+        step or rollout, restoring again for each future. Strategies can do this through board.rollouts.
+        """
+        return (self.rules, len(self.players), self.round_number, self.oxygen, self._seat, tuple(self._next_seats),
+                tuple(self._previous_seats), self._n_out, tuple(self.tiles.levels), tuple(self.tiles.values),
+                tuple(player.snapshot() for player in self.players), self.random_source.snapshot())
+
+    def restore(self, snapshot, random_source=None):
+        """
+        Go back to a snapshot, in time proportional to its size. Given random_source, the game carries on drawing
+        from it rather than from the random source as it was, e.g. to play out a different future each time.
+        """
+        (rules, n_players, round_number, oxygen, seat, next_seats, previous_seats, n_out, levels, values,
+         player_snapshots, random_state) = snapshot
+        if n_players != len(self.players):
+            raise ValueError(f'Snapshot of a board of {n_players} players, not {len(self.players)}.')
+        if rules is not self.rules and rules != self.rules:
+            raise ValueError('Snapshot of a board under other rules.')
+        self.round_number, self.oxygen, self._seat, self._n_out = round_number, oxygen, seat, n_out
+        self._next_seats = list(next_seats)
+        self._previous_seats = list(previous_seats)
+        self.tiles.levels[:] = levels
+        self.tiles.values[:] = values
+        self.occupancy.clear()
+        for player, player_snapshot in zip(self.players, player_snapshots):
+            player.restore(player_snapshot)
+        self.current_player = self.players[self._seat]
+        if random_source is None:
+            self.random_source.restore(random_state)
+        else:
+            self.random_source = random_source
+            for player in self.players:
+                player.random_source = random_source
+
+    def redraw_tile_values(self):
+        """
+        Draw the values of the tiles on the board and held by the players again from the random source, as values
+        of tiles of their levels are drawn, stacks getting one value per tile stacked.
+        """
+        value_ranges = self.rules.value_ranges
+        tile_levels = [level for level in self.tiles.levels if type(level) is tuple]
+        tile_levels += [tile.level for player in self.players for tile in player.tiles]
+        lows = [value_ranges[level].start for levels in tile_levels for level in levels]
+        highs = [value_ranges[level].stop for levels in tile_levels for level in levels]
+        draws = iter(self.random_source.integers(lows, highs))
+        values = iter([sum(next(draws) for _ in levels) for levels in tile_levels])
+        table_values = self.tiles.values
+        for position, level in enumerate(self.tiles.levels):
+            if type(level) is tuple:
+                table_values[position] = next(values)
         for player in self.players:
-            logger.log(GAME, player)
+            player.set_tile_values([next(values) for _ in range(player.count_tiles())])
+
+    def step(self):
+        """
+        Play the current player's turn, ending the round if it's over. Returns True if the round ended.
+        """
+        if self._take_turn():
+            self._end_round()
+            return True
+        return False
+
+    def rollout(self, rounds_per_game=3):
+        """
+        Play the game out from wherever it has got to, to the end of round rounds_per_game, returning its stats.
+        """
+        for _ in range(self.round_number, rounds_per_game):
+            self.play_round()
+        return self.get_stats()
 
     def play_round(self):
-        while True:
-            try:
-                self._take_turn()
-            except RoundOver:
-                self._end_round()
-                break
+        while not self._take_turn():
+            pass
+        self._end_round()
 
     def _end_round(self):
         self.round_number += 1
@@ -41,59 +193,75 @@ class Board:
         ordered_stacks = self._kill_players_gather_tiles()
         self._reform_tiles(ordered_stacks)
         self._order_players()
-        logger.log(ROUND, f'Round {self.round_number} over, player summaries:')
+        logger.log(ROUND, 'Round %s over, player summaries:', self.round_number)
         for player in self.players:
             logger.log(ROUND, player)
             player.back_home = False
+        self._reset_ring()
 
     def _take_turn(self):
+        """
+        Play the current player's turn, returns True if the round is over.
+        """
         if self.oxygen <= 0:
             logger.log(ROUND, '\nOxygen depleted!')
-            raise RoundOver()
-        elif not self.current_player.back_home:
-            logger.log(TURN, f"\nIt's {self.current_player.name}'s go!")
-            self._reduce_ox_by(self.current_player.count_tiles())
+            return True
+        logger.log(TURN, "\nIt's %s's go!", self.current_player.name)
+        self._reduce_ox_by(self.current_player.count_tiles())
+        return self._finish_turn('decide_direction')
+
+    def _finish_turn(self, deciding):
+        """
+        Play the current player's turn on from the decision deciding, the name of its callback, returns True if the
+        round is over.
+        """
+        if deciding == 'decide_direction':
             self._apply_current_player_direction_strategy()
             landed_on = self._advance_current_player()
-            if isinstance(landed_on, Home):
+            if landed_on == HOME:
                 self.current_player.reached_home()
+                self._leave_ring()
+            elif landed_on is None:
+                self._apply_current_player_drop_strategy()
             else:
-                if landed_on.level is None:
-                    self._apply_current_player_drop_strategy()
-                else:
-                    self._apply_current_player_collect_strategy()
-            logger.log(TURN, self.current_player)
+                self._apply_current_player_collect_strategy()
+        elif deciding == 'tile_drop':
+            self._apply_current_player_drop_strategy()
+        else:
+            self._apply_current_player_collect_strategy()
+        self._deciding = None
+        logger.log(TURN, self.current_player)
         if not self._has_players():
             logger.log(ROUND, '\nAll players made it home!!')
-            raise RoundOver()
+            return True
         self._next_player()
+        return False
 
     def _has_players(self):
-        return bool(sum(not player.back_home for player in self.players))
-
-    def _summarise_tile_levels(self):
-        return [tile.level for tile in self.tiles]
+        return self._n_out > 0
 
     def _apply_current_player_collect_strategy(self):
+        self._deciding = 'tile_collect'
         do_pickup = self.current_player.strategy.tile_collect(*self._summarise_game_states())
         if do_pickup:
-            landed_on = self.tiles[self.current_player.position]
-            if isinstance(landed_on, Home) or isinstance(landed_on, BlankTile):
+            position = self.current_player.position
+            if self.tiles.levels[position] == HOME or self.tiles.levels[position] is None:
                 raise Cheating('Cannot pick up home tile or blank tile.')
+            landed_on = self.tiles.take(position)
             self.current_player.collect_tile(landed_on)
-            self.tiles[self.current_player.position] = BlankTile()
-            logger.log(TURN, f'- {self.current_player.name} picked up a level {landed_on.level} tile!!')
+            logger.log(TURN, '- %s picked up a level %s tile!!', self.current_player.name, landed_on.level)
 
     def _apply_current_player_drop_strategy(self):
+        self._deciding = 'tile_drop'
         do_drop, tile_level = self.current_player.strategy.tile_drop(*self._summarise_game_states())
         if do_drop:
-            landed_on = self.tiles[self.current_player.position]
-            if isinstance(landed_on, Home) or isinstance(landed_on, Tile):
+            if self.tiles.levels[self.current_player.position] is not None:
                 raise Cheating('Cannot drop on non-blank tile.')
             dropped = self.current_player.drop_tile(tile_level)
-            self.tiles[self.current_player.position] = dropped
+            self.tiles.put(self.current_player.position, dropped)
 
     def _apply_current_player_direction_strategy(self):
+        self._deciding = 'decide_direction'
         do_change = self.current_player.strategy.decide_direction(*self._summarise_game_states())
         if do_change:
             self.current_player.change_direction()
@@ -102,52 +270,44 @@ class Board:
         new_position = self._calculate_new_position()
         self.current_player.position = new_position
         self.current_player.n_turn += 1
-        return self.tiles[new_position]
+        return self.tiles.levels[new_position]
 
     def _calculate_new_position(self):
-        distance = self.current_player.direction * self.current_player.roll()
-        other_positions = [pos for pos in self._get_other_player_positions() if pos > 0]
-        curr_position = self.current_player.position
-        if self.current_player.direction == 1:
-            for other_player_pos in sorted(other_positions):
-                if curr_position <= other_player_pos <= curr_position + distance:
-                    distance += 1
-
-            # limit to end of tiles
-            end_position = len(self.tiles) - 1
-            distance = min(end_position - curr_position, distance)
-
-            # account for if distance greater than number of tiles and player already at end
-            for other_player_pos in sorted(other_positions, reverse=True):
-                if other_player_pos == end_position:
-                    if other_player_pos <= curr_position + distance:
-                        distance = max(distance - 1, 0)
-                        end_position -= 1
+        player = self.current_player
+        direction = player.direction
+        moves = player.roll()
+        occupancy = self.occupancy
+        curr_position = new_pos = player.position
+        # occupied tiles are hopped over and don't count as a move, tiles past either end are never occupied
+        while moves:
+            new_pos += direction
+            if new_pos not in occupancy:
+                moves -= 1
+        if direction == 1:
+            # limit to end of tiles, stepping back past any players already at the end
+            new_pos = min(len(self.tiles) - 1, new_pos)
+            while new_pos > curr_position and new_pos in occupancy:
+                new_pos -= 1
         else:
-            for other_player_pos in sorted(other_positions, reverse=True):
-                if curr_position >= other_player_pos >= curr_position + distance:
-                    distance -= 1
-
-        new_pos = max(0, curr_position + distance)
+            new_pos = max(0, new_pos)
 
-        if new_pos in other_positions:
+        if occupancy.get(new_pos, player) is not player:
             raise RuleViolation('Cannot move onto another player.')
         return new_pos
 
-    def _get_other_player_positions(self):
-        return [player.position for player in self.players if player is not self.current_player]
-
-    def _get_other_players(self):
-        return [player for player in self.players if player is not self.current_player]
-
     def _next_player(self):
-        self.current_player = next(self.player_cycle)
+        if self.oxygen > 0:
+            self._seat = self._next_seats[self._seat]
+        else:
+            # the round ends on the next seat's turn, whether they are still out or not
+            self._seat = (self._seat + 1) % len(self.players)
+        self.current_player = self.players[self._seat]
 
     def _reduce_ox_by(self, n):
         self.oxygen -= n
-        logger.log(TURN,
-                   f'- {self.current_player.name} has {self.current_player.count_tiles()} tile(s), oxygen reduced '
-                   f'from {self.oxygen} to {self.oxygen - n}')
+        if logger.isEnabledFor(TURN):
+            logger.log(TURN, '- %s has %s tile(s), oxygen reduced from %s to %s', self.current_player.name,
+                       self.current_player.count_tiles(), self.oxygen, self.oxygen - n)
 
     def _kill_players_gather_tiles(self):
         dropped_tiles = {}
@@ -156,41 +316,31 @@ class Board:
                 killed_position = player.position
                 dropped = player.kill()
                 if dropped:
-                    dropped_tiles[killed_position] = TileStack(dropped)
+                    dropped_tiles[killed_position] = stack_tiles(dropped)
         ordered_stacks = [dropped_tiles[player_n] for player_n in sorted(dropped_tiles)]
         return ordered_stacks
 
     def _reform_tiles(self, ordered_stacks):
-        self.tiles = [tile for tile in self.tiles if tile.level]
-        self.tiles.extend(ordered_stacks)
-        if not self.tiles:
+        self.tiles.reform(ordered_stacks)
+        if not len(self.tiles):
             raise RoundOver('Ran out of tiles!')
 
     def _summarise_game_states(self):
-        player = {
-            'tiles': self.current_player.summarise_tiles(),
-            'position': self.current_player.position,
-            'bank': self.current_player.bank,
-            'changed_direction': False if self.current_player.direction > 0 else True,
-            'turn_number': self.current_player.n_turn
-        }
-        board = {
-            'tiles': self._summarise_tile_levels(),
-            'round_number': self.round_number,
-            'oxygen': self.oxygen
-        }
-        other_players = {
-            player.name: {
-                'tiles': player.summarise_tiles(),
-                'position': player.position,
-                'bank': player.bank,
-                'changed_direction': False if player.direction > 0 else True,
-                'turn_number': player.n_turn
-            } for player in self._get_other_players()
-        }
-        return player, board, other_players
+        """
+        Read only views of the current player, the board and the other players, shared between strategy calls and
+        updated as the game progresses.
+        """
+        return self._views[self.current_player]
+
+    def state_key(self):
+        """
+        Canonical key of the state as the current player sees it, see views.state_key.
+        """
+        return state_key(*self._views[self.current_player])
 
     def print_end_game_summary(self):
+        if not logger.isEnabledFor(GAME):
+            return
         logger.log(GAME, '\nGame over!')
         banks = {player.name: player.bank for player in self.players}
         if any(banks.values()):
@@ -207,7 +357,8 @@ class Board:
         if any(positions.values()):
             last_player = max(positions, key=positions.get)
             while self.current_player.name != last_player:
-                self._next_player()
+                self._seat = (self._seat + 1) % len(self.players)
+                self.current_player = self.players[self._seat]
 
     def get_stats(self):
         banks = sorted([player.bank for player in self.players], reverse=True)
@@ -219,3 +370,37 @@ class Board:
                 'deaths': player.deaths
             }
         return stats
+
+
+class Rollouts:
+    """
+    Plays out futures of a board's game for strategies that look ahead, which reach it as board.rollouts.
+
+    Each rollout carries the game on from the decision being made on a board of its own, with strategies, one per
+    seat in seat order, taking every decision from that one on. The dice are rolled and the values of the tiles,
+    which strategies can't see, drawn again from a random source seeded with seed, so rollouts don't give away the
+    game's.
+    """
+
+    def __init__(self, board):
+        self._board = board
+        self._lineup = None  # ids of the strategies of the last rollout's board
+        self._rollout_board = None
+
+    def rollout(self, strategies, rounds_per_game=3, seed=None):
+        """
+        Stats of the game played out to the end of round rounds_per_game, as Board.get_stats.
+        """
+        board = self._board
+        random_source = RandomSource(seed)
+        lineup = tuple(map(id, strategies))
+        if lineup != self._lineup:
+            # drawing its tiles from a random source of its own, so each seed gives the same future every time
+            self._rollout_board = Board(strategies, board.rules)
+            self._lineup = lineup
+        rollout_board = self._rollout_board
+        rollout_board.restore(board.snapshot(), random_source)
+        rollout_board.redraw_tile_values()
+        if board._deciding is not None and rollout_board._finish_turn(board._deciding):
+            rollout_board._end_round()
+        return rollout_board.rollout(rounds_per_game)
@@ -0,0 +1,175 @@
+from bisect import bisect_right
+from itertools import product
+
+import numpy as np
+
+from ShallowOceanExpedition.components.strategy import DefaultStrategy, batch_n_levels, batch_lowest_slot, \
+    batch_highest_slot
+
+# feature name: (value from the views passed to strategies, values from a BatchTurnState)
+FEATURES = {
+    'round_number': (lambda player, board: board['round_number'], lambda state: state.round_number),
+    'turn_number': (lambda player, board: player['turn_number'], lambda state: state.turn_number),
+    'changed_direction': (lambda player, board: player['changed_direction'], lambda state: state.changed_direction),
+    'position': (lambda player, board: player['position'], lambda state: state.position),
+    'tile_count': (lambda player, board: sum(player['tiles'].values()), lambda state: state.tile_count),
+    'n_levels': (lambda player, board: len(player['tiles']), batch_n_levels),
+    'oxygen': (lambda player, board: board['oxygen'], lambda state: state.oxygen)
+}
+
+# the rules of DefaultStrategy, for rounds 0 to 2
+DEFAULT_TABLE = {
+    'decide_direction': [
+        ({'round_number': (0, 1), 'turn_number': (3, None), 'changed_direction': False}, True),
+        ({'round_number': 2, 'turn_number': (2, None), 'changed_direction': False}, True)
+    ],
+    'tile_collect': [
+        ({'round_number': (0, 1), 'turn_number': (2, None)}, True),
+        ({'round_number': 2, 'turn_number': (1, None)}, True)
+    ],
+    'tile_drop': [
+        ({'position': (5, None), 'n_levels': (2, None), 'oxygen': (None, 10)}, True)
+    ]
+}
+
+
+class DecisionTable:
+    """
+    One decision given as rules over the features in FEATURES, compiled to a lookup table.
+
+    Rules are (conditions, decision) pairs tried in order, the first with all its conditions met gives the
+    decision, otherwise default. A condition is either a value the feature must equal or an inclusive (low, high)
+    range, with None for an open end. The bounds of the conditions split each feature into bins, the decision for
+    every combination of bins is worked out once so a decision is one index into the table.
+
+    Batches are looked up in the flat table. Single decisions use the same table nested by feature, with parts that
+    give the same decision whatever the remaining features collapsed, so only the features needed are read.
+    """
+
+    def __init__(self, rules, default=False):
+        self.rules = rules
+        self.default = default
+        features = {feature for conditions, _ in rules for feature in conditions}
+        for feature in features:
+            if feature not in FEATURES:
+                raise ValueError(f'Unknown feature {feature}, must be one of {list(FEATURES)}.')
+        # features split into fewer bins first, they are more likely to settle a decision on their own
+        self.features = sorted(features, key=lambda feature: (len(self._thresholds(feature)), feature))
+        self.thresholds = [sorted(self._thresholds(feature)) for feature in self.features]
+        self.strides = [int(np.prod([len(thresholds) + 1 for thresholds in self.thresholds[n + 1:]]))
+                        for n in range(len(self.features))]
+        self.table = [self._decide(dict(zip(self.features, representatives))) for representatives in product(*[
+            [thresholds[0] - 1 if thresholds else 0] + thresholds for thresholds in self.thresholds
+        ])]
+        self.table_array = np.array(self.table)
+        self._getters = [FEATURES[feature][0] for feature in self.features]
+        self._batch_getters = [FEATURES[feature][1] for feature in self.features]
+        self._root = self._nest(0, 0)
+
+    def _nest(self, depth, offset):
+        """
+        The decision, or [getter, thresholds, children] if it depends on the features from depth on.
+        """
+        if depth == len(self.features):
+            return self.table[offset]
+        children = [self._nest(depth + 1, offset + n_bin * self.strides[depth])
+                    for n_bin in range(len(self.thresholds[depth]) + 1)]
+        if all(type(child) is not list and child == children[0] for child in children):
+            return children[0]
+        return [self._getters[depth], self.thresholds[depth], children]
+
+    def _thresholds(self, feature):
+        thresholds = set()
+        for conditions, _ in self.rules:
+            if feature in conditions:
+                low, high = _bounds(conditions[feature])
+                if low is not None:
+                    thresholds.add(low)
+                if high is not None:
+                    thresholds.add(high + 1)
+        return thresholds
+
+    def _decide(self, values):
+        for conditions, decision in self.rules:
+            if all(_matches(condition, values[feature]) for feature, condition in conditions.items()):
+                return decision
+        return self.default
+
+    def lookup(self, player, board):
+        node = self._root
+        while type(node) is list:
+            getter, thresholds, children = node
+            node = children[bisect_right(thresholds, getter(player, board))]
+        return node
+
+    def batch_lookup(self, state):
+        index = 0
+        for getter, thresholds, stride in zip(self._batch_getters, self.thresholds, self.strides):
+            index = index + np.searchsorted(thresholds, getter(state), side='right') * stride
+        return np.broadcast_to(self.table_array[index], (len(state.round_number),))
+
+
+def _bounds(condition):
+    if isinstance(condition, tuple):
+        bounds = condition
+        if len(bounds) != 2 or not all(bound is None or _is_integer(bound) for bound in bounds):
+            raise ValueError(f'Range conditions must be (low, high) with integers or None, not {condition!r}.')
+        return bounds
+    if not _is_integer(condition):
+        raise ValueError(f'Conditions must be integers or (low, high) ranges, not {condition!r}.')
+    return condition, condition
+
+
+def _is_integer(value):
+    return isinstance(value, (int, np.integer))
+
+
+def _matches(condition, value):
+    low, high = _bounds(condition)
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+class DecisionTableStrategy(DefaultStrategy):
+    """
+    Strategy given as decision tables, see DecisionTable, playable in both Board and BatchBoard.
+
+    rules maps 'decide_direction', 'tile_collect' and 'tile_drop' to their rules, missing decisions are always
+    False. When dropping, the first collected of the lowest or highest level tiles held is dropped, set by
+    drop_level. As with BatchDefaultStrategy, BatchBoard compares stacked tiles by their flattened levels.
+    """
+
+    def __init__(self, player_name, rules=None, drop_level='lowest'):
+        super().__init__(player_name)
+        if drop_level not in ('lowest', 'highest'):
+            raise ValueError("drop_level must be 'lowest' or 'highest'.")
+        rules = DEFAULT_TABLE if rules is None else rules
+        self.drop_level = drop_level
+        self.tables = {
+            decision: DecisionTable(rules.get(decision, []))
+            for decision in ('decide_direction', 'tile_collect', 'tile_drop')
+        }
+
+    def decide_direction(self, player, board, others):
+        return self.tables['decide_direction'].lookup(player, board)
+
+    def tile_collect(self, player, board, others):
+        return self.tables['tile_collect'].lookup(player, board)
+
+    def tile_drop(self, player, board, others):
+        if not player['tiles'] or not self.tables['tile_drop'].lookup(player, board):
+            return False, None
+        tile_levels = list(player['tiles'])
+        flat_tile_levels = [sum(level) for level in tile_levels]
+        choose = min if self.drop_level == 'lowest' else max
+        return True, tile_levels[flat_tile_levels.index(choose(flat_tile_levels))]
+
+    def batch_decide_direction(self, state):
+        return self.tables['decide_direction'].batch_lookup(state)
+
+    def batch_tile_collect(self, state):
+        return self.tables['tile_collect'].batch_lookup(state)
+
+    def batch_tile_drop(self, state):
+        do_drop = self.tables['tile_drop'].batch_lookup(state) & (state.tile_count > 0)
+        slots = batch_lowest_slot(state) if self.drop_level == 'lowest' else batch_highest_slot(state)
+        return do_drop, slots
@@ -1,13 +1,19 @@
-from random import randint
+from collections import deque
+from types import MappingProxyType
 
+from ShallowOceanExpedition.components.views import PlayerView
 from ShallowOceanExpedition.utils.exceptions import Cheating, RuleViolation
 from ShallowOceanExpedition.utils.logging import logger, TURN, ROUND
+from ShallowOceanExpedition.utils.random_source import default_random_source, DICE
 
 
 class Player:
-    def __init__(self, strategy):
+    def __init__(self, strategy, random_source=default_random_source, occupancy=None, dice=DICE):
         self.name = strategy.player_name
-        self.position = 0
+        self.random_source = random_source
+        self.dice = dice
+        self.occupancy = occupancy  # position: player of the board's players not at home, kept up to date here
+        self._position = 0
         self.tiles = []
         self.direction = 1
         self.bank = 0
@@ -15,38 +21,114 @@ class Player:
         self.strategy = strategy
         self.back_home = False
         self.deaths = []
+        self.view = PlayerView(self)
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, position):
+        occupancy = self.occupancy
+        if occupancy is not None:
+            if occupancy.get(self._position) is self:
+                del occupancy[self._position]
+            if position:
+                occupancy[position] = self
+        self._position = position
+
+    @property
+    def tiles(self):
+        # a copy, set tiles to change them
+        return tuple(self._tiles.values())
+
+    @tiles.setter
+    def tiles(self, tiles):
+        self._tiles = {}  # tile id: tile, in the order collected
+        self._tile_ids = {}  # level: ids of the tiles held of that level, oldest first
+        self._tile_counts = {}  # level: number of tiles held of that level, in the order the levels were collected
+        self._tile_summary = MappingProxyType(self._tile_counts)
+        self._next_tile_id = 0
+        for tile in tiles:
+            self._add_tile(tile)
+
+    def _clear_tiles(self):
+        # in place, so the tile summary seen through the player's view stays the same mapping
+        self._tiles.clear()
+        self._tile_ids.clear()
+        self._tile_counts.clear()
+        self._next_tile_id = 0
+
+    @property
+    def tile_summary(self):
+        """
+        Read only summary of the tiles held, kept up to date as tiles are collected and dropped. Levels are listed in
+        the order they were first collected, a level going to the end if collected again after all its tiles were
+        dropped.
+        """
+        return self._tile_summary
+
+    def _add_tile(self, tile):
+        tile_id = self._next_tile_id
+        self._next_tile_id += 1
+        self._tiles[tile_id] = tile
+        if tile.level in self._tile_ids:
+            self._tile_ids[tile.level].append(tile_id)
+            self._tile_counts[tile.level] += 1
+        else:
+            self._tile_ids[tile.level] = deque([tile_id])
+            self._tile_counts[tile.level] = 1
 
     @property
     def is_home(self):
         return True if self.position == 0 and self.direction == -1 else False
 
     def roll(self):
-        roll = (randint(1, 3) + randint(1, 3))
+        roll = self.random_source.roll(self.dice)
         moves = max(roll - self.count_tiles(), 0)
-        logger.log(TURN, f'- {self.name} rolled a {roll} {"forward" if self.direction>0 else "backward"}'
-                         f': move {moves}!')
+        if logger.isEnabledFor(TURN):
+            logger.log(TURN, '- %s rolled a %s %s: move %s!', self.name, roll,
+                       "forward" if self.direction > 0 else "backward", moves)
         return moves
 
     def collect_tile(self, tile):
         if tile.level is None:
             raise RuleViolation('Cant pick up blank tile.')
-        self.tiles.append(tile)
+        self._add_tile(tile)
 
     def drop_tile(self, tile_level):
-        if not self.tiles:
+        """
+        Drop the first collected of the tiles held of tile_level.
+        """
+        if not self._tiles:
             raise RuleViolation('No tiles to drop.')
-        tile_index_to_drop = [tile.level for tile in self.tiles].index(tile_level)
-        return self.tiles.pop(tile_index_to_drop)
+        if tile_level not in self._tile_ids:
+            raise ValueError(f'No tile of level {tile_level} held.')
+        tile_ids = self._tile_ids[tile_level]
+        tile = self._tiles.pop(tile_ids.popleft())
+        if tile_ids:
+            self._tile_counts[tile_level] -= 1
+        else:
+            del self._tile_ids[tile_level]
+            del self._tile_counts[tile_level]
+        return tile
+
+    def set_tile_values(self, values):
+        """
+        Give the tiles held the values given, in the order of tiles.
+        """
+        tiles = self._tiles
+        for tile_id, value in zip(list(tiles), values):
+            tiles[tile_id] = tiles[tile_id]._replace(value=value)
 
     def count_tiles(self):
-        return len(self.tiles)
+        return len(self._tiles)
 
     def summarise_tiles(self):
-        tile_levels = [tile.level for tile in self.tiles]
-        return {level: tile_levels.count(level) for level in set(tile_levels)}
+        return dict(self._tile_counts)
 
     def change_direction(self):
-        logger.log(TURN, f'- {self.name} changed direction!')
+        logger.log(TURN, '- %s changed direction!', self.name)
         if self.direction == -1:
             raise Cheating('You cant turn around again you cheating bugger!')
         self.direction = -1
@@ -54,7 +136,7 @@ class Player:
     def kill(self):
         if self.back_home:
             raise Cheating('Player already home.')
-        logger.log(ROUND, f"- {self.name} didn't make it, they lost {self.count_tiles()} tiles :-(")
+        logger.log(ROUND, "- %s didn't make it, they lost %s tiles :-(", self.name, len(self._tiles))
         dropped_tiles = self.tiles
         self.clear_player()
         return dropped_tiles
@@ -62,22 +144,55 @@ class Player:
     def reached_home(self):
         if self.back_home:
             raise Cheating('Player already home.')
-        logger.log(ROUND, f"{self.name} made it!!")
+        logger.log(ROUND, "%s made it!!", self.name)
         self.back_home = True
         self.bank += self.get_tile_values()
         self.clear_player()
 
     def clear_player(self):
-        self.tiles = []
+        self._clear_tiles()
         self.position = 0
         self.direction = 1
         self.n_turn = 0
         self.deaths.append(not self.back_home)
 
+    def reset(self, random_source):
+        """
+        Ready the player for a new game at the same board, rolling with random_source.
+        """
+        self.random_source = random_source
+        self._clear_tiles()
+        self.position = 0
+        self.direction = 1
+        self.bank = 0
+        self.n_turn = 0
+        self.back_home = False
+        self.deaths = []  # a new list, the stats of the last game hold the old one
+
+    def snapshot(self):
+        """
+        The player's state during a game, see Board.snapshot.
+        """
+        return (self._position, self.direction, tuple(self._tiles.values()), tuple(self._tile_counts), self.bank,
+                self.n_turn, self.back_home, tuple(self.deaths))
+
+    def restore(self, snapshot):
+        position, self.direction, tiles, summary_levels, self.bank, self.n_turn, self.back_home, deaths = snapshot
+        self._clear_tiles()
+        for tile in tiles:
+            self._add_tile(tile)
+        # levels in the summary's order, which can differ from the order of the tiles after drops
+        tile_counts = dict(self._tile_counts)
+        self._tile_counts.clear()
+        for level in summary_levels:
+            self._tile_counts[level] = tile_counts[level]
+        self.position = position
+        self.deaths = list(deaths)
+
     def get_tile_values(self):
         if not self.back_home:
             raise Cheating('This method cannot be called whilst the player is playing!')
-        return sum(tile.value for tile in self.tiles)
+        return sum(tile.value for tile in self._tiles.values())
 
     def __str__(self):  # pragma: no cover
         return f"""- Summary for {self.name}:
@@ -1,5 +1,11 @@
+from importlib import import_module
+
+import numpy as np
+
 from ShallowOceanExpedition.utils.exceptions import RuleViolation
 
+CALLBACKS = ('decide_direction', 'tile_collect', 'tile_drop')  # the decisions a strategy makes
+
 
 class DefaultStrategy:
     def __init__(self, player_name):
@@ -7,7 +13,7 @@ class DefaultStrategy:
 
     @staticmethod
     def decide_direction(player, board, others):
-        # should receive read only views of board_2p and player
+        # receives read only views of the player, board and other players
         if board['round_number'] in [0, 1]:
             # start risky
             change = True if player['turn_number'] > 2 and not player['changed_direction'] else False
@@ -38,3 +44,64 @@ class DefaultStrategy:
             min_tile_level = tile_levels[flat_tile_levels.index(min(flat_tile_levels))]
             return True, min_tile_level
         return False, None
+
+
+class BatchDefaultStrategy(DefaultStrategy):
+    """
+    DefaultStrategy with its rules also evaluated for many boards at once, so it can play in a BatchBoard.
+
+    The batch methods receive a BatchTurnState and return one decision per board. Stacked tiles are compared by
+    their flattened levels, so tile_drop counts distinct flattened levels rather than distinct stacks.
+    """
+
+    @staticmethod
+    def batch_decide_direction(state):
+        round_number = state.round_number
+        if (round_number > 2).any():
+            raise RuleViolation()
+        # start risky, reduce risk for last go
+        min_turn = np.where(round_number < 2, 2, 1)
+        return (state.turn_number > min_turn) & ~state.changed_direction
+
+    @staticmethod
+    def batch_tile_collect(state):
+        round_number = state.round_number
+        if (round_number > 2).any():
+            raise RuleViolation()
+        min_turn = np.where(round_number < 2, 1, 0)
+        return state.turn_number > min_turn
+
+    @staticmethod
+    def batch_tile_drop(state):
+        do_drop = (state.position >= 5) & (batch_n_levels(state) >= 2) & (state.oxygen <= 10)
+        return do_drop, batch_lowest_slot(state)
+
+
+def batch_n_levels(state):
+    """
+    Number of distinct flattened levels held on each board.
+    """
+    held = np.arange(state.tile_levels.shape[1]) < state.tile_count[:, None]
+    sorted_levels = np.sort(np.where(held, state.tile_levels, np.iinfo(np.int16).max), axis=1)
+    return held[:, 0] + ((sorted_levels[:, 1:] != sorted_levels[:, :-1]) & held[:, 1:]).sum(axis=1)
+
+
+def batch_lowest_slot(state):
+    """
+    Slot of the first collected of the lowest level tiles held on each board.
+    """
+    held = np.arange(state.tile_levels.shape[1]) < state.tile_count[:, None]
+    return np.where(held, state.tile_levels, np.iinfo(np.int16).max).argmin(axis=1)
+
+
+def batch_highest_slot(state):
+    held = np.arange(state.tile_levels.shape[1]) < state.tile_count[:, None]
+    return np.where(held, state.tile_levels, -1).argmax(axis=1)
+
+
+def load_strategy(strategy_path, player_name):
+    module_name, _, class_name = strategy_path.partition(':')
+    strategy_class = getattr(import_module(module_name), class_name)
+    if not (isinstance(strategy_class, type) and issubclass(strategy_class, DefaultStrategy)):
+        raise TypeError(f'{strategy_path} is not a DefaultStrategy subclass.')
+    return strategy_class(player_name)
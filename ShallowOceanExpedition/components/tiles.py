@@ -1,59 +1,73 @@
-from random import choice
-
-
-class Home:
-    def __init__(self):
-        self.value = None
-        self.level = 'Home'
-
-
-class Tile:
-    def __init__(self, level):
-        """
-        properties:
-            level (tuple): level of the tile
-        """
-        self.level = level,
-        self.__value = None
-        if level == 1:
-            self.value_range = range(0, 5)
-        elif level == 2:
-            self.value_range = range(5, 10)
-        elif level == 3:
-            self.value_range = range(10, 15)
-        elif level == 4:
-            self.value_range = range(15, 20)
-        else:
-            raise ValueError('Level must be one of [1,2,3,4]')
-
-    @property
-    def value(self):
-        if self.__value is None:
-            self.__value = choice(self.value_range)
-        return self.__value
-
-
-class BlankTile:
-    level = None
-
-    @property
-    def value(self):
-        raise ValueError("Blank tile has no value.")
-
-
-class TileStack:
-    def __init__(self, tiles):
-        if not tiles:
-            raise ValueError("No tiles given.")
-        self._tiles = tiles
-        level = []
-        for tile in tiles:
-            level.extend(tile.level)
-        self.level = tuple(level)
-        self.__value = None
-
-    @property
-    def value(self):
-        if self.__value is None:
-            self.__value = sum([tile.value for tile in self._tiles])
-        return self.__value
+from collections import namedtuple
+
+HOME = 'Home'  # level of the home tile, blank tiles have level None
+LEVELS = {level: (level,) for level in range(1, 5)}  # shared by every tile of a level
+
+# a tile picked up by a player, level is a tuple of the levels of the tiles stacked in it
+Tile = namedtuple('Tile', ['level', 'value'])
+
+
+def stack_tiles(tiles):
+    """
+    A single tile made of the tiles a player was holding when they died.
+    """
+    if not tiles:
+        raise ValueError("No tiles given.")
+    level = []
+    for tile in tiles:
+        level.extend(tile.level)
+    return Tile(tuple(level), sum(tile.value for tile in tiles))
+
+
+class TileTable:
+    """
+    The tiles on a board as a list of levels and a list of values, indexed by position. Home and blank tiles have a
+    value of 0.
+    """
+
+    def __init__(self, levels, values):
+        if len(levels) != len(values):
+            raise ValueError('Must give a value for every level.')
+        self.levels = list(levels)
+        self.values = list(values)
+
+    @classmethod
+    def new(cls, rules, random_source):
+        """
+        The tiles of a new board laid out as given by a RuleSet, every tile's value drawn in one go.
+        """
+        return cls(rules.layout, [0] + random_source.integers(rules.value_lows, rules.value_highs))
+
+    def reset(self, rules, random_source):
+        """
+        Lay the tiles out again as TileTable.new would, updating the table in place.
+        """
+        self.levels[:] = rules.layout
+        self.values[:] = [0] + random_source.integers(rules.value_lows, rules.value_highs)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __getitem__(self, position):
+        return Tile(self.levels[position], self.values[position])
+
+    def take(self, position):
+        """
+        Remove the tile at position, leaving a blank tile.
+        """
+        tile = Tile(self.levels[position], self.values[position])
+        self.levels[position] = None
+        self.values[position] = 0
+        return tile
+
+    def put(self, position, tile):
+        self.levels[position] = tile.level
+        self.values[position] = tile.value
+
+    def reform(self, stacks):
+        """
+        Close up the gaps left by blank tiles and add stacks to the end, updating the table in place.
+        """
+        kept = [position for position, level in enumerate(self.levels) if level]
+        self.levels[:] = [self.levels[position] for position in kept] + [stack.level for stack in stacks]
+        self.values[:] = [self.values[position] for position in kept] + [stack.value for stack in stacks]
@@ -0,0 +1,108 @@
+from collections.abc import Mapping, Sequence
+from operator import attrgetter
+
+
+class StateView(Mapping):
+    """
+    Read only mapping of field names to values read from a source object when looked up, so one view can be reused
+    for the whole game.
+    """
+    __slots__ = ('_source',)
+    _fields = {}
+
+    def __init__(self, source):
+        self._source = source
+
+    def __getitem__(self, key):
+        return self._fields[key](self._source)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):  # pragma: no cover
+        return repr(dict(self))
+
+
+class PlayerView(StateView):
+    """
+    Read only view of a player, as passed to strategies.
+    """
+    __slots__ = ()
+    _fields = {
+        'tiles': attrgetter('tile_summary'),
+        'position': attrgetter('position'),
+        'bank': attrgetter('bank'),
+        'changed_direction': lambda player: not player.direction > 0,
+        'turn_number': attrgetter('n_turn')
+    }
+
+
+class BoardView(StateView):
+    """
+    Read only view of a board, as passed to strategies, with the board's rollouts.
+    """
+    __slots__ = ()
+    _fields = {
+        'tiles': attrgetter('tile_levels'),
+        'round_number': attrgetter('round_number'),
+        'oxygen': attrgetter('oxygen')
+    }
+
+    @property
+    def rollouts(self):
+        """
+        The board's Rollouts, to play out futures of the game. Not one of the view's fields, so copies of the view
+        leave it out.
+        """
+        return self._source.rollouts
+
+
+class SequenceView(Sequence):
+    """
+    Read only view of a list that is updated in place by its owner.
+    """
+    __slots__ = ('_items',)
+
+    def __init__(self, items):
+        self._items = items
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, SequenceView)):
+            return self._items == list(other)
+        return NotImplemented
+
+    def __repr__(self):  # pragma: no cover
+        return repr(self._items)
+
+
+def state_key(player, board, others):
+    """
+    Hashable key of the game state shown by the views passed to a strategy, equal for states that differ only in
+    details that shouldn't change a decision: which opponent is which and the order of the tiles in a stack, or of
+    the levels in the player's tile summary. For memoising decisions or evaluations, see TranspositionCache.
+    """
+    return (_player_key(player), tuple(_level_key(level) for level in board['tiles']), board['round_number'],
+            board['oxygen'], tuple(sorted(_player_key(other) for other in others.values())))
+
+
+def _player_key(player):
+    tiles = {}
+    for level, count in player['tiles'].items():
+        level = _level_key(level)
+        tiles[level] = tiles.get(level, 0) + count
+    return (tuple(sorted(tiles.items())), player['position'], player['bank'], player['changed_direction'],
+            player['turn_number'])
+
+
+def _level_key(level):
+    # stacks are tuples of the levels stacked, in the order the tiles were picked up
+    return tuple(sorted(level)) if type(level) is tuple else level
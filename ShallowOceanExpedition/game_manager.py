@@ -1,23 +1,144 @@
+import os
+import pickle
+import random
+from copy import deepcopy
 from datetime import datetime
+from functools import wraps
 
 from tqdm import tqdm
 
 from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.rules import rules_from
+from ShallowOceanExpedition.scheduler import Scheduler, all_seatings, all_lineups
+from ShallowOceanExpedition.utils.accumulators import default_accumulators, WinCounter, WinRates
 from ShallowOceanExpedition.utils.logging import logger, SIM
 from ShallowOceanExpedition.utils.pretty_plot import PrettyPlot
+from ShallowOceanExpedition.utils.random_source import RandomSource
+from ShallowOceanExpedition.utils.results_store import ResultsStore
+from ShallowOceanExpedition.utils.timings import CallTimings
+
+
+def run_method(method):
+    """
+    Marks a run. The outermost run called is recorded so GameManager.resume can call it again, once it finishes a
+    final checkpoint is saved and any timings are reported.
+    """
+
+    @wraps(method)
+    def run(self, *args, **kwargs):
+        if self._run is not None:
+            return method(self, *args, **kwargs)
+        self._run = (method.__name__, args, kwargs)
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            self._run = None
+            self._progress = {}
+            self._resume_progress = {}
+        if self.checkpoint_path is not None:
+            self.save_checkpoint()
+        if 'timings' in self.accumulators:
+            logger.log(SIM, 'Time spent per strategy callback and in the engine:\n%s',
+                       self.accumulators['timings'].report())
+        return result
+
+    return run
 
 
 class GameManager:
-    def __init__(self, strategies, **board_params):
+    games_per_unit = 100
+
+    def __init__(self, strategies, workers=1, seed=None, accumulators=None, keep_stats=False, results_path=None,
+                 common_random_numbers=False, checkpoint_path=None, checkpoint_every=1000, time_strategies=False,
+                 rules=None, **board_params):
         self.strategies = strategies
-        self.board_params = board_params
-        self.stats = []  # list of stats PER ROUND
+        # one rule set for every board of every run, the only board parameter sent to worker processes
+        self.rules = rules_from(rules, **board_params)
+        self.board_params = {'rules': self.rules}
+        self.workers = workers
+        self.accumulators = default_accumulators()
+        self.accumulators.update(accumulators or {})
+        self.accumulators.setdefault('wins', WinCounter())
+        self.accumulators.setdefault('win_rates', WinRates())
+        if time_strategies:
+            self.accumulators['timings'] = CallTimings()
+        self.keep_stats = keep_stats
+        self.stats = []  # list of stats PER GAME, only kept if keep_stats
+        self.results_store = None if results_path is None else ResultsStore(results_path)
+        self.lineup_accumulators = {}  # accumulators per line-up of player names, for scheduled runs
+        self.random_source = RandomSource(seed)
+        self._seeds = random.Random(seed)
+        # with common random numbers game n of every run, rotation or line-up gets the same dice and tile values
+        self.common_seed = self._seeds.getrandbits(32) if common_random_numbers else None
         self._simulation_time = datetime.now().strftime("%Y-%m-%d %H:%M")
         self._plot_title = None
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every  # games between checkpoints
+        self._games_since_checkpoint = 0
+        self._run = None  # (method name, args, kwargs) of the run in progress
+        self._progress = {}  # how far the loops of the run in progress have got, saved in checkpoints
+        self._resume_progress = {}  # progress loaded from a checkpoint, taken by each loop as it starts
+        self._boards = {}  # boards to reuse, by the strategies in their seats, rules and timings
+
+    def save_checkpoint(self):
+        """
+        Save everything needed to carry on the run in progress to checkpoint_path: the accumulated results, how far
+        through the run it is and the state of the random number generators.
+        """
+        state = dict(self.__dict__)
+        state['_boards'] = {}
+        if self.results_store is not None:
+            state['results_store'] = (self.results_store.path, self.results_store.mark())
+        with open(self.checkpoint_path + '.tmp', 'wb') as checkpoint_file:
+            pickle.dump(state, checkpoint_file)
+        os.replace(self.checkpoint_path + '.tmp', self.checkpoint_path)
+        self._games_since_checkpoint = 0
+
+    def _played(self, n_games):
+        """
+        Called between games, checkpoints once checkpoint_every games have been played since the last checkpoint.
+        """
+        self._games_since_checkpoint += n_games
+        if self.checkpoint_path is not None and self._games_since_checkpoint >= self.checkpoint_every:
+            self.save_checkpoint()
+
+    @classmethod
+    def resume(cls, checkpoint_path):
+        """
+        Load the GameManager checkpointed to checkpoint_path and finish the run it was part way through, without
+        replaying the games already played. Results are the same as if the run had never been interrupted.
+        """
+        with open(checkpoint_path, 'rb') as checkpoint_file:
+            state = pickle.load(checkpoint_file)
+        if state['results_store'] is not None:
+            results_path, mark = state['results_store']
+            state['results_store'] = ResultsStore(results_path)
+            state['results_store'].rewind(mark)
+        game_manager = cls.__new__(cls)
+        game_manager.__dict__.update(state)
+        if game_manager._run is not None:
+            method_name, args, kwargs = game_manager._run
+            game_manager._run = None
+            game_manager._resume_progress, game_manager._progress = game_manager._progress, {}
+            logger.log(SIM, f'Resuming {method_name}...')
+            getattr(game_manager, method_name)(*args, **kwargs)
+        return game_manager
 
     @property
     def new_board(self):
-        return Board(self.strategies, **self.board_params)
+        """
+        A board set up for a new game, the board last used by the same strategies in the same seats reset if there
+        is one, so games only allocate their results.
+        """
+        timings = self.accumulators.get('timings')
+        key = tuple(map(id, self.strategies)) + (id(self.board_params['rules']), id(timings))
+        board = self._boards.get(key)
+        if board is None:
+            board = self._boards[key] = Board(self.strategies, random_source=self.random_source, timings=timings,
+                                              **self.board_params)
+        else:
+            board.reset(self.random_source)
+        return board
 
     def run_n_rounds(self, n):
         board = self.new_board
@@ -25,53 +146,156 @@ class GameManager:
             board.play_round()
         stats = board.get_stats()
         board.print_end_game_summary()
-        self.stats.append(stats)
+        self._record(stats)
         self.plot_title = f'{n} rounds'
 
-    def run_n_games(self, n, rounds_per_game=3):
-        n_games_iter = tqdm(range(n)) if logger.level == SIM else range(n)
-        for _ in n_games_iter:
-            self.run_n_rounds(rounds_per_game)
+    def _record(self, game_stats):
+        for accumulator in self.accumulators.values():
+            accumulator.update(game_stats)
+        self._store(game_stats)
+
+    def _store(self, game_stats):
+        if self.keep_stats:
+            self.stats.append(game_stats)
+        if self.results_store is not None:
+            self.results_store.append(game_stats)
+
+    @run_method
+    def run_n_games(self, n, rounds_per_game=3, workers=None, first_game=0):
+        """
+        Play n games. With common random numbers these are games first_game to first_game + n - 1.
+        """
+        # scheduled even in this process, so the games played don't depend on the number of workers
+        self._run_schedule([self.strategies], n, rounds_per_game, workers, first_game)
         self.plot_title = f'{n} games, {rounds_per_game} rounds per game'
 
+    def _run_schedule(self, lineups, n_games_per_lineup, rounds_per_game, workers=None, first_game=0):
+        workers = self.workers if workers is None else workers
+        if 'schedule_seed' in self._resume_progress:
+            seed = self._resume_progress.pop('schedule_seed')
+        else:
+            seed = self._seeds.getrandbits(32)
+        first_unit = self._resume_progress.pop('unit', 0)
+        self._progress['schedule_seed'] = seed
+        scheduler = Scheduler(lineups, n_games_per_lineup, self.games_per_unit, seed=seed,
+                              common_seed=self.common_seed, first_game=first_game)
+        empty_accumulators = {name: accumulator.empty_copy() for name, accumulator in self.accumulators.items()}
+        keep_stats = self.keep_stats or self.results_store is not None
+        progress = None
+        if logger.level == SIM:
+            progress = tqdm(total=sum(work_unit.n_games for work_unit in scheduler.work_units[first_unit:]))
+        results = scheduler.run(self.board_params, rounds_per_game, empty_accumulators, keep_stats, workers,
+                                first_unit)
+        for n_unit, (lineup, n_games, unit_accumulators, unit_stats) in enumerate(results, first_unit):
+            lineup_accumulators = self.lineup_accumulators.setdefault(
+                lineup, {name: accumulator.empty_copy() for name, accumulator in self.accumulators.items()})
+            for name, accumulator in unit_accumulators.items():
+                self.accumulators[name].merge(accumulator)
+                lineup_accumulators[name].merge(accumulator)
+            for game_stats in unit_stats:
+                self._store(game_stats)
+            if progress is not None:
+                progress.update(n_games)
+            self._progress['unit'] = n_unit + 1
+            self._played(n_games)
+        self._progress.pop('schedule_seed')
+        self._progress.pop('unit', None)
+        if progress is not None:
+            progress.close()
+        if self.results_store is not None:
+            self.results_store.flush()
+
+    def _run_rotations(self, n_games_per_rotation, rounds_per_game, first_game=0):
+        for n_rotation in range(self._resume_progress.pop('rotation', 0), len(self.strategies)):
+            self._progress['rotation'] = n_rotation
+            self.run_n_games(n_games_per_rotation, rounds_per_game, first_game=first_game)
+            self.strategies = [self.strategies.pop()] + self.strategies
+            self._progress['rotation'] = n_rotation + 1
+            self._played(0)
+        del self._progress['rotation']
+
+    @run_method
     def run_n_games_and_rotate_strategies(self, n_games_per_rotation, rounds_per_game=3):
+        """
+        Play n_games_per_rotation games for each rotation of the seats. With common random numbers every rotation
+        replays the same games, so differences between rotations come from the strategies and seats alone.
+        """
         logger.log(SIM, f'Running {n_games_per_rotation} games...')
-        for n_strategy in range(len(self.strategies)):
-            self.run_n_games(n_games_per_rotation, rounds_per_game)
-            self.strategies = [self.strategies.pop()] + self.strategies
+        self._run_rotations(n_games_per_rotation, rounds_per_game)
         self.plot_title = f"rotated strategies, {n_games_per_rotation} games per rotation, {rounds_per_game} rounds " \
                           f"per game "
 
+    @run_method
+    def run_games_until_converged(self, precision=0.02, z=1.96, n_games_per_rotation=20, max_games=10000,
+                                  rounds_per_game=3):
+        """
+        Play batches of games, each rotating the strategies through every seat, until every strategy's win rate is
+        known to within +/- precision, the win rates' intervals no longer overlap so the ranking is settled, or
+        another batch would take the games played over max_games. Intervals are Wilson score intervals, z=1.96 for
+        95% confidence. At least one batch is always played.
+
+        Returns the number of games played, why it stopped ('precision', 'separated' or 'budget') and the win rates
+        of this run with their intervals.
+        """
+        if 'earlier' in self._resume_progress:
+            earlier = self._resume_progress.pop('earlier')
+        else:
+            earlier = deepcopy(self.accumulators['win_rates'])
+        self._progress['earlier'] = earlier
+        batch_size = n_games_per_rotation * len(self.strategies)
+        n_games = self._resume_progress.pop('converged_games', 0)
+        while True:
+            self._progress['converged_games'] = n_games
+            # each rotation replays the batch's games when using common random numbers
+            self._run_rotations(n_games_per_rotation, rounds_per_game, first_game=n_games // len(self.strategies))
+            n_games += batch_size
+            win_rates = self.accumulators['win_rates'].since(earlier)
+            intervals = win_rates.intervals(z)
+            if all(high - low <= 2 * precision for low, high in intervals.values()):
+                reason = 'precision'
+            elif _separated(intervals):
+                reason = 'separated'
+            elif n_games + batch_size > max_games:
+                reason = 'budget'
+            else:
+                continue
+            break
+        logger.log(SIM, f'Stopped after {n_games} games ({reason}).')
+        self.plot_title = f"rotated strategies until converged, {n_games} games, {rounds_per_game} rounds per game"
+        return {
+            'games': n_games,
+            'reason': reason,
+            'win_rates': {
+                strategy_name: {'rate': rate, 'low': intervals[strategy_name][0], 'high': intervals[strategy_name][1]}
+                for strategy_name, rate in win_rates.result().items()
+            }
+        }
+
+    @run_method
     def run_n_games_and_permute_strategies(self, n, rounds_per_game=3):
-        pass
+        """
+        Play n games for every seating of the strategies, choosing up to the rules' max_players of them at a time.
+        """
+        lineups = all_seatings(self.strategies, self.rules.min_players, self.rules.max_players)
+        logger.log(SIM, f'Running {n} games for each of {len(lineups)} permutations...')
+        self._run_schedule(lineups, n, rounds_per_game)
+        self.plot_title = f"permuted strategies, {n} games per permutation, {rounds_per_game} rounds per game"
 
+    @run_method
     def run_n_games_with_all_strategy_combinations(self, n, rounds_per_game=3):
-        pass
+        """
+        Play n games for every line-up of between the rules' min_players and max_players strategies.
+        """
+        lineups = all_lineups(self.strategies, self.rules.min_players, self.rules.max_players)
+        logger.log(SIM, f'Running {n} games for each of {len(lineups)} combinations...')
+        self._run_schedule(lineups, n, rounds_per_game)
+        self.plot_title = f"all strategy combinations, {n} games per combination, {rounds_per_game} rounds per game"
 
     def aggregate_wins(self):
-        wins = {}
-        for game_stat in self.stats:
-            for strategy_name, strategy_stat in game_stat.items():
-                if strategy_name not in wins:
-                    wins[strategy_name] = 0
-                if strategy_stat['rank'] == 1:
-                    wins[strategy_name] += 1
-        return wins
+        return self.accumulators['wins'].result()
 
     def plot_wins(self, save_path):  # pragma: no cover
-        logger.log(SIM, 'Plotting wins...')
-        wins = self.aggregate_wins()
-
-        plot = PrettyPlot()
-        plot.add_bar_chart(
-            list(wins.values()),
-            list(wins.keys()),
-            x_axis_label='Strategies',
-            y_axis_label='Wins',
-            title=self.plot_title
-        )
-        logger.log(SIM, f'Saving plot to file "{save_path}"')
-        plot.save_fig(save_path)
+        plot_wins(self.aggregate_wins(), save_path, self.plot_title)
 
     @property
     def plot_title(self):
@@ -80,3 +304,28 @@ class GameManager:
     @plot_title.setter
     def plot_title(self, title):
         self._plot_title = f'{self._simulation_time}: {title}'
+
+
+def _separated(intervals):
+    """
+    Whether the intervals, ordered by their midpoints, don't overlap.
+    """
+    ordered = sorted(intervals.values(), key=lambda interval: interval[0] + interval[1])
+    return all(lower[1] < higher[0] for lower, higher in zip(ordered, ordered[1:]))
+
+
+def plot_wins(wins, save_path, title=''):  # pragma: no cover
+    """
+    Plot wins per strategy, e.g. from GameManager.aggregate_wins or ResultsStore.aggregate_wins.
+    """
+    logger.log(SIM, 'Plotting wins...')
+    plot = PrettyPlot()
+    plot.add_bar_chart(
+        list(wins.values()),
+        list(wins.keys()),
+        x_axis_label='Strategies',
+        y_axis_label='Wins',
+        title=title
+    )
+    logger.log(SIM, f'Saving plot to file "{save_path}"')
+    plot.save_fig(save_path)
@@ -0,0 +1,114 @@
+from itertools import product
+from types import MappingProxyType
+
+from ShallowOceanExpedition.components.tiles import HOME, LEVELS
+from ShallowOceanExpedition.utils.random_source import DICE
+
+VALUE_RANGES = {1: range(0, 5), 2: range(5, 10), 3: range(10, 15), 4: range(15, 20)}
+
+
+class RuleSet:
+    """
+    The rules of the game, checked and worked through once so every board of a run can share them by reference.
+
+    Rules:
+    - oxygen: oxygen at the start of each round
+    - n_level_1 to n_level_4: number of tiles of each level on a new board
+    - value_ranges: level: range of the values of its tiles, each value in the range being equally likely
+    - dice: number of sides of each of the dice rolled to move
+    - min_players, max_players: number of players allowed at one board
+
+    Worked out from them:
+    - layout: levels of the tiles of a new board, home first
+    - value_lows, value_highs: bounds of the value of each tile of layout, high exclusive
+    - roll_distribution: roll: probability of rolling it
+
+    Rule sets can't be changed once made. They are equal if their rules are, and pickle as just their rules.
+    """
+    __slots__ = ('oxygen', 'n_tiles_per_level', 'value_ranges', 'dice', 'min_players', 'max_players', 'layout',
+                 'value_lows', 'value_highs', 'roll_distribution')
+
+    def __init__(self, oxygen=25, n_level_1=5, n_level_2=5, n_level_3=5, n_level_4=5, value_ranges=None, dice=DICE,
+                 min_players=2, max_players=6):
+        n_tiles_per_level = (n_level_1, n_level_2, n_level_3, n_level_4)
+        value_ranges = VALUE_RANGES if value_ranges is None else value_ranges
+        dice = tuple(dice)
+        if not isinstance(oxygen, int) or oxygen < 0:
+            raise ValueError(f'oxygen must be an integer of at least 0, not {oxygen!r}.')
+        if not all(isinstance(n_tiles, int) and n_tiles >= 0 for n_tiles in n_tiles_per_level):
+            raise ValueError(f'Numbers of tiles must be integers of at least 0, not {n_tiles_per_level}.')
+        if set(value_ranges) != set(LEVELS):
+            raise ValueError(f'value_ranges must give a range for each of the levels {sorted(LEVELS)}.')
+        for level, value_range in value_ranges.items():
+            if not isinstance(value_range, range) or value_range.step != 1 or not len(value_range):
+                raise ValueError(f'Values of level {level} tiles must be a non-empty range with a step of 1.')
+        if not dice or not all(isinstance(sides, int) and sides >= 1 for sides in dice):
+            raise ValueError(f'dice must be the numbers of sides of at least one die, not {dice}.')
+        if not 2 <= min_players <= max_players:
+            raise ValueError('Must allow at least two players, with max_players at least min_players.')
+
+        layout, value_lows, value_highs = [HOME], [], []
+        for level, n_tiles in zip(sorted(LEVELS), n_tiles_per_level):
+            layout.extend([LEVELS[level]] * n_tiles)
+            value_lows.extend([value_ranges[level].start] * n_tiles)
+            value_highs.extend([value_ranges[level].stop] * n_tiles)
+        roll_distribution = {}
+        n_outcomes = 1
+        for sides in dice:
+            n_outcomes *= sides
+        for faces in product(*[range(1, sides + 1) for sides in dice]):
+            roll_distribution[sum(faces)] = roll_distribution.get(sum(faces), 0) + 1 / n_outcomes
+
+        set_slot = super().__setattr__
+        set_slot('oxygen', oxygen)
+        set_slot('n_tiles_per_level', n_tiles_per_level)
+        set_slot('value_ranges', MappingProxyType(dict(value_ranges)))
+        set_slot('dice', dice)
+        set_slot('min_players', min_players)
+        set_slot('max_players', max_players)
+        set_slot('layout', tuple(layout))
+        set_slot('value_lows', tuple(value_lows))
+        set_slot('value_highs', tuple(value_highs))
+        set_slot('roll_distribution', MappingProxyType(dict(sorted(roll_distribution.items()))))
+
+    def _rules(self):
+        return (self.oxygen,) + self.n_tiles_per_level + (dict(self.value_ranges), self.dice, self.min_players,
+                                                          self.max_players)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Rule sets cannot be changed.')
+
+    def __delattr__(self, name):
+        raise AttributeError('Rule sets cannot be changed.')
+
+    def __eq__(self, other):
+        if not isinstance(other, RuleSet):
+            return NotImplemented
+        return self._rules() == other._rules()
+
+    def __hash__(self):
+        return hash((self.oxygen, self.n_tiles_per_level, tuple(sorted(self.value_ranges.items())), self.dice,
+                     self.min_players, self.max_players))
+
+    def __reduce__(self):
+        return RuleSet, self._rules()
+
+    def __repr__(self):  # pragma: no cover
+        return f'RuleSet{self._rules()}'
+
+
+DEFAULT_RULES = RuleSet()
+
+
+def rules_from(rules=None, **rule_params):
+    """
+    rules, or a rule set made from rule_params if not given, DEFAULT_RULES if neither are.
+    """
+    if rules is not None:
+        if not isinstance(rules, RuleSet):
+            raise TypeError(f'rules must be a RuleSet, not {type(rules).__name__}. Give single rules by keyword, '
+                            f'e.g. oxygen=30.')
+        if rule_params:
+            raise ValueError('Give either a rule set or rules, not both.')
+        return rules
+    return RuleSet(**rule_params) if rule_params else DEFAULT_RULES
@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+import signal
+from collections.abc import Mapping
+from time import process_time
+
+from ShallowOceanExpedition.components.strategy import DefaultStrategy, CALLBACKS, load_strategy
+from ShallowOceanExpedition.components.views import SequenceView
+from ShallowOceanExpedition.utils.logging import logger, GAME
+
+
+class ForfeitStrategy(DefaultStrategy):
+    """
+    Heads straight back without collecting or dropping anything, a fallback that forfeits the rest of the game.
+    """
+
+    @staticmethod
+    def decide_direction(player, board, others):
+        return not player['changed_direction']
+
+    @staticmethod
+    def tile_collect(player, board, others):
+        return False
+
+    @staticmethod
+    def tile_drop(player, board, others):
+        return False, None
+
+
+class SandboxedStrategy:
+    """
+    Stands in for an untrusted strategy, running it in its own process so it can't hold up or interfere with the
+    game.
+
+    Each decision is sent to the process as plain copies of the views, without the board's rollouts, and must come
+    back within decision_timeout seconds, otherwise the process is killed (and restarted for the next decision) and
+    the decision is taken by fallback, DefaultStrategy unless given. Decisions that raise are also taken by fallback.
+    The CPU time the strategy uses is counted per game, a timeout counting as decision_timeout, and once over
+    cpu_budget seconds fallback takes every decision for the rest of the game. Pass fallback=ForfeitStrategy(name)
+    to forfeit instead.
+
+    strategy can also be an import path, 'package.module:ClassName', with player_name, for code that shouldn't be
+    imported here. It is then only imported in the strategy's process, which is started straight away so that a
+    strategy failing to load, or taking longer than load_timeout seconds, raises ImportError.
+    """
+
+    def __init__(self, strategy, decision_timeout=0.1, cpu_budget=1.0, fallback=None, player_name=None,
+                 load_timeout=10.0):
+        self._process = None  # set first, close is called even if this fails
+        self._connection = None
+        if isinstance(strategy, str) and player_name is None:
+            raise ValueError('player_name is required when strategy is an import path')
+        self.strategy = strategy
+        self.player_name = strategy.player_name if player_name is None else player_name
+        self.decision_timeout = decision_timeout
+        self.cpu_budget = cpu_budget
+        self.load_timeout = load_timeout
+        self.fallback = DefaultStrategy(self.player_name) if fallback is None else fallback
+        self.timeouts = 0
+        self.errors = 0
+        self.games_over_budget = 0
+        self._cpu_used = 0.0
+        if isinstance(strategy, str):
+            self._start()
+
+    def new_game(self):
+        # called by the board as each game starts
+        self._cpu_used = 0.0
+
+    def decide_direction(self, player, board, others):
+        return self._decide('decide_direction', player, board, others)
+
+    def tile_collect(self, player, board, others):
+        return self._decide('tile_collect', player, board, others)
+
+    def tile_drop(self, player, board, others):
+        return self._decide('tile_drop', player, board, others)
+
+    def _decide(self, callback, player, board, others):
+        if self._cpu_used > self.cpu_budget:
+            return getattr(self.fallback, callback)(player, board, others)
+        if self._process is None:
+            self._start()
+        self._connection.send((callback, _snapshot(player), _snapshot(board),
+                               {name: _snapshot(view) for name, view in others.items()}))
+        if self._connection.poll(self.decision_timeout):
+            succeeded, decision, cpu_seconds = self._connection.recv()
+            self._use_cpu(cpu_seconds)
+            if succeeded:
+                return decision
+            self.errors += 1
+            logger.log(GAME, '- %s raised %s, falling back to %s.', self.player_name, decision,
+                       type(self.fallback).__name__)
+        else:
+            self.timeouts += 1
+            self._use_cpu(self.decision_timeout)
+            logger.log(GAME, '- %s took longer than %ss to decide, falling back to %s.', self.player_name,
+                       self.decision_timeout, type(self.fallback).__name__)
+            self.close()
+        return getattr(self.fallback, callback)(player, board, others)
+
+    def _use_cpu(self, cpu_seconds):
+        within_budget = self._cpu_used <= self.cpu_budget
+        self._cpu_used += cpu_seconds
+        if within_budget and self._cpu_used > self.cpu_budget:
+            self.games_over_budget += 1
+            logger.log(GAME, '- %s used up its CPU budget of %ss for this game.', self.player_name, self.cpu_budget)
+
+    def _start(self):
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, daemon=True,
+                                                args=(child_connection, self.strategy, self.player_name))
+        self._process.start()
+        child_connection.close()
+        if not self._connection.poll(self.load_timeout):
+            self.close()
+            raise ImportError(f'{self.strategy} took longer than {self.load_timeout}s to load.')
+        loaded, error = self._connection.recv()
+        if not loaded:
+            self.close()
+            raise ImportError(f'{self.strategy} failed to load: {error}')
+
+    def close(self):
+        """
+        Stop the strategy's process, it is started again if another decision is asked for.
+        """
+        if self._process is None:
+            return
+        self._connection.close()
+        self._process.terminate()
+        self._process.join(1)
+        if self._process.is_alive():  # pragma: no cover
+            # ignored SIGTERM
+            os.kill(self._process.pid, signal.SIGKILL)
+            self._process.join()
+        self._process = None
+        self._connection = None
+
+    def __getstate__(self):
+        # the process stays with this copy, a copy sent to another process starts its own
+        state = dict(self.__dict__)
+        state.update(_process=None, _connection=None)
+        return state
+
+    def __del__(self):
+        self.close()
+
+
+def _snapshot(view):
+    return {
+        key: dict(value) if isinstance(value, Mapping) else list(value) if isinstance(value, SequenceView) else value
+        for key, value in view.items()
+    }
+
+
+def _serve(connection, strategy, player_name):
+    """
+    Run in the strategy's process, loading the strategy if given its import path, then making each decision asked
+    for and sending back the decision, or the error raised, with the CPU time it took.
+    """
+    try:
+        if isinstance(strategy, str):
+            strategy = load_strategy(strategy, player_name)
+    except Exception as error:
+        connection.send((False, repr(error)))
+        return
+    connection.send((True, None))
+    callbacks = {callback: getattr(strategy, callback) for callback in CALLBACKS}
+    while True:
+        try:
+            callback, player, board, others = connection.recv()
+        except EOFError:
+            return
+        start = process_time()
+        try:
+            decision, succeeded = callbacks[callback](player, board, others), True
+        except Exception as error:
+            decision, succeeded = repr(error), False
+        connection.send((succeeded, decision, process_time() - start))
@@ -0,0 +1,131 @@
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations, combinations
+
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.rules import DEFAULT_RULES
+from ShallowOceanExpedition.utils.random_source import RandomSource, game_random_source
+
+MIN_PLAYERS = DEFAULT_RULES.min_players
+MAX_PLAYERS = DEFAULT_RULES.max_players
+
+WorkUnit = namedtuple('WorkUnit', ['lineup_index', 'n_games', 'seed', 'first_game'])
+
+
+def all_seatings(strategies, min_players=MIN_PLAYERS, max_players=MAX_PLAYERS):
+    """
+    Every ordering of the strategies at one table, or of every choice of max_players strategies if there are more
+    strategies than seats. An empty list if there are fewer than min_players strategies.
+    """
+    if len(strategies) < min_players:
+        return []
+    return list(permutations(strategies, min(len(strategies), max_players)))
+
+
+def all_lineups(strategies, min_players=MIN_PLAYERS, max_players=MAX_PLAYERS):
+    """
+    Every choice of between min_players and max_players strategies, each in the order given.
+    """
+    return [lineup for n_players in range(min_players, min(len(strategies), max_players) + 1)
+            for lineup in combinations(strategies, n_players)]
+
+
+def lineups_including(newcomer, strategies, min_players=MIN_PLAYERS, max_players=MAX_PLAYERS):
+    """
+    Every line-up of the newcomer with between min_players - 1 and max_players - 1 of the other strategies, in every
+    rotation of the seats so no strategy always gets to go first.
+    """
+    lineups = []
+    for n_others in range(max(min_players - 1, 1), min(len(strategies), max_players - 1) + 1):
+        for others in combinations(strategies, n_others):
+            lineup = others + (newcomer,)
+            lineups.extend(lineup[seat:] + lineup[:seat] for seat in range(len(lineup)))
+    return lineups
+
+
+class Scheduler:
+    """
+    Splits n games of each line-up into work units of at most games_per_unit games and plays them, concurrently in
+    a process pool if workers > 1.
+
+    Each work unit has its own seed drawn from seed when the schedule is made, so results don't depend on the
+    number of workers. Results are yielded in schedule order, tagged with the line-up they came from.
+
+    With a common_seed, game n of every line-up is instead played with the random numbers of
+    game_random_source(common_seed, first_game + n), so line-ups are compared on the same dice and tiles.
+    """
+
+    def __init__(self, lineups, n_games_per_lineup, games_per_unit=100, seed=None, common_seed=None, first_game=0):
+        self.lineups = [tuple(lineup) for lineup in lineups]
+        self.common_seed = common_seed
+        seeds = random.Random(seed)
+        self.work_units = [
+            WorkUnit(lineup_index, min(games_per_unit, n_games_per_lineup - start), seeds.getrandbits(32),
+                     first_game + start)
+            for lineup_index in range(len(self.lineups))
+            for start in range(0, n_games_per_lineup, games_per_unit)
+        ]
+
+    @property
+    def n_games(self):
+        return sum(work_unit.n_games for work_unit in self.work_units)
+
+    def run(self, board_params, rounds_per_game, accumulators, keep_stats=False, workers=1, first_unit=0):
+        """
+        Yields the line-up (as a tuple of player names), number of games, accumulators and, if keep_stats, per game
+        stats of each work unit in turn, skipping the work units before first_unit. Each work unit starts from an
+        empty copy of accumulators.
+        """
+        work_units = self.work_units[first_unit:]
+        args = (
+            [self.lineups[work_unit.lineup_index] for work_unit in work_units],
+            [board_params] * len(work_units),
+            [work_unit.n_games for work_unit in work_units],
+            [rounds_per_game] * len(work_units),
+            [work_unit.seed for work_unit in work_units],
+            [accumulators] * len(work_units),
+            [keep_stats] * len(work_units),
+            [self.common_seed] * len(work_units),
+            [work_unit.first_game for work_unit in work_units]
+        )
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map yields in submission order, keeping results deterministic
+                yield from self._tag(work_units, executor.map(play_games, *args))
+        else:
+            yield from self._tag(work_units, map(play_games, *args))
+
+    def _tag(self, work_units, results):
+        for work_unit, (unit_accumulators, unit_stats) in zip(work_units, results):
+            lineup = tuple(strategy.player_name for strategy in self.lineups[work_unit.lineup_index])
+            yield lineup, work_unit.n_games, unit_accumulators, unit_stats
+
+
+def play_games(strategies, board_params, n_games, rounds_per_game, seed, accumulators, keep_stats=False,
+               common_seed=None, first_game=0):
+    """
+    Play n_games in the current process, used as the unit of work for process pools. Returns the updated
+    accumulators and, if keep_stats, the stats of each game.
+    """
+    accumulators = {name: accumulator.empty_copy() for name, accumulator in accumulators.items()}
+    random_source = RandomSource(seed)
+    stats = []
+    board = None
+    for n_game in range(first_game, first_game + n_games):
+        if common_seed is not None:
+            random_source = game_random_source(common_seed, n_game)
+        if board is None:
+            board = Board(strategies, random_source=random_source, timings=accumulators.get('timings'),
+                          **board_params)
+        else:
+            board.reset(random_source)
+        for _ in range(rounds_per_game):
+            board.play_round()
+        game_stats = board.get_stats()
+        board.print_end_game_summary()
+        for accumulator in accumulators.values():
+            accumulator.update(game_stats)
+        if keep_stats:
+            stats.append(game_stats)
+    return accumulators, stats
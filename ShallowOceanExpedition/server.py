@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+from ShallowOceanExpedition.components.strategy import load_strategy
+from ShallowOceanExpedition.rules import rules_from
+from ShallowOceanExpedition.sandbox import SandboxedStrategy
+from ShallowOceanExpedition.scheduler import Scheduler, lineups_including
+from ShallowOceanExpedition.utils.accumulators import WinCounter, ScoreMoments
+from ShallowOceanExpedition.utils.logging import logger, SIM
+from ShallowOceanExpedition.utils.results_store import ResultsStore
+
+
+class GameServer:
+    """
+    Ranks submitted strategies against each other.
+
+    Strategies are submitted as an import path ('package.module:ClassName') of a DefaultStrategy subclass and a
+    player name. On each submission only the line-ups including the new strategy are played, n_games for every
+    rotation of the seats, and the results are added to the leaderboard. Submissions, the leaderboard and every
+    game's results are kept in data_dir so the server can be restarted. Submitted code is imported and run, only
+    serve on localhost.
+
+    With sandboxed=True each strategy is imported and runs in its own process, never in the server's, with
+    decision_timeout seconds per decision and cpu_budget seconds of CPU per game, see SandboxedStrategy, so a slow
+    strategy can't hold up the others. This limits time, it is not a security boundary.
+    """
+
+    def __init__(self, data_dir, n_games=100, rounds_per_game=3, workers=1, seed=None, sandboxed=False,
+                 decision_timeout=0.1, cpu_budget=1.0, rules=None, **board_params):
+        self.data_dir = data_dir
+        self.n_games = n_games
+        self.rounds_per_game = rounds_per_game
+        self.workers = workers
+        self.seed = seed
+        self.rules = rules_from(rules, **board_params)
+        self.board_params = {'rules': self.rules}
+        self.sandboxed = sandboxed
+        self.decision_timeout = decision_timeout
+        self.cpu_budget = cpu_budget
+        os.makedirs(data_dir, exist_ok=True)
+        self.results_store = ResultsStore(os.path.join(data_dir, 'results'))
+        self.strategies = {}
+        self.strategy_paths = {}
+        self.wins = WinCounter()
+        self.scores = ScoreMoments()
+        self._lock = threading.Lock()  # held while the strategies and leaderboard change
+        self._submit_lock = threading.Lock()  # one submission at a time
+        self._load()
+
+    @property
+    def _state_path(self):
+        return os.path.join(self.data_dir, 'state.json')
+
+    def _load(self):
+        try:
+            with open(self._state_path) as state_file:
+                state = json.load(state_file)
+        except FileNotFoundError:
+            return
+        for name, strategy_path in state['strategies'].items():
+            self.strategies[name] = self._load_strategy(strategy_path, name)
+            self.strategy_paths[name] = strategy_path
+        self.wins.wins = state['wins']
+        self.scores.moments = state['scores']
+
+    def _load_strategy(self, strategy_path, player_name):
+        if self.sandboxed:
+            # imported in the strategy's process only
+            return SandboxedStrategy(strategy_path, self.decision_timeout, self.cpu_budget, player_name=player_name)
+        return load_strategy(strategy_path, player_name)
+
+    def _save(self):
+        state = {'strategies': self.strategy_paths, 'wins': self.wins.wins, 'scores': self.scores.moments}
+        with open(self._state_path + '.tmp', 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(self._state_path + '.tmp', self._state_path)
+
+    def submit(self, strategy_path, player_name):
+        with self._submit_lock:
+            if player_name in self.strategies:
+                raise ValueError(f'A strategy is already submitted for {player_name}.')
+            strategy = self._load_strategy(strategy_path, player_name)
+            lineups = lineups_including(strategy, list(self.strategies.values()), self.rules.min_players,
+                                        self.rules.max_players)
+            logger.log(SIM, f'Evaluating {player_name} in {len(lineups)} line-ups...')
+            mark = self.results_store.mark()
+            try:
+                wins, scores = self._play(lineups)
+            except BaseException:
+                # keep the results store in step with the saved leaderboard
+                self.results_store.rewind(mark)
+                raise
+            # the leaderboard shows the submission once all its games are played
+            with self._lock:
+                self.wins.merge(wins)
+                self.scores.merge(scores)
+                self.strategies[player_name] = strategy
+                self.strategy_paths[player_name] = strategy_path
+                self._save()
+        return self.leaderboard()
+
+    def _play(self, lineups):
+        seed = None if self.seed is None else self.seed + len(self.strategies)
+        scheduler = Scheduler(lineups, self.n_games, seed=seed)
+        accumulators = {'wins': WinCounter(), 'scores': ScoreMoments()}
+        wins, scores = WinCounter(), ScoreMoments()
+        for _, _, unit_accumulators, unit_stats in scheduler.run(self.board_params, self.rounds_per_game,
+                                                                 accumulators, keep_stats=True, workers=self.workers):
+            wins.merge(unit_accumulators['wins'])
+            scores.merge(unit_accumulators['scores'])
+            for game_stats in unit_stats:
+                self.results_store.append(game_stats)
+        self.results_store.flush()
+        return wins, scores
+
+    def leaderboard(self):
+        # copied under the lock, a submission may be updating them
+        with self._lock:
+            names = list(self.strategies)
+            wins = dict(self.wins.wins)
+            scores = self.scores.result()
+        leaderboard = []
+        for name in names:
+            games = scores[name]['games'] if name in scores else 0
+            leaderboard.append({
+                'name': name,
+                'wins': wins.get(name, 0),
+                'games': games,
+                'win_rate': wins.get(name, 0) / games if games else 0.0,
+                'mean_score': scores[name]['mean'] if name in scores else 0.0
+            })
+        return sorted(leaderboard, key=lambda entry: entry['win_rate'], reverse=True)
+
+    def serve(self, host='127.0.0.1', port=8080):  # pragma: no cover
+        http_server = self.make_http_server(host, port)
+        logger.log(SIM, f'Serving on http://{host}:{http_server.server_port}')
+        try:
+            http_server.serve_forever()
+        finally:
+            http_server.server_close()
+
+    def make_http_server(self, host='127.0.0.1', port=8080):
+        game_server = self
+
+        class Handler(GameServerRequestHandler):
+            server_version = 'ShallowOceanExpedition'
+
+        Handler.game_server = game_server
+        return ThreadingHTTPServer((host, port), Handler)
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class GameServerRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /leaderboard: the current leaderboard.
+    POST /strategies with a JSON body {"name": ..., "strategy": "package.module:ClassName"}: submit a strategy and
+    return the updated leaderboard once its games have been played.
+    """
+    game_server = None
+
+    def do_GET(self):
+        if self.path == '/leaderboard':
+            self._respond(200, self.game_server.leaderboard())
+        else:
+            self._respond(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/strategies':
+            self._respond(404, {'error': f'Unknown path {self.path}'})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            leaderboard = self.game_server.submit(body['strategy'], body['name'])
+        except (ValueError, KeyError, TypeError, ImportError, AttributeError) as error:
+            self._respond(400, {'error': str(error)})
+        else:
+            self._respond(201, leaderboard)
+
+    def _respond(self, status, body):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        logger.log(SIM, format, *args)
+
+
+def main():  # pragma: no cover
+    parser = argparse.ArgumentParser(description='Rank submitted strategies against each other.')
+    parser.add_argument('--data-dir', default='game_server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--games', type=int, default=100, help='games per seating of each line-up')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--sandbox', action='store_true', help='run each strategy in its own process with limits')
+    parser.add_argument('--decision-timeout', type=float, default=0.1, help='seconds allowed per decision')
+    parser.add_argument('--cpu-budget', type=float, default=1.0, help='CPU seconds allowed per strategy per game')
+    args = parser.parse_args()
+    GameServer(args.data_dir, n_games=args.games, workers=args.workers, sandboxed=args.sandbox,
+               decision_timeout=args.decision_timeout, cpu_budget=args.cpu_budget).serve(args.host, args.port)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,291 @@
+import heapq
+from itertools import chain
+
+import numpy as np
+
+from ShallowOceanExpedition.components.tiles import HOME, LEVELS
+from ShallowOceanExpedition.rules import rules_from
+from ShallowOceanExpedition.utils.exceptions import Cheating, RuleViolation
+from ShallowOceanExpedition.utils.logging import logger, SIM
+
+BASE_LEVELS = sorted(LEVELS)
+NO_TILES = ((), ())  # a player's tiles held, see _Solver
+
+
+def solve(strategies, rounds_per_game=3, rules=None, **rule_params):
+    """
+    Exact outcomes of a game between strategies, worked out by following every state the game can reach with its
+    probability rather than by playing games.
+
+    Games play exactly as on a Board, rolling with the rules' roll distribution. Strategies can't see tile values,
+    only their levels, so tile values are left out of the states and each player's score distribution is worked out
+    from the levels of the tiles they bank. Strategies are passed the usual views but without 'bank' or rollouts,
+    decisions depending on them can't be solved this way.
+
+    Equal states reached by different routes are merged, so the work grows with the number of distinct states rather
+    than games. States hold only what strategies can see and what changes later turns, but that still grows
+    exponentially with the tiles, the oxygen and the rounds, at roughly 25us and 0.5kB a state. Measured for two
+    DefaultStrategy players over three rounds:
+    - 1 tile per level, oxygen 25: 1k states, 0.02s
+    - tiles (2, 2, 1, 1), oxygen 25: 62k states, 1.5s
+    - tiles (2, 2, 2, 1), oxygen 10: 440k states, 10s, 155MB
+    - 2 tiles per level, oxygen 10: 1M states, 27s and 465MB for the first two rounds alone, the third round didn't
+      finish in 20 minutes
+    More players crowd a small board, so take fewer states (three players on (2, 2, 1, 1) tiles at oxygen 10: 10k).
+    The default board, 5 tiles per level with oxygen 25, is far out of reach.
+
+    Returns strategy name: {'score': expected score, 'scores': {score: probability}, 'win': probability of ranking
+    first, 'deaths': probability of dying in each round}, as estimated by the accumulators of a GameManager.
+    """
+    rules = rules_from(rules, **rule_params)
+    if not rules.min_players <= len(strategies) <= rules.max_players:
+        raise ValueError(f'Must supply {rules.min_players} to {rules.max_players} strategies')
+    solver = _Solver(strategies, rounds_per_game, rules)
+    solver.run()
+    return solver.result()
+
+
+class _Solver:
+    """
+    States are (round number, oxygen, tile levels, current seat, players), a player being (position, direction,
+    tiles held, turn number, back home). Tiles held are the levels and numbers of tiles held of each, in the order
+    of Player.tile_summary, and the levels in the order collected, which make the stack left if the player dies.
+    Each state reached has the probabilities of the numbers of tiles of each level banked by the players so far,
+    which don't change how the game goes so are kept apart to let more states merge.
+    """
+
+    def __init__(self, strategies, rounds_per_game, rules):
+        self.strategies = strategies
+        self.names = [strategy.player_name for strategy in strategies]
+        self.rounds_per_game = rounds_per_game
+        self.rules = rules
+        self.deaths = [[0.0] * rounds_per_game for _ in strategies]
+        self.outcomes = {}  # tiles banked per level by each player: probability
+        self.n_states = 0
+
+    def run(self):
+        no_tiles = (0,) * len(BASE_LEVELS)
+        banked = {tuple(no_tiles for _ in self.strategies): 1.0}
+        players = tuple((0, 1, NO_TILES, 0, False) for _ in self.strategies)
+        self._buckets = {}
+        self._keys = []
+        if self.rounds_per_game > 0:
+            self._add((0, self.rules.oxygen, self.rules.layout, 0, players), banked)
+        else:
+            self.outcomes = banked
+        # every turn moves a state to a later key, so a state's probabilities are complete once its key comes up
+        while self._keys:
+            states = self._buckets.pop(heapq.heappop(self._keys))
+            self.n_states += len(states)
+            for state, banked in states.items():
+                self._take_turn(state, banked)
+        logger.log(SIM, f'Solved {self.n_states} states.')
+
+    def _add(self, state, banked):
+        round_number, _, _, _, players = state
+        key = (round_number, sum(player[4] for player in players),
+               sum(player[3] for player in players if not player[4]))
+        states = self._buckets.get(key)
+        if states is None:
+            states = self._buckets[key] = {}
+            heapq.heappush(self._keys, key)
+        state_banked = states.get(state)
+        if state_banked is None:
+            states[state] = banked
+        else:
+            for tiles, probability in banked.items():
+                state_banked[tiles] = state_banked.get(tiles, 0.0) + probability
+
+    def _take_turn(self, state, banked):
+        round_number, oxygen, levels, seat, players = state
+        if oxygen <= 0:
+            self._end_round(round_number, levels, seat, players, banked)
+            return
+        position, direction, held, n_turn, _ = players[seat]
+        strategy = self.strategies[seat]
+        n_held = len(held[1])
+        oxygen -= n_held
+        if strategy.decide_direction(*self._views(seat, round_number, oxygen, levels, players)):
+            if direction == -1:
+                raise Cheating('You cant turn around again you cheating bugger!')
+            direction = -1
+
+        occupied = {player[0] for other_seat, player in enumerate(players) if other_seat != seat and player[0]}
+        landings = {}
+        for roll, roll_probability in self.rules.roll_distribution.items():
+            new_position = _new_position(position, direction, max(roll - n_held, 0), occupied, len(levels))
+            landings[new_position] = landings.get(new_position, 0.0) + roll_probability
+
+        n_players = len(players)
+        for new_position, roll_probability in landings.items():
+            new_levels = levels
+            landed_on = levels[new_position]
+            if landed_on == HOME:
+                player = (0, 1, NO_TILES, 0, True)
+                new_banked = {}
+                for tiles, probability in banked.items():
+                    tiles = tiles[:seat] + (_bank(tiles[seat], held),) + tiles[seat + 1:]
+                    new_banked[tiles] = new_banked.get(tiles, 0.0) + probability * roll_probability
+            else:
+                player = (new_position, direction, held, n_turn + 1, False)
+                new_players = players[:seat] + (player,) + players[seat + 1:]
+                views = self._views(seat, round_number, oxygen, levels, new_players)
+                if landed_on is None:
+                    do_drop, tile_level = strategy.tile_drop(*views)
+                    if do_drop:
+                        player = (new_position, direction, _drop(held, tile_level), n_turn + 1, False)
+                        new_levels = levels[:new_position] + (tile_level,) + levels[new_position + 1:]
+                elif strategy.tile_collect(*views):
+                    player = (new_position, direction, _collect(held, landed_on), n_turn + 1, False)
+                    new_levels = levels[:new_position] + (None,) + levels[new_position + 1:]
+                new_banked = {tiles: probability * roll_probability for tiles, probability in banked.items()}
+            new_players = players[:seat] + (player,) + players[seat + 1:]
+            next_seat = (seat + 1) % n_players
+            if all(player[4] for player in new_players):
+                self._end_round(round_number, new_levels, seat, new_players, new_banked)
+            elif oxygen <= 0:
+                # the next seat's turn ends the round straight away
+                self._end_round(round_number, new_levels, next_seat, new_players, new_banked)
+            else:
+                while new_players[next_seat][4]:
+                    next_seat = (next_seat + 1) % n_players
+                self._add((round_number, oxygen, new_levels, next_seat, new_players), new_banked)
+
+    def _end_round(self, round_number, levels, seat, players, banked):
+        probability = sum(banked.values())
+        stacks = {}
+        for n_player, (position, _, (_, collected), _, back_home) in enumerate(players):
+            if not back_home:
+                self.deaths[n_player][round_number] += probability
+                if collected:
+                    stacks[position] = tuple(chain.from_iterable(collected))
+        # every player is back at the start, so the seat to go first is the one whose turn it was
+        round_number += 1
+        if round_number == self.rounds_per_game:
+            for tiles, probability in banked.items():
+                self.outcomes[tiles] = self.outcomes.get(tiles, 0.0) + probability
+            return
+        levels = tuple(level for level in levels if level) + tuple(stacks[position] for position in sorted(stacks))
+        players = tuple((0, 1, NO_TILES, 0, False) for _ in players)
+        self._add((round_number, self.rules.oxygen, levels, seat, players), banked)
+
+    def _views(self, seat, round_number, oxygen, levels, players):
+        board = {'tiles': levels, 'round_number': round_number, 'oxygen': oxygen}
+        views = [_player_view(player) for player in players]
+        others = {name: view for other_seat, (name, view) in enumerate(zip(self.names, views)) if other_seat != seat}
+        return views[seat], board, others
+
+    def result(self):
+        value_distributions = {level: _uniform(self.rules.value_ranges[level]) for level in BASE_LEVELS}
+        score_distributions = {}
+
+        def score_distribution(banked):
+            if banked not in score_distributions:
+                distribution = np.ones(1)
+                for level, n_tiles in zip(BASE_LEVELS, banked):
+                    for _ in range(n_tiles):
+                        distribution = np.convolve(distribution, value_distributions[level])
+                low = sum(n_tiles * self.rules.value_ranges[level].start
+                          for level, n_tiles in zip(BASE_LEVELS, banked))
+                score_distributions[banked] = low, distribution
+            return score_distributions[banked]
+
+        scores = [{} for _ in self.strategies]
+        wins = [0.0] * len(self.strategies)
+        for outcome, probability in self.outcomes.items():
+            distributions = [score_distribution(banked) for banked in outcome]
+            for n_player, (low, distribution) in enumerate(distributions):
+                for score, score_probability in enumerate(distribution.tolist(), low):
+                    scores[n_player][score] = scores[n_player].get(score, 0.0) + probability * score_probability
+                wins[n_player] += probability * _win_probability(n_player, distributions)
+
+        return {
+            name: {
+                'score': sum(score * score_probability for score, score_probability in player_scores.items()),
+                'scores': dict(sorted(player_scores.items())),
+                'win': player_wins,
+                'deaths': player_deaths
+            }
+            for name, player_scores, player_wins, player_deaths in zip(self.names, scores, wins, self.deaths)
+        }
+
+
+def _new_position(position, direction, moves, occupied, n_tiles):
+    """
+    As Board._calculate_new_position, occupied being the positions of the other players away from home.
+    """
+    new_position = position
+    while moves:
+        new_position += direction
+        if new_position not in occupied:
+            moves -= 1
+    if direction == 1:
+        new_position = min(n_tiles - 1, new_position)
+        while new_position > position and new_position in occupied:
+            new_position -= 1
+    else:
+        new_position = max(0, new_position)
+    if new_position in occupied:
+        raise RuleViolation('Cannot move onto another player.')
+    return new_position
+
+
+def _bank(banked, held):
+    """
+    banked, numbers of tiles banked per level, with the tiles in held added.
+    """
+    banked = list(banked)
+    for level, n_tiles in held[0]:
+        for base_level in level:
+            banked[base_level - 1] += n_tiles
+    return tuple(banked)
+
+
+def _collect(held, tile_level):
+    summary, collected = held
+    tile_counts = dict(summary)
+    tile_counts[tile_level] = tile_counts.get(tile_level, 0) + 1
+    return tuple(tile_counts.items()), collected + (tile_level,)
+
+
+def _drop(held, tile_level):
+    """
+    held without the first collected tile of tile_level, as Player.drop_tile.
+    """
+    summary, collected = held
+    if not collected:
+        raise RuleViolation('No tiles to drop.')
+    if tile_level not in collected:
+        raise ValueError(f'No tile of level {tile_level} held.')
+    tile_counts = dict(summary)
+    if tile_counts[tile_level] == 1:
+        del tile_counts[tile_level]
+    else:
+        tile_counts[tile_level] -= 1
+    index = collected.index(tile_level)
+    return tuple(tile_counts.items()), collected[:index] + collected[index + 1:]
+
+
+def _player_view(player):
+    position, direction, (summary, _), n_turn, _ = player
+    return {'tiles': dict(summary), 'position': position, 'changed_direction': not direction > 0,
+            'turn_number': n_turn}
+
+
+def _uniform(value_range):
+    return np.full(len(value_range), 1 / len(value_range))
+
+
+def _win_probability(n_player, distributions):
+    """
+    Probability the player's score is the highest, ties included, and above 0, i.e. they rank first.
+    """
+    low, distribution = distributions[n_player]
+    scores = np.arange(low, low + len(distribution))
+    win = distribution * (scores > 0)
+    for other, (other_low, other_distribution) in enumerate(distributions):
+        if other != n_player:
+            # probability the other player scores no more than each of the player's scores
+            cumulative = np.concatenate(([0.0], np.cumsum(other_distribution)))
+            win = win * cumulative[np.clip(scores - other_low + 1, 0, len(other_distribution))]
+    return float(win.sum())
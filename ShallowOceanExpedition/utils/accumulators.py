@@ -0,0 +1,190 @@
+from math import sqrt
+
+
+class Accumulator:
+    """
+    Online statistic over games, updated in O(1) per game with the stats from Board.get_stats.
+
+    Subclasses implement update, merge (combining an accumulator of the same type built elsewhere, e.g. in a worker
+    process) and result.
+    """
+
+    def update(self, game_stats):
+        raise NotImplementedError
+
+    def merge(self, other):
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+    def empty_copy(self):
+        return type(self)()
+
+
+class WinCounter(Accumulator):
+    def __init__(self):
+        self.wins = {}
+
+    def update(self, game_stats):
+        for strategy_name, strategy_stat in game_stats.items():
+            if strategy_name not in self.wins:
+                self.wins[strategy_name] = 0
+            if strategy_stat['rank'] == 1:
+                self.wins[strategy_name] += 1
+
+    def merge(self, other):
+        for strategy_name, wins in other.wins.items():
+            self.wins[strategy_name] = self.wins.get(strategy_name, 0) + wins
+
+    def result(self):
+        return dict(self.wins)
+
+
+class RankHistogram(Accumulator):
+    def __init__(self):
+        self.ranks = {}
+
+    def update(self, game_stats):
+        for strategy_name, strategy_stat in game_stats.items():
+            ranks = self.ranks.setdefault(strategy_name, {})
+            ranks[strategy_stat['rank']] = ranks.get(strategy_stat['rank'], 0) + 1
+
+    def merge(self, other):
+        for strategy_name, other_ranks in other.ranks.items():
+            ranks = self.ranks.setdefault(strategy_name, {})
+            for rank, count in other_ranks.items():
+                ranks[rank] = ranks.get(rank, 0) + count
+
+    def result(self):
+        return {strategy_name: dict(ranks) for strategy_name, ranks in self.ranks.items()}
+
+
+class ScoreMoments(Accumulator):
+    """
+    Running mean and variance of each strategy's score using Welford's algorithm.
+    """
+
+    def __init__(self):
+        self.moments = {}  # strategy name: [count, mean, sum of squared differences from the mean]
+
+    def update(self, game_stats):
+        for strategy_name, strategy_stat in game_stats.items():
+            moments = self.moments.setdefault(strategy_name, [0, 0.0, 0.0])
+            moments[0] += 1
+            delta = strategy_stat['score'] - moments[1]
+            moments[1] += delta / moments[0]
+            moments[2] += delta * (strategy_stat['score'] - moments[1])
+
+    def merge(self, other):
+        for strategy_name, (other_count, other_mean, other_m2) in other.moments.items():
+            moments = self.moments.setdefault(strategy_name, [0, 0.0, 0.0])
+            count = moments[0] + other_count
+            if not count:
+                continue
+            delta = other_mean - moments[1]
+            moments[2] += other_m2 + delta ** 2 * moments[0] * other_count / count
+            moments[1] += delta * other_count / count
+            moments[0] = count
+
+    def result(self):
+        return {
+            strategy_name: {
+                'games': count,
+                'mean': mean,
+                'variance': m2 / (count - 1) if count > 1 else 0.0
+            } for strategy_name, (count, mean, m2) in self.moments.items()
+        }
+
+
+class DeathsPerRound(Accumulator):
+    def __init__(self):
+        self.deaths = {}  # strategy name: deaths per round number
+        self.games = {}
+
+    def update(self, game_stats):
+        for strategy_name, strategy_stat in game_stats.items():
+            deaths = self.deaths.setdefault(strategy_name, [])
+            for round_number, died in enumerate(strategy_stat['deaths']):
+                if round_number == len(deaths):
+                    deaths.append(0)
+                deaths[round_number] += died
+            self.games[strategy_name] = self.games.get(strategy_name, 0) + 1
+
+    def merge(self, other):
+        for strategy_name, other_deaths in other.deaths.items():
+            deaths = self.deaths.setdefault(strategy_name, [])
+            deaths.extend([0] * (len(other_deaths) - len(deaths)))
+            for round_number, died in enumerate(other_deaths):
+                deaths[round_number] += died
+            self.games[strategy_name] = self.games.get(strategy_name, 0) + other.games[strategy_name]
+
+    def result(self):
+        """
+        Fraction of games each strategy died in, per round.
+        """
+        return {
+            strategy_name: [died / self.games[strategy_name] for died in deaths]
+            for strategy_name, deaths in self.deaths.items()
+        }
+
+
+class WinRates(Accumulator):
+    """
+    Fraction of games each strategy won, with Wilson score intervals on it.
+    """
+
+    def __init__(self):
+        self.counts = {}  # strategy name: [wins, games]
+
+    def update(self, game_stats):
+        for strategy_name, strategy_stat in game_stats.items():
+            counts = self.counts.setdefault(strategy_name, [0, 0])
+            counts[0] += strategy_stat['rank'] == 1
+            counts[1] += 1
+
+    def merge(self, other):
+        for strategy_name, (wins, games) in other.counts.items():
+            counts = self.counts.setdefault(strategy_name, [0, 0])
+            counts[0] += wins
+            counts[1] += games
+
+    def result(self):
+        return {strategy_name: wins / games for strategy_name, (wins, games) in self.counts.items()}
+
+    def intervals(self, z=1.96):
+        """
+        (low, high) bounds on each strategy's win rate, z=1.96 for 95% intervals.
+        """
+        return {strategy_name: wilson_interval(wins, games, z) for strategy_name, (wins, games) in self.counts.items()}
+
+    def since(self, earlier):
+        """
+        Win rates of only the games played since earlier, a copy of this accumulator taken before them.
+        """
+        win_rates = WinRates()
+        for strategy_name, (wins, games) in self.counts.items():
+            earlier_wins, earlier_games = earlier.counts.get(strategy_name, (0, 0))
+            if games > earlier_games:
+                win_rates.counts[strategy_name] = [wins - earlier_wins, games - earlier_games]
+        return win_rates
+
+
+def wilson_interval(successes, trials, z=1.96):
+    if not trials:
+        return 0.0, 1.0
+    rate = successes / trials
+    scale = 1 + z ** 2 / trials
+    centre = (rate + z ** 2 / (2 * trials)) / scale
+    half_width = z * sqrt(rate * (1 - rate) / trials + z ** 2 / (4 * trials ** 2)) / scale
+    return max(centre - half_width, 0.0), min(centre + half_width, 1.0)
+
+
+def default_accumulators():
+    return {
+        'wins': WinCounter(),
+        'win_rates': WinRates(),
+        'ranks': RankHistogram(),
+        'scores': ScoreMoments(),
+        'deaths': DeathsPerRound()
+    }
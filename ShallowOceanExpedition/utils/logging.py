@@ -1,5 +1,7 @@
 import logging
 
+# GAME, ROUND and TURN messages are logged on the hot path of every simulation, so log them with %-style arguments
+# (formatted only if emitted) and guard any that need work to build their arguments with logger.isEnabledFor.
 SIM = 90
 GAME = 80
 ROUND = 70
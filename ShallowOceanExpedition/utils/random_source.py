@@ -0,0 +1,71 @@
+from copy import copy
+
+import numpy as np
+
+DICE = (3, 3)  # sides of the dice rolled to move
+
+
+class RandomSource:
+    """
+    Serves dice rolls from large chunks drawn in one go with NumPy, refilling a chunk once it runs out, and random
+    integers for tile values. Rolls and integers use separate streams so the tile values drawn don't depend on the
+    number of rolls made. The same seed always gives the same sequence.
+    """
+
+    def __init__(self, seed=None, chunk_size=1024):
+        roll_seed, choice_seed = np.random.SeedSequence(seed).spawn(2)
+        self._roll_generator = np.random.default_rng(roll_seed)
+        self._choice_generator = np.random.default_rng(choice_seed)
+        self.chunk_size = chunk_size
+        self._rolls = iter(())
+        self._dice = DICE  # of the rolls in _rolls
+
+    def roll(self, dice=DICE):
+        """
+        Sum of a roll of dice, given as their numbers of sides.
+        """
+        if dice is not self._dice and dice != self._dice:
+            self._rolls = iter(())
+            self._dice = dice
+        try:
+            return next(self._rolls)
+        except StopIteration:
+            highs = np.array(dice)[:, np.newaxis] + 1
+            self._rolls = iter(self._roll_generator.integers(1, highs, size=(len(dice), self.chunk_size)).sum(
+                axis=0).tolist())
+            return next(self._rolls)
+
+    def snapshot(self):
+        """
+        The state of the source, restore it to carry on with the same draws from that point. The chunk of rolls
+        drawn isn't copied, its iterator just remembers where it was.
+        """
+        return (self._roll_generator.bit_generator.state, self._choice_generator.bit_generator.state,
+                copy(self._rolls), self._dice)
+
+    def restore(self, snapshot):
+        roll_state, choice_state, rolls, self._dice = snapshot
+        self._roll_generator.bit_generator.state = roll_state
+        self._choice_generator.bit_generator.state = choice_state
+        # copied again so the snapshot can be restored more than once
+        self._rolls = copy(rolls)
+
+    def integers(self, lows, highs):
+        """
+        A uniform integer from each range [low, high), all drawn in one go from the choice stream.
+        """
+        if not len(lows):
+            return []
+        return self._choice_generator.integers(lows, highs).tolist()
+
+
+def game_random_source(common_seed, n_game):
+    """
+    Random source for game n_game of a run using common random numbers. Every game n_game played with the same
+    common_seed gets the same dice rolls and tile values, whichever strategies play it and in whatever seats.
+    """
+    return RandomSource((common_seed, n_game))
+
+
+# used by players and tiles created outside of a board
+default_random_source = RandomSource()
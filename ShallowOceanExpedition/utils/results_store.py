@@ -0,0 +1,152 @@
+import json
+import os
+
+import numpy as np
+
+
+class ResultsStore:
+    """
+    Append-only, columnar on-disk store of per game results, one row per player per game.
+
+    Each column is a file of fixed width values in the store's directory, meta.json holds the strategy names and
+    the number of rows written. Rows are buffered and appended in blocks, meta.json is only updated once a block is
+    fully written so a store left by a crashed process is truncated back to its last complete block on opening.
+    Columns are read back memory-mapped so stores larger than memory can be analysed. Open with read_only=True to
+    analyse a store without changing it, e.g. while another process is still writing to it.
+
+    Deaths are kept as a bitmask, so games of at most max_rounds rounds can be stored.
+    """
+    columns = {
+        'game': np.uint64,
+        'seat': np.uint8,
+        'strategy': np.uint16,  # index into strategies
+        'score': np.int32,
+        'rank': np.uint8,  # 0 for no rank
+        'deaths': np.uint32,  # bit n set if died in round n
+        'n_rounds': np.uint8
+    }
+    max_rounds = np.iinfo(columns['deaths']).bits
+
+    def __init__(self, path, buffer_size=10000, read_only=False):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.read_only = read_only
+        if read_only:
+            if not os.path.isdir(path):
+                raise FileNotFoundError(f'No results store at {path}.')
+        else:
+            os.makedirs(path, exist_ok=True)
+        meta = self._read_meta()
+        self.strategies = meta['strategies']
+        self.n_games = meta['n_games']
+        self.n_rows = meta['n_rows']
+        self._strategy_ids = {name: strategy_id for strategy_id, name in enumerate(self.strategies)}
+        self._buffer = {name: [] for name in self.columns}
+        self._buffered_games = 0
+        if not read_only:
+            self._truncate_columns()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f'{name}.bin')
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, 'meta.json')) as meta_file:
+                return json.load(meta_file)
+        except FileNotFoundError:
+            return {'strategies': [], 'n_games': 0, 'n_rows': 0}
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as meta_file:
+            json.dump({'strategies': self.strategies, 'n_games': self.n_games, 'n_rows': self.n_rows}, meta_file)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _truncate_columns(self):
+        for name, dtype in self.columns.items():
+            with open(self._column_path(name), 'ab') as column_file:
+                column_file.truncate(self.n_rows * np.dtype(dtype).itemsize)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError(f'Results store at {self.path} was opened read only.')
+
+    def append(self, game_stats):
+        self._check_writable()
+        game = self.n_games + self._buffered_games
+        for seat, (strategy_name, strategy_stat) in enumerate(game_stats.items()):
+            if len(strategy_stat['deaths']) > self.max_rounds:
+                raise ValueError(f'Can only store games of up to {self.max_rounds} rounds.')
+            if strategy_name not in self._strategy_ids:
+                self._strategy_ids[strategy_name] = len(self.strategies)
+                self.strategies.append(strategy_name)
+            self._buffer['game'].append(game)
+            self._buffer['seat'].append(seat)
+            self._buffer['strategy'].append(self._strategy_ids[strategy_name])
+            self._buffer['score'].append(strategy_stat['score'])
+            self._buffer['rank'].append(strategy_stat['rank'] or 0)
+            self._buffer['deaths'].append(sum(1 << round_number for round_number, died
+                                              in enumerate(strategy_stat['deaths']) if died))
+            self._buffer['n_rounds'].append(len(strategy_stat['deaths']))
+        self._buffered_games += 1
+        if self._buffered_games >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffered_games:
+            return
+        n_rows = len(self._buffer['game'])
+        for name, dtype in self.columns.items():
+            with open(self._column_path(name), 'ab') as column_file:
+                np.asarray(self._buffer[name], dtype=dtype).tofile(column_file)
+            self._buffer[name] = []
+        self.n_rows += n_rows
+        self.n_games += self._buffered_games
+        self._buffered_games = 0
+        self._write_meta()
+
+    def mark(self):
+        """
+        Flush and return the point to rewind back to with rewind.
+        """
+        self.flush()
+        return self.n_games, self.n_rows, len(self.strategies)
+
+    def rewind(self, mark):
+        """
+        Drop every game appended since mark was taken.
+        """
+        self._check_writable()
+        self._buffer = {name: [] for name in self.columns}
+        self._buffered_games = 0
+        self.n_games, self.n_rows, n_strategies = mark
+        del self.strategies[n_strategies:]
+        self._strategy_ids = {name: strategy_id for strategy_id, name in enumerate(self.strategies)}
+        self._write_meta()
+        self._truncate_columns()
+
+    def column(self, name):
+        """
+        Memory-mapped, read only view of the flushed values of a column.
+        """
+        dtype = self.columns[name]
+        if not self.n_rows:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._column_path(name), dtype=dtype, mode='r', shape=(self.n_rows,))
+
+    def iter_chunks(self, *names, chunk_size=2 ** 22):
+        columns = [self.column(name) for name in names]
+        for start in range(0, self.n_rows, chunk_size):
+            yield tuple(np.asarray(column[start:start + chunk_size]) for column in columns)
+
+    def aggregate_wins(self, chunk_size=2 ** 22):
+        wins = np.zeros(len(self.strategies), dtype=np.int64)
+        for strategy, rank in self.iter_chunks('strategy', 'rank', chunk_size=chunk_size):
+            wins += np.bincount(strategy[rank == 1], minlength=len(self.strategies))
+        return {name: int(strategy_wins) for name, strategy_wins in zip(self.strategies, wins)}
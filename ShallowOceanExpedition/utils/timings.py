@@ -0,0 +1,99 @@
+from time import perf_counter
+
+from ShallowOceanExpedition.components.strategy import CALLBACKS
+from ShallowOceanExpedition.utils.accumulators import Accumulator
+
+
+class CallTimings(Accumulator):
+    """
+    Wall time and number of calls of every strategy callback, per strategy and callback, and of the engine's own
+    part of each turn, i.e. Board._take_turn less the callbacks made during it.
+
+    Times are recorded as games are played by boards given this as timings, update does nothing.
+    """
+
+    def __init__(self):
+        self.calls = {}  # strategy name: {callback name: [calls, seconds]}
+        self.turns = [0, 0.0]  # [turns, seconds of engine time]
+        self._callback_seconds = 0.0  # running total of callback time, to take out of the turn time
+
+    def update(self, game_stats):
+        pass
+
+    def merge(self, other):
+        for strategy_name, other_calls in other.calls.items():
+            calls = self.calls.setdefault(strategy_name, {callback: [0, 0.0] for callback in CALLBACKS})
+            for callback, (n_calls, seconds) in other_calls.items():
+                calls[callback][0] += n_calls
+                calls[callback][1] += seconds
+        self.turns[0] += other.turns[0]
+        self.turns[1] += other.turns[1]
+
+    def result(self):
+        return {
+            'strategies': {
+                strategy_name: {callback: {'calls': n_calls, 'seconds': seconds}
+                                for callback, (n_calls, seconds) in calls.items()}
+                for strategy_name, calls in self.calls.items()
+            },
+            'engine': {'turns': self.turns[0], 'seconds': self.turns[1]}
+        }
+
+    def time_strategy(self, strategy):
+        return TimedStrategy(strategy, self)
+
+    def time_turn(self, take_turn):
+        """
+        Wrap a board's _take_turn to record the time it takes less the time spent in callbacks.
+        """
+        turns = self.turns
+
+        def timed_take_turn():
+            callback_seconds = self._callback_seconds
+            start = perf_counter()
+            round_over = take_turn()
+            turns[0] += 1
+            turns[1] += perf_counter() - start - (self._callback_seconds - callback_seconds)
+            return round_over
+
+        return timed_take_turn
+
+    def report(self):
+        lines = [f'{"Strategy":<20} {"Callback":<18} {"Calls":>10} {"Total (s)":>10} {"Mean (us)":>10}']
+        for strategy_name, calls in sorted(self.calls.items()):
+            for callback, (n_calls, seconds) in calls.items():
+                lines.append(f'{strategy_name:<20} {callback:<18} {n_calls:>10} {seconds:>10.3f} '
+                             f'{1e6 * seconds / max(n_calls, 1):>10.2f}')
+        n_turns, seconds = self.turns
+        lines.append(f'{"(engine)":<20} {"_take_turn":<18} {n_turns:>10} {seconds:>10.3f} '
+                     f'{1e6 * seconds / max(n_turns, 1):>10.2f}')
+        return '\n'.join(lines)
+
+
+class TimedStrategy:
+    """
+    Stands in for a strategy, passing on its callbacks and recording how long they take in timings.
+    """
+
+    def __init__(self, strategy, timings):
+        self.strategy = strategy
+        self.player_name = strategy.player_name
+        calls = timings.calls.setdefault(strategy.player_name, {callback: [0, 0.0] for callback in CALLBACKS})
+        for callback in CALLBACKS:
+            setattr(self, callback, self._timed(getattr(strategy, callback), calls[callback], timings))
+
+    @staticmethod
+    def _timed(callback, call_times, timings):
+        def timed_callback(player, board, others):
+            start = perf_counter()
+            decision = callback(player, board, others)
+            seconds = perf_counter() - start
+            call_times[0] += 1
+            call_times[1] += seconds
+            timings._callback_seconds += seconds
+            return decision
+
+        return timed_callback
+
+    def __getattr__(self, name):
+        return getattr(self.strategy, name)
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TranspositionCache:
+    """
+    Bounded cache of evaluations of game states for strategies to opt into, keyed by e.g. views.state_key so states
+    reached by different routes, turns or games share an evaluation. Once full the least recently used entry is
+    evicted. Keeps count of hits and misses, see stats.
+    """
+
+    def __init__(self, max_size=100000):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1.')
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+        elif len(entries) >= self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[key] = value
+
+    def lookup(self, key, evaluate):
+        """
+        The cached value of key, or evaluate() cached as it if there isn't one.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = evaluate()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate, 'size': len(self._entries),
+                'evictions': self.evictions}
@@ -0,0 +1,206 @@
+"""
+Throughput benchmarks of the simulation hot paths.
+
+Run `python -m benchmarks.run_benchmarks` to compare against the saved baselines, `--save` to record new ones.
+Baselines are only comparable on the machine they were recorded on.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from collections import namedtuple
+
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.components.strategy import DefaultStrategy
+from ShallowOceanExpedition.components.tiles import Tile, LEVELS
+from ShallowOceanExpedition.game_manager import GameManager
+from ShallowOceanExpedition.utils.logging import logger, SIM
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+PLAYER_COUNTS = [2, 4, 6]
+BOARD_SIZES = {'small': 2, 'default': 5, 'large': 10}  # tiles per level
+
+Benchmark = namedtuple('Benchmark', ['name', 'unit', 'make'])
+
+
+def strategies(n_players):
+    return [DefaultStrategy(f'Player{n}') for n in range(1, n_players + 1)]
+
+
+def board_params(board_size):
+    tiles_per_level = BOARD_SIZES[board_size]
+    return {f'n_level_{level}': tiles_per_level for level in range(1, 5)}
+
+
+def mid_round_board(n_players, board_size, seed=0):
+    """
+    A board with the players spread out and holding tiles, as it might be part way through a round.
+    """
+    board = Board(strategies(n_players), seed=seed, **board_params(board_size))
+    # every other tile, closer together if the board is too small for that
+    spacing = min(2, (len(board.tiles) - 1) // n_players)
+    for n, player in enumerate(board.players):
+        player.position = spacing * n + 1
+        player.tiles = [Tile(LEVELS[level % 4 + 1], level) for level in range(n)]
+    return board
+
+
+class TurnCounter(Board):
+    def _take_turn(self):
+        self.n_turns = getattr(self, 'n_turns', 0) + 1
+        return super()._take_turn()
+
+
+def count_turns(n_players, board_size, n_games, rounds_per_game):
+    n_turns = 0
+    for seed in range(n_games):
+        board = TurnCounter(strategies(n_players), seed=seed, **board_params(board_size))
+        for _ in range(rounds_per_game):
+            board.play_round()
+        n_turns += board.n_turns
+    return n_turns
+
+
+def make_run_n_games(n_players, board_size, n_games=50):
+    game_manager = GameManager(strategies(n_players), seed=0, **board_params(board_size))
+    return lambda: game_manager.run_n_games(n_games), n_games
+
+
+def make_play_round(n_players, board_size, n_games=50, rounds_per_game=3):
+    # boards are seeded so the turns can be counted beforehand, outside of the timed run
+    boards = [Board(strategies(n_players), seed=seed, **board_params(board_size)) for seed in range(n_games)]
+    n_turns = count_turns(n_players, board_size, n_games, rounds_per_game)
+
+    def run():
+        for board in boards:
+            for _ in range(rounds_per_game):
+                board.play_round()
+    return run, n_turns
+
+
+def make_calculate_new_position(n_players, board_size, n_calls=20000):
+    board = mid_round_board(n_players, board_size)
+
+    def run():
+        for _ in range(n_calls):
+            board._calculate_new_position()
+    return run, n_calls
+
+
+def make_summarise_game_states(n_players, board_size, n_calls=20000):
+    board = mid_round_board(n_players, board_size)
+
+    def run():
+        for _ in range(n_calls):
+            board._summarise_game_states()
+    return run, n_calls
+
+
+def make_summarise_tiles(n_players, board_size, n_calls=20000):
+    player = mid_round_board(n_players, board_size).players[-1]
+
+    def run():
+        for _ in range(n_calls):
+            player.summarise_tiles()
+    return run, n_calls
+
+
+def all_benchmarks():
+    benchmarks = []
+    for board_size in BOARD_SIZES:
+        for n_players in PLAYER_COUNTS:
+            params = f'[players={n_players},board={board_size}]'
+            for name, unit, make in [
+                ('GameManager.run_n_games', 'games', make_run_n_games),
+                ('Board.play_round', 'turns', make_play_round),
+                ('Board._calculate_new_position', 'calls', make_calculate_new_position),
+                ('Board._summarise_game_states', 'calls', make_summarise_game_states),
+                ('Player.summarise_tiles', 'calls', make_summarise_tiles)
+            ]:
+                benchmarks.append(Benchmark(name + params, unit, lambda make=make, n_players=n_players,
+                                            board_size=board_size: make(n_players, board_size)))
+    return benchmarks
+
+
+def measure(benchmark, repeat=5):
+    """
+    Best rate (units per second) over repeat runs, each run set up afresh outside of the timing.
+    """
+    rates = []
+    for _ in range(repeat):
+        run, n_units = benchmark.make()
+        start = time.perf_counter()
+        run()
+        rates.append(n_units / (time.perf_counter() - start))
+    return max(rates)
+
+
+def load_baselines(path=BASELINES_PATH):
+    try:
+        with open(path) as baselines_file:
+            return json.load(baselines_file)['results']
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(results, path=BASELINES_PATH):
+    with open(path, 'w') as baselines_file:
+        json.dump({
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'results': results
+        }, baselines_file, indent=2, sort_keys=True)
+
+
+def find_regressions(results, baselines, tolerance):
+    """
+    Benchmarks more than tolerance (a fraction) slower than their baseline, with their change in rate.
+    """
+    regressions = {}
+    for name, result in results.items():
+        if name in baselines:
+            change = result['rate'] / baselines[name]['rate'] - 1
+            if change < -tolerance:
+                regressions[name] = change
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the simulation hot paths.')
+    parser.add_argument('--save', action='store_true', help='save the results as the new baselines')
+    parser.add_argument('--baselines', default=BASELINES_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.15, help='slow down reported as a regression')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='only run benchmarks with names containing this')
+    args = parser.parse_args()
+
+    logger.setLevel(SIM + 1)
+    baselines = load_baselines(args.baselines)
+    results = {}
+    for benchmark in all_benchmarks():
+        if args.filter not in benchmark.name:
+            continue
+        rate = measure(benchmark, args.repeat)
+        results[benchmark.name] = {'rate': rate, 'unit': benchmark.unit}
+        baseline = baselines.get(benchmark.name)
+        change = f'{rate / baseline["rate"] - 1:+7.1%}' if baseline else '    new'
+        print(f'{benchmark.name:<70} {rate:>12,.0f} {benchmark.unit}/s {change}')
+
+    if args.save:
+        save_baselines({**baselines, **results}, args.baselines)
+        print(f'Saved baselines to {args.baselines}')
+        return
+    regressions = find_regressions(results, baselines, args.tolerance)
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) of more than {args.tolerance:.0%}:')
+        for name, change in regressions.items():
+            print(f'- {name}: {change:+.1%}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
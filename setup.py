@@ -23,7 +23,7 @@ if __name__ == "__main__":
             'cycler==0.10.0',
             'kiwisolver==1.0.1',
             'matplotlib==2.2.2',
-            'numpy==1.14.3',
+            'numpy==1.17.5',
             'pyparsing==2.2.0',
             'python-dateutil==2.7.3',
             'pytz==2018.4',
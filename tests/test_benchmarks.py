@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks.run_benchmarks import find_regressions, mid_round_board, BOARD_SIZES, PLAYER_COUNTS
+
+
+def test_mid_round_board():
+    for board_size in BOARD_SIZES:
+        for n_players in PLAYER_COUNTS:
+            board = mid_round_board(n_players, board_size)
+            positions = [player.position for player in board.players]
+            assert len(set(positions)) == n_players
+            assert all(0 < position < len(board.tiles) for position in positions)
+            assert board.occupancy == {player.position: player for player in board.players}
+
+
+def test_find_regressions():
+    baselines = {'a': {'rate': 100.0}, 'b': {'rate': 100.0}, 'c': {'rate': 100.0}}
+    results = {'a': {'rate': 80.0}, 'b': {'rate': 90.0}, 'c': {'rate': 150.0}, 'new': {'rate': 1.0}}
+    regressions = find_regressions(results, baselines, tolerance=0.15)
+    assert list(regressions) == ['a']
+    assert regressions['a'] == pytest.approx(-0.2)
+    assert find_regressions(results, baselines, tolerance=0.05) == pytest.approx({'a': -0.2, 'b': -0.1})
+    assert find_regressions(results, {}, tolerance=0.0) == {}
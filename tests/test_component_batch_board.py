@@ -0,0 +1,164 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from ShallowOceanExpedition.components.batch_board import BatchBoard
+from ShallowOceanExpedition.components.strategy import BatchDefaultStrategy, DefaultStrategy
+from ShallowOceanExpedition.utils.exceptions import Cheating
+
+
+@pytest.fixture
+def batch_board():
+    return BatchBoard([BatchDefaultStrategy('1'), BatchDefaultStrategy('2')], 3, seed=0)
+
+
+@pytest.fixture
+def batch_board_4p():
+    return BatchBoard([BatchDefaultStrategy(str(n)) for n in range(1, 5)], 1, seed=0)
+
+
+def mock_rolls(board, roll):
+    board.random_generator = MagicMock()
+    board.random_generator.integers.side_effect = lambda low, high, size: np.array([[roll // 2], [roll - roll // 2]])
+
+
+def test_BatchBoard_init(batch_board):
+    with pytest.raises(ValueError):
+        BatchBoard([BatchDefaultStrategy('1')], 1)
+    with pytest.raises(TypeError):
+        BatchBoard([DefaultStrategy('1'), DefaultStrategy('2')], 1)
+
+    expected_levels = [0] + [1] * 5 + [2] * 5 + [3] * 5 + [4] * 5
+    assert batch_board.tile_levels.tolist() == [expected_levels] * 3
+    for level in range(1, 5):
+        values = batch_board.tile_values[batch_board.tile_levels == level]
+        assert ((5 * (level - 1) <= values) & (values < 5 * level)).all()
+    assert batch_board.n_tiles.tolist() == [21] * 3
+    assert batch_board.oxygen.tolist() == [25] * 3
+    assert not batch_board.positions.any()
+    assert (batch_board.directions == 1).all()
+
+
+def test_BatchBoard_calculate_new_positions(batch_board_4p):
+    # (positions, current player, direction, roll, expected), as in the Board tests
+    cases = [
+        ([0, 0, 0, 0], 0, 1, 5, 5),
+        ([0, 1, 0, 0], 0, 1, 5, 6),
+        ([0, 1, 5, 0], 0, 1, 5, 7),
+        ([3, 1, 4, 5], 0, 1, 5, 10),
+        ([15, 0, 0, 0], 0, 1, 200, 20),
+        ([10, 0, 0, 0], 0, 1, 0, 10),
+        ([5, 3, 0, 0], 0, -1, 3, 1),
+        ([5, 2, 1, 0], 0, -1, 3, 0),
+        ([5, 4, 1, 6], 0, -1, 3, 0),
+        ([18, 20, 19, 0], 0, 1, 6, 18),
+        ([0, 20, 19, 0], 3, 1, 200, 18),
+    ]
+    for positions, current, direction, roll, expected in cases:
+        mock_rolls(batch_board_4p, roll)
+        batch_board_4p.positions[0] = positions
+        batch_board_4p.directions[0] = 1
+        batch_board_4p.directions[0, current] = direction
+        new = batch_board_4p._calculate_new_positions(np.array([0]), np.array([current]))
+        assert new.tolist() == [expected]
+
+
+def test_BatchBoard_take_turns_collect_and_drop(batch_board):
+    rows, seats = np.array([0, 1]), np.array([0, 1])
+    batch_board.n_turns[:] = 2
+    batch_board.positions[1, 0] = 3
+    mock_rolls(batch_board, 4)
+    batch_board._take_turns(rows, seats)
+    assert batch_board.positions[[0, 1], [0, 1]].tolist() == [4, 5]
+    assert batch_board.held_counts[[0, 1], [0, 1]].tolist() == [1, 1]
+    assert batch_board.held_levels[0, 0, 0] == 1
+    assert batch_board.tile_levels[[0, 1], [4, 5]].tolist() == [0, 0]
+    assert batch_board.oxygen.tolist() == [25, 25, 25]
+
+    # drop the lowest tile back onto the blank tile
+    batch_board.held_levels[0, 0, :3] = [3, 1, 2]
+    batch_board.held_values[0, 0, :3] = [12, 2, 7]
+    batch_board.held_counts[0, 0] = 3
+    batch_board.tile_levels[0, 5] = 0
+    batch_board.oxygen[0] = 10
+    batch_board.n_turns[0, 0] = 2
+    mock_rolls(batch_board, 4)
+    batch_board._take_turns(np.array([0]), np.array([0]))
+    assert batch_board.positions[0, 0] == 5
+    assert batch_board.tile_levels[0, 5] == 1
+    assert batch_board.tile_values[0, 5] == 2
+    assert batch_board.held_levels[0, 0, :3].tolist() == [3, 2, 0]
+    assert batch_board.held_values[0, 0, :3].tolist() == [12, 7, 0]
+    assert batch_board.held_counts[0, 0] == 2
+    assert batch_board.oxygen[0] == 7
+
+
+def test_BatchBoard_take_turns_reach_home(batch_board):
+    batch_board.positions[0, 0] = 2
+    batch_board.directions[0, 0] = -1
+    batch_board.held_values[0, 0, :2] = [3, 4]
+    batch_board.held_levels[0, 0, :2] = [1, 1]
+    batch_board.held_counts[0, 0] = 2
+    mock_rolls(batch_board, 6)
+    batch_board._take_turns(np.array([0]), np.array([0]))
+    assert batch_board.back_home[0, 0]
+    assert batch_board.banks[0, 0] == 7
+    assert batch_board.positions[0, 0] == 0
+    assert batch_board.directions[0, 0] == 1
+    assert batch_board.held_counts[0, 0] == 0
+
+
+def test_BatchBoard_turn_twice_fails(batch_board):
+    batch_board.strategies[0] = MagicMock()
+    batch_board.strategies[0].batch_decide_direction.return_value = np.array([True])
+    batch_board.directions[0, 0] = -1
+    with pytest.raises(Cheating):
+        batch_board._apply_direction_strategies(np.array([0]), np.array([0]))
+
+
+def test_BatchBoard_end_rounds(batch_board_4p):
+    batch_board_4p.deaths = np.zeros((1, 4, 1), dtype=bool)
+    batch_board_4p.tile_levels[0, [2, 7, 15]] = 0
+    batch_board_4p.back_home[0, 0] = True
+    batch_board_4p.positions[0] = [0, 12, 4, 9]
+    batch_board_4p.held_counts[0] = [0, 2, 1, 0]
+    batch_board_4p.held_levels[0, 1, :2] = [1, 3]
+    batch_board_4p.held_values[0, 1, :2] = [2, 11]
+    batch_board_4p.held_levels[0, 2, 0] = 4
+    batch_board_4p.held_values[0, 2, 0] = 16
+    batch_board_4p.oxygen[0] = -2
+
+    batch_board_4p._end_rounds(np.array([0]))
+    assert batch_board_4p.round_numbers[0] == 1
+    assert batch_board_4p.oxygen[0] == 25
+    assert batch_board_4p.deaths[0, :, 0].tolist() == [False, True, True, True]
+    assert batch_board_4p.n_tiles[0] == 20
+    expected_levels = [0] + [1] * 4 + [2] * 4 + [3] * 4 + [4] * 5 + [4, 4]
+    assert batch_board_4p.tile_levels[0, :20].tolist() == expected_levels
+    assert batch_board_4p.tile_values[0, 18:20].tolist() == [16, 13]
+    assert not batch_board_4p.tile_levels[0, 20:].any()
+    assert not batch_board_4p.held_counts.any()
+    assert not batch_board_4p.back_home.any()
+
+
+def test_BatchBoard_play_rounds(batch_board):
+    batch_board.play_rounds(3)
+    assert batch_board.round_numbers.tolist() == [3, 3, 3]
+    assert batch_board.deaths.shape == (3, 2, 3)
+    stats = batch_board.get_stats()
+    assert len(stats) == 3
+    for game_stat in stats:
+        assert set(game_stat) == {'1', '2'}
+        for player_stat in game_stat.values():
+            assert len(player_stat['deaths']) == 3
+            assert (player_stat['rank'] is None) == (player_stat['score'] == 0)
+
+    other_board = BatchBoard([BatchDefaultStrategy('1'), BatchDefaultStrategy('2')], 3, seed=0)
+    other_board.play_rounds(3)
+    assert other_board.get_stats() == stats
+
+
+def test_BatchBoard_get_ranks(batch_board):
+    batch_board.banks[:] = [[10, 5], [0, 5], [7, 7]]
+    assert batch_board.get_ranks().tolist() == [[1, 2], [0, 1], [1, 1]]
@@ -1,12 +1,15 @@
-from copy import copy
+from random import Random
 from unittest.mock import patch, MagicMock, call
 
 import pytest
 
 from ShallowOceanExpedition.components.board import Board
-from ShallowOceanExpedition.components.tiles import Home, BlankTile, Tile
+from ShallowOceanExpedition.components.strategy import DefaultStrategy
+from ShallowOceanExpedition.components.tiles import HOME, Tile, TileTable
+from ShallowOceanExpedition.rules import RuleSet
 from ShallowOceanExpedition.utils.exceptions import RoundOver, Cheating, RuleViolation
-from ShallowOceanExpedition.utils.logging import GAME
+from ShallowOceanExpedition.utils.logging import GAME, TURN, SIM, logger
+from ShallowOceanExpedition.utils.random_source import RandomSource
 
 
 @pytest.fixture
@@ -38,8 +41,8 @@ def test_Board_init(board):
 
     assert [player.name for player in board.players] == ['1', '2']
 
-    assert isinstance(board.tiles[0], Home)
-    tile_levels = [tile.level for tile in board.tiles[1:]]
+    assert board.tiles.levels[0] == HOME
+    tile_levels = board.tiles.levels[1:]
     expected_tile_levels = [
         (1,), (1,), (1,), (1,), (1,),
         (2,), (2,), (2,), (2,), (2,),
@@ -52,13 +55,202 @@ def test_Board_init(board):
     assert board.current_player.name == '1'
 
 
+def test_Board_seed():
+    def play(board):
+        for _ in range(3):
+            board.play_round()
+        return board.get_stats()
+
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    assert play(Board(strategies, seed=4)) == play(Board(strategies, seed=4))
+    assert Board(strategies, seed=4).players[0].random_source is not Board(strategies, seed=4).players[0].random_source
+
+
+def test_Board_reset():
+    def play(board):
+        for _ in range(3):
+            board.play_round()
+        return board.get_stats()
+
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    board = Board(strategies, seed=4)
+    players, views, tile_levels = list(board.players), board._views, board.tile_levels
+    first_stats = play(board)
+    first_deaths = [stats['deaths'] for stats in first_stats.values()]
+    board.reset(RandomSource(5))
+    assert board.round_number == 0
+    assert board.oxygen == 25
+    assert board.current_player is board.players[0]
+    assert board.occupancy == {}
+    assert board.tiles.levels == [HOME] + [(1,)] * 5 + [(2,)] * 5 + [(3,)] * 5 + [(4,)] * 5
+    for player in board.players:
+        assert (player.position, player.bank, player.n_turn, player.deaths, player.tiles) == (0, 0, 0, [], ())
+        assert player.random_source is board.random_source
+    # plays the game a new board would, reusing the players, views and tiles
+    assert play(board) == play(Board(strategies, random_source=RandomSource(5)))
+    assert board.players == players and board._views is views and board.tile_levels is tile_levels
+    assert [stats['deaths'] for stats in first_stats.values()] == first_deaths
+
+    # carries on drawing from the same random source if not given one
+    board = Board(strategies, seed=6)
+    play(board)
+    board.reset()
+    other_board = Board(strategies, seed=6)
+    play(other_board)
+    assert play(board) == play(Board(strategies, random_source=other_board.random_source))
+
+
+def test_Board_snapshot():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    board = Board(strategies, seed=7)
+    board.play_round()
+    for _ in range(5):
+        board.step()
+    snapshot = board.snapshot()
+    stats = board.rollout()
+    assert board.round_number == 3
+
+    board.restore(snapshot)
+    # all but the random source's state, whose chunk iterators don't compare equal
+    assert board.snapshot()[:-1] == snapshot[:-1]
+    assert board.occupancy == {player.position: player for player in board.players if player.position}
+    assert board.current_player is board.players[snapshot[4]]
+    assert board.rollout() == stats
+
+    # any board of as many players under the same rules can carry on the game
+    other_board = Board([DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')], seed=8)
+    other_board.restore(snapshot)
+    assert other_board.rollout() == stats
+    with pytest.raises(ValueError):
+        Board(strategies[:2]).restore(snapshot)
+    with pytest.raises(ValueError):
+        Board(strategies, oxygen=20).restore(snapshot)
+
+
+def test_Board_restore_random_source():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2')]
+    board = Board(strategies, seed=7)
+    board.step()
+    snapshot = board.snapshot()
+    futures = []
+    for seed in (1, 1, 2):
+        board.restore(snapshot, random_source=RandomSource(seed))
+        assert all(player.random_source is board.random_source for player in board.players)
+        futures.append(board.rollout())
+    assert futures[0] == futures[1]
+
+
+class LookAheadStrategy(DefaultStrategy):
+    """
+    Plays as DefaultStrategy, playing out the game from every decision with the strategies given.
+    """
+
+    def __init__(self, player_name, strategies):
+        super().__init__(player_name)
+        self.strategies = strategies
+        self.futures = []
+
+    def look_ahead(self, board):
+        self.futures.append(board.rollouts.rollout(self.strategies, seed=len(self.futures)))
+
+    def decide_direction(self, player, board, others):
+        self.look_ahead(board)
+        return super().decide_direction(player, board, others)
+
+    def tile_collect(self, player, board, others):
+        self.look_ahead(board)
+        return super().tile_collect(player, board, others)
+
+    def tile_drop(self, player, board, others):
+        self.look_ahead(board)
+        return super().tile_drop(player, board, others)
+
+
+def test_Board_rollouts():
+    # moves and values fixed, so futures played by the same strategies end as the game does
+    value_ranges = {1: range(1, 2), 2: range(2, 3), 3: range(3, 4), 4: range(4, 5)}
+    rules = RuleSet(oxygen=12, dice=(1,) * 6, value_ranges=value_ranges)
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    look_ahead = LookAheadStrategy('1', strategies)
+    board = Board([look_ahead] + strategies[1:], rules=rules, seed=0)
+    stats = board.rollout()
+    assert len(look_ahead.futures) > 10
+    assert all(future == stats for future in look_ahead.futures)
+    assert stats == Board(strategies, rules=rules, seed=0).rollout()
+
+    # rolls and tile values are drawn again, leaving the game's random source alone
+    look_ahead = LookAheadStrategy('1', strategies)
+    board = Board([look_ahead] + strategies[1:], seed=0)
+    assert board.rollout() == Board(strategies, seed=0).rollout()
+    assert len({repr(future) for future in look_ahead.futures}) > 1
+
+    board = Board(strategies, seed=1)
+    for _ in range(5):
+        board.step()
+    # the same future for a seed, whether or not the rollout board has just been made
+    assert board.rollouts.rollout(strategies, seed=2) == board.rollouts.rollout(strategies, seed=2)
+
+
+def test_Board_redraw_tile_values():
+    board = Board([DefaultStrategy('1'), DefaultStrategy('2')], seed=0)
+    board.players[0].collect_tile(board.tiles.take(1))
+    board.tiles.put(2, Tile((1, 4), 100))
+    board.random_source = RandomSource(1)
+    board.redraw_tile_values()
+    assert board.tiles.values[0] == 0 and board.tiles.levels[1] is None and board.tiles.values[1] == 0
+    assert 15 <= board.tiles.values[2] < 23
+    assert all(value in board.rules.value_ranges[level[0]]
+               for level, value in zip(board.tiles.levels[3:], board.tiles.values[3:]))
+    assert board.players[0].tiles[0].value in board.rules.value_ranges[1]
+
+
+def test_Board_step():
+    board = Board([DefaultStrategy('1'), DefaultStrategy('2')], seed=3)
+    other_board = Board([DefaultStrategy('1'), DefaultStrategy('2')], seed=3)
+    other_board.play_round()
+    n_steps = 1
+    while not board.step():
+        n_steps += 1
+    assert n_steps > 1
+    assert board.round_number == 1
+    assert board.snapshot()[:-1] == other_board.snapshot()[:-1]
+
+
+def test_Board_new_game_hook():
+    strategy = MagicMock(player_name='1')
+    board = Board([strategy, MockStrategy('2')])
+    strategy.new_game.assert_called_once_with()
+    board.reset()
+    assert strategy.new_game.call_count == 2
+
+
+def test_Board_logging_deferred():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2')]
+    with patch('ShallowOceanExpedition.components.player.Player.__str__') as mock_str:
+        board = Board(strategies, seed=1)
+        board.play_round()
+        board.print_end_game_summary()
+        assert not mock_str.called
+
+
+def test_Board_logging_text(caplog):
+    logger.setLevel(TURN)
+    try:
+        board = Board([DefaultStrategy('1'), DefaultStrategy('2')], seed=1)
+        board.current_player.tiles = [Tile((1,), 1)]
+        board._reduce_ox_by(1)
+    finally:
+        logger.setLevel(SIM)
+    assert caplog.messages[-1] == '- 1 has 1 tile(s), oxygen reduced from 24 to 23'
+
+
 @patch('ShallowOceanExpedition.components.board.Board._end_round')
 @patch('ShallowOceanExpedition.components.board.Board._take_turn')
 def test_Board_play_round(mock_take_turn, mock_end_round, board):
-    mock_take_turn.side_effect = RoundOver()
+    mock_take_turn.side_effect = [False, False, True]
     board.play_round()
-    mock_take_turn.assert_called()
-    mock_end_round.assert_called()
+    assert mock_take_turn.call_count == 3
+    mock_end_round.assert_called_once()
 
 
 @patch('ShallowOceanExpedition.components.board.Board._kill_players_gather_tiles')
@@ -89,7 +281,7 @@ def test_Board_end_round(mock_reform_tiles, mock_kill_players_gather_tiles, boar
 @patch('ShallowOceanExpedition.components.board.Board._next_player')
 def test_Board_take_turn_land_on_tile(next_player, end_round, has_players, advance_player, collect_strategy,
                                       drop_strategy, direction_strategy, reduce_ox, board):
-    advance_player.return_value = MockTile(1)
+    advance_player.return_value = (1,)
     board._take_turn()
     assert has_players.called
     assert reduce_ox.called
@@ -111,7 +303,7 @@ def test_Board_take_turn_land_on_home(next_player, end_round, has_players, advan
                                       drop_strategy, direction_strategy, reduce_ox, board):
     board.current_player = MagicMock()
     board.current_player.back_home = False
-    advance_player.return_value = Home()
+    advance_player.return_value = HOME
     board._take_turn()
     assert has_players.called
     assert reduce_ox.called
@@ -120,11 +312,11 @@ def test_Board_take_turn_land_on_home(next_player, end_round, has_players, advan
     assert not drop_strategy.called
     assert not collect_strategy.called
     assert next_player.called
+    assert board._n_out == 1
+    assert board._next_seats[1] == 1
 
-    board.current_player.reached_home.return_value = True
     board._has_players.return_value = False
-    with pytest.raises(RoundOver):
-        board._take_turn()
+    assert board._take_turn()
 
 
 @patch('ShallowOceanExpedition.components.board.Board._reduce_ox_by')
@@ -137,8 +329,7 @@ def test_Board_take_turn_land_on_home(next_player, end_round, has_players, advan
 @patch('ShallowOceanExpedition.components.board.Board._next_player')
 def test_Board_take_turn_land_on_blank(next_player, end_round, has_players, advance_player, collect_strategy,
                                        drop_strategy, direction_strategy, reduce_ox, board):
-    blank = MockTile(None)
-    advance_player.return_value = blank
+    advance_player.return_value = None
     board._take_turn()
     assert has_players.called
     assert reduce_ox.called
@@ -151,8 +342,7 @@ def test_Board_take_turn_land_on_blank(next_player, end_round, has_players, adva
 @patch('ShallowOceanExpedition.components.board.Board._end_round')
 def test_Board_take_turn_oxygen_depleted(end_round, board):
     board.oxygen = 0
-    with pytest.raises(RoundOver):
-        board._take_turn()
+    assert board._take_turn()
 
 
 @patch('ShallowOceanExpedition.components.board.Board._reduce_ox_by')
@@ -167,31 +357,38 @@ def test_Board_take_turn_no_players(next_player, end_round, has_players, advance
                                                       collect_strategy,
                                                       drop_strategy, direction_strategy, reduce_ox, board):
 
-    board.current_player.back_home = True
     board._has_players = lambda: False
-    with pytest.raises(RoundOver):
-        board._take_turn()
+    assert board._take_turn()
+    assert not next_player.called
 
 
 def test_Board_has_players(board):
     assert board._has_players()
 
-    board.players[0].back_home = True
-    board.players[1].back_home = True
-
+    board._leave_ring()
+    assert board._has_players()
+    board._next_player()
+    board._leave_ring()
     assert not board._has_players()
 
 
-def test_Board_summarise_tile_levels(board):
-    expected_tile_levels = [
-        'Home',
-        (1,), (1,), (1,), (1,), (1,),
-        (2,), (2,), (2,), (2,), (2,),
-        (3,), (3,), (3,), (3,), (3,),
-        (4,), (4,), (4,), (4,), (4,)
-    ]
+def test_Board_ring(board_4p):
+    board_4p.players[2].back_home = True
+    board_4p._reset_ring()
+    assert board_4p._n_out == 3
+    assert [board_4p._next_seats[seat] for seat in [0, 1, 3]] == [1, 3, 0]
+
+    board_4p._next_player()
+    board_4p._leave_ring()
+    board_4p._next_player()
+    assert board_4p.current_player is board_4p.players[3]
+    board_4p._next_player()
+    assert board_4p.current_player is board_4p.players[0]
 
-    assert board._summarise_tile_levels() == expected_tile_levels
+    # once oxygen runs out the next seat has the go the round ends on, even if they are home
+    board_4p.oxygen = 0
+    board_4p._next_player()
+    assert board_4p.current_player is board_4p.players[1]
 
 
 def test_Board_apply_current_player_collect_strategy_pickup(board):
@@ -207,7 +404,7 @@ def test_Board_apply_current_player_collect_strategy_pickup(board):
     board.current_player.position = 1
     board._apply_current_player_collect_strategy()
     board.current_player.collect_tile.assert_called_with(first_tile)
-    assert isinstance(board.tiles[1], BlankTile)
+    assert board.tiles[1] == Tile(None, 0)
 
     # try to pick up blank tile
     with pytest.raises(Cheating):
@@ -217,16 +414,17 @@ def test_Board_apply_current_player_collect_strategy_pickup(board):
 def test_Board_apply_current_player_collect_strategy_dont_pickup(board):
     board.current_player.strategy = MagicMock()
     board.current_player.collect_tile = MagicMock()
-    tiles = copy(board.tiles)
+    levels, values = list(board.tiles.levels), list(board.tiles.values)
     board.current_player.strategy.tile_collect.return_value = False
     board._apply_current_player_collect_strategy()
-    assert board.tiles == tiles
+    assert board.tiles.levels == levels
+    assert board.tiles.values == values
     assert not board.current_player.collect_tile.called
 
 
 def test_Board_apply_current_player_drop_strategy_do_drop(board):
     board.current_player.strategy = MagicMock()
-    player_tiles = [Tile(1), Tile(1), Tile(2)]
+    player_tiles = [Tile((1,), 1), Tile((1,), 3), Tile((2,), 6)]
     board.current_player.tiles = list(player_tiles)
     board.current_player.strategy.tile_drop.return_value = (True, (1,))
     # try to drop on home
@@ -235,11 +433,11 @@ def test_Board_apply_current_player_drop_strategy_do_drop(board):
 
     # drop on blank tile
     board.current_player.position = 1
-    board.tiles[1] = BlankTile()
+    board.tiles.take(1)
     board._apply_current_player_drop_strategy()
-    assert isinstance(board.tiles[1], Tile)
-    assert board.tiles[1].level == (1,)
-    assert board.current_player.tiles == player_tiles[1:]
+    assert board.tiles[1] == player_tiles[0]
+    assert board.tile_levels[1] == (1,)
+    assert board.current_player.tiles == tuple(player_tiles[1:])
 
     # try to drop on existing tile
     with pytest.raises(Cheating):
@@ -278,7 +476,7 @@ def test_Board_advance_current_player(new_pos, board):
     landed_on = board._advance_current_player()
     assert board.current_player.position == 2
     assert board.current_player.n_turn == 1
-    assert landed_on.level == (1,)
+    assert landed_on == (1,)
 
 
 @patch('ShallowOceanExpedition.components.board.Player.roll')
@@ -414,7 +612,7 @@ def test_Board_calculate_new_position_no_player_with_tiles(roll, board_4p):
     board_4p.players[1].position = 4
     board_4p.players[2].position = 7
     board_4p.players[3].position = 3
-    board_4p.tiles = [MockTile(1)]*12
+    board_4p.tiles = TileTable([(1,)] * 12, [1] * 12)
     roll.return_value = 3
     new = board_4p._calculate_new_position()
     assert new == 5
@@ -445,32 +643,65 @@ def test_Board_calculate_new_position_no_player_with_tiles(roll, board_4p):
     board_4p.players[1].position = 10
     board_4p.players[2].position = 9
     board_4p.players[3].position = 14
-    board_4p.tiles = [MockTile(1)]*15
+    board_4p.tiles = TileTable([(1,)] * 15, [1] * 15)
     roll.return_value = 3
     new = board_4p._calculate_new_position()
     assert new == 11
 
 
-def test_Board_get_other_player_positions(board_4p):
-    assert board_4p._get_other_player_positions() == [0, 0, 0]
-
-    board_4p.players[0].position = 1
-    assert board_4p._get_other_player_positions() == [0, 0, 0]
-
-    board_4p.players[0].position = 1
-    board_4p.players[1].position = 2
-    assert board_4p._get_other_player_positions() == [2, 0, 0]
-
-    board_4p.players[0].position = 1
-    board_4p.players[1].position = 2
-    board_4p.players[2].position = 3
-    board_4p.players[3].position = 4
-    assert board_4p._get_other_player_positions() == [2, 3, 4]
+def reference_new_position(curr_position, distance, other_positions, n_tiles):
+    """
+    Movement as previously resolved by sorting and scanning the other players' positions.
+    """
+    if distance >= 0:
+        for other_player_pos in sorted(other_positions):
+            if curr_position <= other_player_pos <= curr_position + distance:
+                distance += 1
+        end_position = n_tiles - 1
+        distance = min(end_position - curr_position, distance)
+        for other_player_pos in sorted(other_positions, reverse=True):
+            if other_player_pos == end_position:
+                if other_player_pos <= curr_position + distance:
+                    distance = max(distance - 1, 0)
+                    end_position -= 1
+    else:
+        for other_player_pos in sorted(other_positions, reverse=True):
+            if curr_position >= other_player_pos >= curr_position + distance:
+                distance -= 1
+    return max(0, curr_position + distance)
 
 
-def test_Board_get_other_players(board_4p):
-    other_players = board_4p._get_other_players()
-    assert [player.name for player in other_players] == ['2', '3', '4']
+@patch('ShallowOceanExpedition.components.board.Player.roll')
+def test_Board_calculate_new_position_random(roll):
+    random = Random(0)
+    for _ in range(3000):
+        n_players = random.randint(2, 6)
+        n_tiles = random.randint(n_players + 1, 60)
+        board = Board([MockStrategy(str(n)) for n in range(n_players)])
+        board.tiles = TileTable([(1,)] * n_tiles, [1] * n_tiles)
+        positions = random.sample(range(1, n_tiles), n_players)
+        for player, position in zip(board.players, positions):
+            player.position = position if random.random() > 0.2 else 0
+        board.current_player.direction = random.choice([1, -1])
+        roll.return_value = random.randint(0, 6)
+        other_positions = [player.position for player in board.players[1:] if player.position > 0]
+        expected = reference_new_position(board.current_player.position,
+                                          board.current_player.direction * roll.return_value,
+                                          other_positions, n_tiles)
+        assert board._calculate_new_position() == expected
+
+
+def test_Board_occupancy(board_4p):
+    assert board_4p.occupancy == {}
+    board_4p.players[0].position = 3
+    board_4p.players[1].position = 5
+    assert board_4p.occupancy == {3: board_4p.players[0], 5: board_4p.players[1]}
+    board_4p.players[0].position = 4
+    board_4p.players[1].kill()
+    assert board_4p.occupancy == {4: board_4p.players[0]}
+    board_4p.players[0].back_home = False
+    board_4p.players[0].reached_home()
+    assert board_4p.occupancy == {}
 
 
 def test_Board_next_player(board_4p):
@@ -544,32 +775,34 @@ def test_Board_kill_players_gather_tiles_none_home(board_4p):
     assert ordered_stacks[0].level == (1,)
     assert ordered_stacks[1].level == (1, 2)
     assert ordered_stacks[2].level == (3,)
+    assert ordered_stacks[1].value == 1 + 2
 
 
 def test_Board_reform_tiles(board):
-    tile1, tile2, tile3 = MockTile(1), MockTile(2), MockTile(3)
+    tile1, tile2, tile3 = Tile((1,), 1), Tile((2,), 2), Tile((3,), 3)
 
     ordered_stacks = [tile1, tile2]
-    board.tiles = [tile3]
+    board.tiles = TileTable([(3,)], [3])
     board._reform_tiles(ordered_stacks)
-    assert board.tiles == [tile3, tile1, tile2]
+    assert [board.tiles[position] for position in range(len(board.tiles))] == [tile3, tile1, tile2]
 
     ordered_stacks = [tile1, tile2]
-    board.tiles = [tile3, BlankTile()]
+    board.tiles = TileTable([(3,), None], [3, 0])
     board._reform_tiles(ordered_stacks)
-    assert board.tiles == [tile3, tile1, tile2]
+    assert [board.tiles[position] for position in range(len(board.tiles))] == [tile3, tile1, tile2]
 
     ordered_stacks = [tile2]
-    board.tiles = [tile3, BlankTile(), tile1]
+    board.tiles = TileTable([(3,), None, (1,)], [3, 0, 1])
     board._reform_tiles(ordered_stacks)
-    assert board.tiles == [tile3, tile1, tile2]
+    assert [board.tiles[position] for position in range(len(board.tiles))] == [tile3, tile1, tile2]
+    assert board.tile_levels == [(3,), (1,), (2,)]
 
     ordered_stacks = []
-    board.tiles = [tile3, BlankTile(), tile1]
+    board.tiles = TileTable([HOME, (3,), None, (1,)], [0, 3, 0, 1])
     board._reform_tiles(ordered_stacks)
-    assert board.tiles == [tile3, tile1]
+    assert board.tiles.levels == [HOME, (3,), (1,)]
 
-    board.tiles = []
+    board.tiles = TileTable([], [])
     with pytest.raises(RoundOver):
         board._reform_tiles([])
 
@@ -632,7 +865,7 @@ def test_Board_summarise_game_states(board, board_4p):
 
     board.round_number = 5
     board.oxygen = 5
-    board.tiles = [tile1, tile2]
+    board.tiles = TileTable([(1,), (2,)], [1, 2])
 
     player_summary, board_summary, other_player_summary = board._summarise_game_states()
 
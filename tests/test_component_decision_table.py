@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from ShallowOceanExpedition.components.batch_board import BatchBoard
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.components.decision_table import DecisionTable, DecisionTableStrategy
+from ShallowOceanExpedition.components.strategy import DefaultStrategy, BatchDefaultStrategy
+
+RULES = [
+    ({'oxygen': (None, 5)}, True),
+    ({'position': (3, 6), 'turn_number': 2}, True),
+    ({'position': (10, None)}, False),
+    ({'turn_number': (4, None)}, True)
+]
+
+
+class MockBatchTurnState:
+    def __init__(self, **features):
+        self.__dict__.update({name: np.array(value) for name, value in features.items()})
+
+
+def test_DecisionTable_compile():
+    table = DecisionTable(RULES)
+    assert table.features == ['oxygen', 'position', 'turn_number']
+    assert table.thresholds == [[6], [3, 7, 10], [2, 3, 4]]
+    assert len(table.table) == 2 * 4 * 4
+    with pytest.raises(ValueError):
+        DecisionTable([({'bank': (1, None)}, True)])
+    for condition in [2.5, None, '3', (1.5, None), (1, 2, 3)]:
+        with pytest.raises(ValueError):
+            DecisionTable([({'position': condition}, True)])
+
+
+def test_DecisionTable_lookup():
+    table = DecisionTable(RULES)
+    for oxygen in range(-2, 12):
+        for position in range(15):
+            for turn_number in range(7):
+                player, board = {'position': position, 'turn_number': turn_number}, {'oxygen': oxygen}
+                if oxygen <= 5:
+                    expected = True
+                elif 3 <= position <= 6 and turn_number == 2:
+                    expected = True
+                elif position >= 10:
+                    expected = False
+                else:
+                    expected = turn_number >= 4
+                assert table.lookup(player, board) == expected
+                state = MockBatchTurnState(position=[position], turn_number=[turn_number], oxygen=[oxygen],
+                                           round_number=[0])
+                assert table.batch_lookup(state).tolist() == [expected]
+
+    assert DecisionTable([]).lookup({}, {}) is False
+    assert DecisionTable([], default=True).batch_lookup(MockBatchTurnState(round_number=[0, 1])).tolist() == [
+        True, True]
+
+
+def test_DecisionTableStrategy_init():
+    with pytest.raises(ValueError):
+        DecisionTableStrategy('test', drop_level='middle')
+    strategy = DecisionTableStrategy('test', rules={'tile_collect': [({'turn_number': (1, None)}, True)]})
+    assert not strategy.decide_direction({'turn_number': 5}, {}, {})
+    assert strategy.tile_collect({'turn_number': 5}, {}, {})
+
+
+def test_DecisionTableStrategy_tile_drop():
+    rules = {'tile_drop': [({'tile_count': (2, None)}, True)]}
+    player = {'tiles': {(3,): 1, (2, 2): 1, (1,): 1}}
+    assert DecisionTableStrategy('test', rules).tile_drop(player, {}, {}) == (True, (1,))
+    assert DecisionTableStrategy('test', rules, drop_level='highest').tile_drop(player, {}, {}) == (True, (2, 2))
+    assert DecisionTableStrategy('test', rules).tile_drop({'tiles': {(1,): 1}}, {}, {}) == (False, None)
+
+    state = MockBatchTurnState(tile_count=[3, 1, 0], tile_levels=[[3, 4, 1], [2, 0, 0], [0, 0, 0]],
+                               round_number=[0, 0, 0])
+    do_drop, slots = DecisionTableStrategy('test', rules).batch_tile_drop(state)
+    assert do_drop.tolist() == [True, False, False]
+    assert slots[0] == 2
+    do_drop, slots = DecisionTableStrategy('test', rules, drop_level='highest').batch_tile_drop(state)
+    assert slots[0] == 1
+
+
+def test_DecisionTableStrategy_matches_DefaultStrategy():
+    def play(strategy_class, seed):
+        board = Board([strategy_class(str(n)) for n in range(2 + seed % 5)], seed=seed)
+        for _ in range(3):
+            board.play_round()
+        return board.get_stats()
+    for seed in range(50):
+        assert play(DecisionTableStrategy, seed) == play(DefaultStrategy, seed)
+
+    def batch_play(strategy_class):
+        board = BatchBoard([strategy_class(str(n)) for n in range(4)], 500, seed=0)
+        board.play_rounds(3)
+        return board.get_stats()
+    assert batch_play(DecisionTableStrategy) == batch_play(BatchDefaultStrategy)
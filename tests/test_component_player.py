@@ -39,7 +39,7 @@ def test_Player_roll_counts(player):
 
 
 def test_Player_roll_counts_with_tiles(player):
-    player.tiles = [(1,), (1,), (1,)]
+    player.tiles = [MockTile(1), MockTile(1), MockTile(1)]
     rolls = []
     for _ in range(100):
         rolls.append(player.roll())
@@ -53,7 +53,7 @@ class MockTile:
 
 
 def test_Player_collect_tile(player):
-    assert player.tiles == []
+    assert player.tiles == ()
 
     player.collect_tile(MockTile(1))
     assert len(player.tiles) == 1
@@ -72,17 +72,49 @@ def test_Player_drop_tile(player):
         player.drop_tile((2,))
 
     assert player.drop_tile((1,)) == tile
-    assert player.tiles == []
+    assert player.tiles == ()
 
     tile1, tile11, tile2 = MockTile(1), MockTile(1), MockTile(2)
     player.tiles = [tile1, tile11, tile2]
 
     assert player.drop_tile((1,)) in [tile1, tile11]
-    assert player.tiles in [[tile1, tile2], [tile11, tile2]]
+    assert player.tiles in [(tile1, tile2), (tile11, tile2)]
+
+
+def test_Player_tile_histogram(player):
+    tile1, tile2, tile11 = MockTile(1), MockTile(2), MockTile(1)
+    summary = player.tile_summary
+    for tile in [tile1, tile2, tile11]:
+        player.collect_tile(tile)
+    assert summary == {(1,): 2, (2,): 1}
+
+    assert list(summary) == [(1,), (2,)]
+    assert player.drop_tile((1,)) is tile1
+    assert player.tiles == (tile2, tile11)
+    assert summary == {(1,): 1, (2,): 1}
+    # levels keep their place while any of their tiles are held
+    assert list(summary) == [(1,), (2,)]
+    assert player.drop_tile((2,)) is tile2
+    assert summary == {(1,): 1}
+    assert player.count_tiles() == 1
+    with pytest.raises(TypeError):
+        summary[(1,)] = 5
+
+    assert player.kill() == (tile11,)
+    assert player.tile_summary == {}
+
+    # dropped levels go to the end when collected again
+    for tile in [tile1, tile2]:
+        player.collect_tile(tile)
+    player.drop_tile((1,))
+    player.collect_tile(tile11)
+    assert list(summary) == [(2,), (1,)]
+    with pytest.raises(AttributeError):
+        player.tiles.append(tile1)
 
 
 def test_Player_count_tiles(player):
-    assert player.tiles == []
+    assert player.tiles == ()
     assert player.count_tiles() == 0
     player.collect_tile(MockTile(1))
     assert player.count_tiles() == 1
@@ -113,9 +145,9 @@ def test_Player_change_direction(player):
     [MockTile(1), MockTile(2)]
 ])
 def test_Player_kill(mock_clear_player, player, tiles):
-    assert player.tiles == []
+    assert player.tiles == ()
     player.tiles = tiles
-    assert player.kill() == tiles
+    assert player.kill() == tuple(tiles)
     assert mock_clear_player.called
 
     player.back_home = True
@@ -125,7 +157,7 @@ def test_Player_kill(mock_clear_player, player, tiles):
 
 def test_Player_clear_player(player):
     bank = player.bank
-    assert player.tiles == []
+    assert player.tiles == ()
     assert player.position == 0
     assert player.direction == 1
     assert player.n_turn == 0
@@ -142,7 +174,7 @@ def test_Player_clear_player(player):
 
     assert player.back_home
 
-    assert player.tiles == []
+    assert player.tiles == ()
     assert player.position == 0
     assert player.direction == 1
     assert player.n_turn == 0
@@ -159,7 +191,7 @@ def test_Player_clear_player(player):
 
     assert not player.back_home
 
-    assert player.tiles == []
+    assert player.tiles == ()
     assert player.position == 0
     assert player.direction == 1
     assert player.n_turn == 0
@@ -167,6 +199,59 @@ def test_Player_clear_player(player):
     assert player.bank == bank
 
 
+def test_Player_reset(player):
+    deaths = player.deaths
+    player.tiles = [MockTile(1), MockTile(2)]
+    tile_summary = player.tile_summary
+    player.position = 10
+    player.direction = -1
+    player.n_turn = 4
+    player.bank = 12
+    player.back_home = True
+    player.deaths.append(True)
+    random_source = object()
+
+    player.reset(random_source)
+
+    assert player.tiles == ()
+    assert (player.position, player.direction, player.n_turn, player.bank) == (0, 1, 0, 0)
+    assert not player.back_home
+    assert player.deaths == [] and deaths == [True]
+    assert player.random_source is random_source
+    # cleared in place, so views of the player still see its tiles
+    assert player.tile_summary is tile_summary
+    player.collect_tile(MockTile(3))
+    assert dict(tile_summary) == {(3,): 1}
+
+
+def test_Player_snapshot(player):
+    player.tiles = [MockTile(1), MockTile(2), MockTile(1)]
+    player.position = 10
+    player.direction = -1
+    player.n_turn = 4
+    player.bank = 3
+    player.deaths.append(True)
+    snapshot = player.snapshot()
+
+    player.drop_tile((1,))
+    player.clear_player()
+    player.bank = 20
+    assert player.snapshot() != snapshot
+
+    player.restore(snapshot)
+    assert player.snapshot() == snapshot
+    assert player.summarise_tiles() == {(1,): 2, (2,): 1}
+    assert player.deaths == [True]
+    player.deaths.append(False)
+    assert snapshot[-1] == (True,)
+
+    # levels stay in the summary's order, not that of the tiles
+    player.drop_tile((1,))
+    snapshot = player.snapshot()
+    player.restore(snapshot)
+    assert list(player.tile_summary) == [(1,), (2,)]
+
+
 def test_Player_reached_home(player):
     assert player.bank == 0
 
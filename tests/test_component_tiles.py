@@ -1,110 +1,98 @@
 import pytest
 
-from ShallowOceanExpedition.components.tiles import Tile, TileStack, Home, BlankTile
+from ShallowOceanExpedition.components.tiles import Tile, TileTable, HOME, stack_tiles
+from ShallowOceanExpedition.rules import RuleSet, DEFAULT_RULES
+from ShallowOceanExpedition.utils.random_source import RandomSource
 
 
-def test_Tile_value_fail():
-    with pytest.raises(ValueError):
-        Tile(0)
-
-    with pytest.raises(ValueError):
-        Tile(5)
-
-
-def test_Tile_value_range():
-    for _ in range(20):
-        tile = Tile(1)
-        assert tile.value in [0, 1, 2, 3, 4]
+@pytest.fixture
+def table():
+    return TileTable.new(DEFAULT_RULES, RandomSource(0))
 
-    for _ in range(20):
-        tile = Tile(2)
-        assert tile.value in [5, 6, 7, 8, 9]
 
-    for _ in range(20):
-        tile = Tile(3)
-        assert tile.value in [10, 11, 12, 13, 14]
-
-    for _ in range(20):
-        tile = Tile(4)
-        assert tile.value in [15, 16, 17, 18, 19]
+def test_TileTable_mismatched_fail():
+    with pytest.raises(ValueError):
+        TileTable([HOME, (1,)], [0])
 
 
-def test_Tile_value_consistent():
-    for level in [1, 2, 3, 4]:
-        for _ in range(20):
-            tile = Tile(level)
-            assert tile._Tile__value is None
-            value = tile.value
-            assert tile._Tile__value is not None
-            assert tile.value == value
+def test_TileTable_new_levels(table):
+    assert table.levels == [HOME] + [(1,)] * 5 + [(2,)] * 5 + [(3,)] * 5 + [(4,)] * 5
+    assert len(table) == 21
+    rules = RuleSet(n_level_1=1, n_level_2=0, n_level_3=2, n_level_4=0)
+    assert TileTable.new(rules, RandomSource(0)).levels == [HOME, (1,), (3,), (3,)]
+    assert TileTable.new(RuleSet(n_level_1=0, n_level_2=0, n_level_3=0, n_level_4=0), RandomSource(0)).levels == [HOME]
 
 
-def test_Tile_level():
-    for level in [1, 2, 3, 4]:
-        tile = Tile(level)
-        assert isinstance(tile.level, tuple)
-        assert tile.level == (level,)
+def test_TileTable_new_value_range():
+    for seed in range(20):
+        table = TileTable.new(DEFAULT_RULES, RandomSource(seed))
+        assert table.values[0] == 0
+        assert set(table.values[1:6]) <= {0, 1, 2, 3, 4}
+        assert set(table.values[6:11]) <= {5, 6, 7, 8, 9}
+        assert set(table.values[11:16]) <= {10, 11, 12, 13, 14}
+        assert set(table.values[16:21]) <= {15, 16, 17, 18, 19}
 
 
-def test_TileStack_empty_fail():
-    with pytest.raises(ValueError):
-        TileStack([])
+def test_TileTable_new_independent_values():
+    values = set()
+    for seed in range(20):
+        table = TileTable.new(DEFAULT_RULES, RandomSource(seed))
+        values.update(len(set(table.values[start:start + 5])) for start in range(1, 21, 5))
+    # tiles of the same level no longer share one value
+    assert max(values) > 1
+    assert TileTable.new(DEFAULT_RULES, RandomSource(3)).values == TileTable.new(DEFAULT_RULES, RandomSource(3)).values
 
 
-class MockTile:
-    def __init__(self, v):
-        self.value = v
-        self.level = (v,)
+def test_TileTable_reset(table):
+    levels, values = table.levels, table.values
+    table.take(3)
+    table.reform([Tile((1, 2), 7)])
+    table.reset(DEFAULT_RULES, RandomSource(5))
+    new_table = TileTable.new(DEFAULT_RULES, RandomSource(5))
+    assert (table.levels, table.values) == (new_table.levels, new_table.values)
+    assert table.levels is levels and table.values is values
 
 
-def test_TileStack():
-    tilestack = TileStack([MockTile(1)])
-    assert tilestack.level == (1,)
-    assert tilestack._TileStack__value is None
-    assert tilestack.value == 1
-    assert tilestack._TileStack__value == tilestack.value
+def test_TileTable_getitem(table):
+    assert table[0] == Tile(HOME, 0)
+    assert table[1] == Tile((1,), table.values[1])
+    assert table[20].level == (4,)
 
-    tilestack = TileStack([MockTile(1), MockTile(2), MockTile(3)])
-    assert tilestack.level == (1, 2, 3)
-    assert tilestack._TileStack__value is None
-    assert tilestack.value == 1 + 2 + 3
-    assert tilestack._TileStack__value == tilestack.value
 
+def test_TileTable_take_put(table):
+    value = table.values[3]
+    assert table.take(3) == Tile((1,), value)
+    assert table.levels[3] is None
+    assert table.values[3] == 0
+    table.put(3, Tile((2, 1), 12))
+    assert table[3] == Tile((2, 1), 12)
 
-class MockMultiTile:
-    def __init__(self, l):
-        self.level = l
-        self.value = sum(l)
 
+def test_TileTable_reform():
+    table = TileTable([HOME, (1,), None, (2,), None], [0, 3, 0, 7, 0])
+    levels = table.levels
+    table.reform([Tile((1, 2), 9), Tile((3,), 11)])
+    assert table.levels == [HOME, (1,), (2,), (1, 2), (3,)]
+    assert table.values == [0, 3, 7, 9, 11]
+    assert table.levels is levels
 
-def test_TileStack_multi():
-    tilestack = TileStack([MockMultiTile((1, 2, 3))])
-    assert tilestack.level == (1, 2, 3)
-    assert tilestack._TileStack__value is None
-    assert tilestack.value == 1 + 2 + 3
-    assert tilestack._TileStack__value == tilestack.value
+    table = TileTable([HOME, None], [0, 0])
+    table.reform([])
+    assert table.levels == [HOME]
+    assert table.values == [0]
 
-    tilestack = TileStack([MockMultiTile((1, 2, 3)), MockTile(1)])
-    assert tilestack.level == (1, 2, 3, 1)
-    assert tilestack._TileStack__value is None
-    assert tilestack.value == 1 + 2 + 3 + 1
-    assert tilestack._TileStack__value == tilestack.value
 
-    tilestack = TileStack([MockMultiTile((1, 2, 3)), MockMultiTile((1, 2, 3))])
-    assert tilestack.level == (1, 2, 3, 1, 2, 3)
-    assert tilestack._TileStack__value is None
-    assert tilestack.value == 1 + 2 + 3 + 1 + 2 + 3
-    assert tilestack._TileStack__value == tilestack.value
+def test_stack_tiles_empty_fail():
+    with pytest.raises(ValueError):
+        stack_tiles([])
 
 
-def test_Home():
-    home = Home()
-    assert home.level == 'Home'
-    assert home.value is None
+def test_stack_tiles():
+    assert stack_tiles([Tile((1,), 1)]) == Tile((1,), 1)
+    assert stack_tiles([Tile((1,), 1), Tile((2,), 2), Tile((3,), 3)]) == Tile((1, 2, 3), 1 + 2 + 3)
 
 
-def test_BlankTile():
-    blank = BlankTile()
-    assert blank.level is None
-    with pytest.raises(ValueError):
-        blank.value
+def test_stack_tiles_multi():
+    assert stack_tiles([Tile((1, 2, 3), 6)]) == Tile((1, 2, 3), 6)
+    assert stack_tiles([Tile((1, 2, 3), 6), Tile((1,), 1)]) == Tile((1, 2, 3, 1), 6 + 1)
+    assert stack_tiles([Tile((1, 2, 3), 6), Tile((1, 2, 3), 6)]) == Tile((1, 2, 3, 1, 2, 3), 6 + 6)
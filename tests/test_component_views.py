@@ -0,0 +1,129 @@
+import pytest
+
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.components.tiles import TileTable, HOME, Tile
+from ShallowOceanExpedition.components.views import SequenceView, state_key
+
+
+class MockStrategy:
+    def __init__(self, name):
+        self.player_name = name
+
+
+class MockTile:
+    def __init__(self, level):
+        self.level = (level,)
+        self.value = level
+
+
+@pytest.fixture
+def board():
+    return Board([MockStrategy('1'), MockStrategy('2'), MockStrategy('3')])
+
+
+def test_views_reused(board):
+    player, board_view, others = board._summarise_game_states()
+    assert board._summarise_game_states() == (player, board_view, others)
+    assert player is board.players[0].view
+    assert list(others) == ['2', '3']
+    assert others['2'] is board.players[1].view
+
+    board._next_player()
+    next_player, next_board_view, next_others = board._summarise_game_states()
+    assert next_player is board.players[1].view
+    assert next_board_view is board_view
+    assert list(next_others) == ['1', '3']
+
+
+def test_views_read_only(board):
+    player, board_view, others = board._summarise_game_states()
+    board.players[0].collect_tile(MockTile(1))
+    with pytest.raises(TypeError):
+        player['position'] = 5
+    with pytest.raises(TypeError):
+        player['tiles'][(1,)] = 5
+    with pytest.raises(TypeError):
+        board_view['tiles'][1] = None
+    with pytest.raises(TypeError):
+        others['2'] = None
+
+
+def test_views_updated(board):
+    player, board_view, others = board._summarise_game_states()
+    assert player['tiles'] == {}
+
+    board.players[0].position = 3
+    board.players[0].direction = -1
+    board.players[0].n_turn = 2
+    board.players[1].bank = 10
+    board.oxygen = 12
+    assert player['position'] == 3
+    assert player['changed_direction']
+    assert player['turn_number'] == 2
+    assert others['2']['bank'] == 10
+    assert board_view['oxygen'] == 12
+
+    board.players[0].collect_tile(MockTile(2))
+    assert player['tiles'] == {(2,): 1}
+    assert player['tiles'] is player['tiles']
+    board.players[0].collect_tile(MockTile(2))
+    assert player['tiles'] == {(2,): 2}
+    board.players[0].drop_tile((2,))
+    assert player['tiles'] == {(2,): 1}
+    board.players[0].tiles = []
+    assert player['tiles'] == {}
+
+    board.tiles.take(3)
+    assert board_view['tiles'][3] is None
+    board.tiles = TileTable([(1,)], [1])
+    assert board_view['tiles'] == [(1,)]
+
+
+def test_SequenceView():
+    items = [1, 2]
+    view = SequenceView(items)
+    assert view == [1, 2]
+    assert view == (1, 2)
+    assert view != [1]
+    assert len(view) == 2
+    items.append(3)
+    assert list(view) == [1, 2, 3]
+    assert view[-1] == 3
+
+
+def test_state_key():
+    def player(tiles, position=3, bank=0):
+        return {'tiles': tiles, 'position': position, 'bank': bank, 'changed_direction': False, 'turn_number': 2}
+
+    board = {'tiles': [HOME, (1,), None, (2, 1)], 'round_number': 1, 'oxygen': 20}
+    key = state_key(player({(1,): 1, (3, 1): 2}), board, {'a': player({}, 5), 'b': player({(2,): 1}, 6, 4)})
+    assert hash(key) == hash(state_key(player({(1,): 1, (3, 1): 2}), dict(board),
+                                       {'a': player({}, 5), 'b': player({(2,): 1}, 6, 4)}))
+
+    # opponents' names, stack order and the order of the tile summary don't matter
+    same_board = dict(board, tiles=[HOME, (1,), None, (1, 2)])
+    assert state_key(player({(1, 3): 2, (1,): 1}), same_board,
+                     {'y': player({(2,): 1}, 6, 4), 'x': player({}, 5)}) == key
+    assert state_key(player({(1, 3): 1, (3, 1): 1, (1,): 1}), board,
+                     {'a': player({}, 5), 'b': player({(2,): 1}, 6, 4)}) == key
+
+    # anything else does
+    for changed in [
+        (player({(1,): 1, (3, 1): 2}, position=4), board, {'a': player({}, 5), 'b': player({(2,): 1}, 6, 4)}),
+        (player({(1,): 1, (3, 1): 2}), dict(board, oxygen=19), {'a': player({}, 5), 'b': player({(2,): 1}, 6, 4)}),
+        (player({(1,): 1, (3, 1): 2}), dict(board, tiles=[HOME, None, (1,), (2, 1)]),
+         {'a': player({}, 5), 'b': player({(2,): 1}, 6, 4)}),
+        (player({(1,): 1, (3, 1): 2}), board, {'a': player({}, 5), 'b': player({(2,): 1}, 6, 3)}),
+    ]:
+        assert state_key(*changed) != key
+
+
+def test_Board_state_key(board):
+    other_board = Board([MockStrategy('x'), MockStrategy('y'), MockStrategy('z')])
+    other_board.tiles = TileTable(list(board.tiles.levels), list(board.tiles.values))
+    assert board.state_key() == other_board.state_key()
+    board.players[0].collect_tile(Tile((2, 1), 5))
+    other_board.players[0].collect_tile(Tile((1, 2), 7))
+    assert board.state_key() == other_board.state_key()
+    other_board.players[0].position = 2
+    assert board.state_key() != other_board.state_key()
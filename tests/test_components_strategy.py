@@ -1,7 +1,8 @@
+import numpy as np
 import pytest
 from pytest import fixture
 
-from ShallowOceanExpedition.components.strategy import DefaultStrategy
+from ShallowOceanExpedition.components.strategy import DefaultStrategy, BatchDefaultStrategy
 from ShallowOceanExpedition.utils.exceptions import RuleViolation
 
 
@@ -204,3 +205,41 @@ def test_DefaultStrategy_tile_drop(strategy):
     do, tile = strategy.tile_drop(player, board, {})
     assert do
     assert tile == (2, 1)
+
+
+class MockBatchTurnState:
+    def __init__(self, **features):
+        self.__dict__.update({name: np.array(value) for name, value in features.items()})
+
+
+def test_BatchDefaultStrategy_matches_DefaultStrategy():
+    strategy = BatchDefaultStrategy('test')
+    for round_number in range(3):
+        for turn_number in range(4):
+            for changed_direction in [False, True]:
+                player = {'turn_number': turn_number, 'changed_direction': changed_direction}
+                board = {'round_number': round_number}
+                state = MockBatchTurnState(round_number=[round_number], turn_number=[turn_number],
+                                           changed_direction=[changed_direction])
+                assert strategy.batch_decide_direction(state).tolist() == [
+                    strategy.decide_direction(player, board, {})]
+                assert strategy.batch_tile_collect(state).tolist() == [strategy.tile_collect(player, board, {})]
+
+    state = MockBatchTurnState(round_number=[3], turn_number=[0], changed_direction=[False])
+    with pytest.raises(RuleViolation):
+        strategy.batch_decide_direction(state)
+    with pytest.raises(RuleViolation):
+        strategy.batch_tile_collect(state)
+
+
+def test_BatchDefaultStrategy_tile_drop():
+    strategy = BatchDefaultStrategy('test')
+    state = MockBatchTurnState(
+        position=[6, 4, 6, 6],
+        oxygen=[5, 5, 11, 5],
+        tile_count=[4, 2, 2, 2],
+        tile_levels=[[3, 2, 4, 3, 0], [3, 2, 0, 0, 0], [3, 2, 0, 0, 0], [3, 3, 0, 0, 0]]
+    )
+    do_drop, slot = strategy.batch_tile_drop(state)
+    assert do_drop.tolist() == [True, False, False, False]
+    assert slot[0] == 1
@@ -1,9 +1,13 @@
 from copy import copy
+from itertools import permutations
 from unittest.mock import MagicMock, call, patch
 
-from pytest import fixture
+from pytest import fixture, raises
 
+from ShallowOceanExpedition.components.strategy import DefaultStrategy
+from ShallowOceanExpedition import scheduler
 from ShallowOceanExpedition.game_manager import GameManager
+from ShallowOceanExpedition.utils.results_store import ResultsStore
 
 
 @fixture
@@ -13,31 +17,252 @@ def game_manager():
     return gm
 
 
+MOCK_GAME_STATS = {
+    'strat1': {'score': 10, 'rank': 1, 'deaths': [False, True]},
+    'strat2': {'score': 0, 'rank': None, 'deaths': [True, True]}
+}
+
+
 @patch('ShallowOceanExpedition.game_manager.GameManager.new_board')
 def test_GameManager_run_n_rounds(mock_board, game_manager):
-    mock_board.get_stats.return_value = 'stat'
+    mock_board.get_stats.return_value = MOCK_GAME_STATS
     game_manager.run_n_rounds(3)
     assert mock_board.play_round.call_args_list == [call()] * 3
     mock_board.get_stats.assert_called()
     mock_board.print_end_game_summary.assert_called()
-    assert game_manager.stats == ['stat']
+    assert game_manager.stats == []
+    assert game_manager.aggregate_wins() == {'strat1': 1, 'strat2': 0}
     assert game_manager.plot_title == 'Time: 3 Rounds'
 
+    game_manager.keep_stats = True
+    game_manager.run_n_rounds(3)
+    assert game_manager.stats == [MOCK_GAME_STATS]
+    assert game_manager.aggregate_wins() == {'strat1': 2, 'strat2': 0}
+
+
+def test_GameManager_accumulators():
+    custom = MagicMock()
+    game_manager = GameManager(MagicMock(), accumulators={'custom': custom})
+    assert set(game_manager.accumulators) == {'wins', 'win_rates', 'ranks', 'scores', 'deaths', 'custom'}
+    game_manager._record(MOCK_GAME_STATS)
+    custom.update.assert_called_with(MOCK_GAME_STATS)
+    assert game_manager.accumulators['ranks'].result() == {'strat1': {1: 1}, 'strat2': {None: 1}}
+
 
 def test_GameManager_run_n_games(game_manager):
-    game_manager.run_n_rounds = MagicMock()
+    game_manager._run_schedule = MagicMock()
     game_manager.run_n_games(10, rounds_per_game=2)
-    assert game_manager.run_n_rounds.call_args_list == [call(2)] * 10
+    game_manager._run_schedule.assert_called_once_with([game_manager.strategies], 10, 2, None, 0)
     assert game_manager.plot_title == 'Time: 10 Games, 2 Rounds Per Game'
 
 
+def test_GameManager_run_n_games_seed():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2')]
+    game_manager = GameManager(strategies, seed=2, keep_stats=True)
+    other_game_manager = GameManager(strategies, seed=2, keep_stats=True)
+    game_manager.run_n_games(5)
+    other_game_manager.run_n_games(5)
+    assert game_manager.stats == other_game_manager.stats
+
+
+def test_GameManager_new_board():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    game_manager = GameManager(strategies, seed=2)
+    board = game_manager.new_board
+    board.play_round()
+    # the same board, set up for a new game
+    assert game_manager.new_board is board
+    assert board.round_number == 0
+    assert board.random_source is game_manager.random_source
+    # a board per seating
+    game_manager.strategies = strategies[::-1]
+    assert game_manager.new_board is not board
+    game_manager.strategies = strategies
+    assert game_manager.new_board is board
+
+
+def test_GameManager_run_n_games_workers():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    game_manager = GameManager(strategies, seed=1, keep_stats=True)
+    game_manager.games_per_unit = 4
+    game_manager.run_n_games(10, workers=2)
+    assert len(game_manager.stats) == 10
+    assert all(set(game_stat) == {'1', '2', '3'} for game_stat in game_manager.stats)
+    assert game_manager.accumulators['scores'].result()['1']['games'] == 10
+
+    # same seed gives the same results whatever the number of workers
+    for workers in (1, 3):
+        other_game_manager = GameManager(strategies, seed=1)
+        other_game_manager.games_per_unit = 4
+        other_game_manager.run_n_games(10, workers=workers)
+        assert other_game_manager.stats == []
+        for name, accumulator in game_manager.accumulators.items():
+            assert other_game_manager.accumulators[name].result() == accumulator.result()
+
+    # and the accumulators match those built from the kept stats
+    wins = {}
+    for game_stat in game_manager.stats:
+        for strategy_name, strategy_stat in game_stat.items():
+            wins[strategy_name] = wins.get(strategy_name, 0) + (strategy_stat['rank'] == 1)
+    assert game_manager.aggregate_wins() == wins
+
+
+def test_GameManager_run_n_games_same_wins_any_workers():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    serial = GameManager(strategies, seed=1, workers=1)
+    serial.run_n_games(300)
+    pooled = GameManager(strategies, seed=1, workers=2)
+    pooled.run_n_games(300)
+    assert serial.aggregate_wins() == pooled.aggregate_wins()
+
+
+def test_GameManager_common_random_numbers():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2')]
+    game_manager = GameManager(list(strategies), seed=4, keep_stats=True, common_random_numbers=True)
+    game_manager.run_n_games_and_rotate_strategies(6, rounds_per_game=2)
+    first_rotation, second_rotation = game_manager.stats[:6], game_manager.stats[6:]
+    # each game is replayed with the seats swapped, the players are identical so they swap results
+    assert [(game_stats['1'], game_stats['2']) for game_stats in first_rotation] == [
+        (game_stats['2'], game_stats['1']) for game_stats in second_rotation]
+    assert first_rotation[0] != first_rotation[1]
+
+    # the same games whatever the number of workers
+    other_game_manager = GameManager(list(strategies), seed=4, keep_stats=True, common_random_numbers=True)
+    other_game_manager.games_per_unit = 4
+    other_game_manager.run_n_games(6, rounds_per_game=2, workers=2)
+    assert other_game_manager.stats == first_rotation
+    other_game_manager.run_n_games(3, rounds_per_game=2, workers=2, first_game=3)
+    assert other_game_manager.stats[6:] == first_rotation[3:]
+
+    assert GameManager(strategies, seed=4).common_seed is None
+
+
+def test_GameManager_results_path(tmp_path):
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2')]
+    game_manager = GameManager(strategies, seed=3, results_path=str(tmp_path / 'serial'))
+    game_manager.run_n_games(5)
+    assert game_manager.results_store.n_games == 5
+    assert game_manager.results_store.aggregate_wins() == game_manager.aggregate_wins()
+
+    game_manager = GameManager(strategies, seed=3, results_path=str(tmp_path / 'pool'))
+    game_manager.games_per_unit = 2
+    game_manager.run_n_games(5, workers=2)
+    assert game_manager.stats == []
+    assert ResultsStore(str(tmp_path / 'pool'), read_only=True).aggregate_wins() == game_manager.aggregate_wins()
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_on_call(function, n_call):
+    calls = []
+
+    def crashing(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == n_call:
+            raise Crash
+        return function(*args, **kwargs)
+    return crashing
+
+
+def assert_same_results(game_manager, other_game_manager):
+    assert game_manager.stats == other_game_manager.stats
+    assert [strategy.player_name for strategy in game_manager.strategies] == \
+        [strategy.player_name for strategy in other_game_manager.strategies]
+    for name, accumulator in game_manager.accumulators.items():
+        assert other_game_manager.accumulators[name].result() == accumulator.result()
+
+
+def test_GameManager_resume_rotations(tmp_path):
+    def new_game_manager(name):
+        game_manager = GameManager([DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')], seed=5,
+                                   keep_stats=True, results_path=str(tmp_path / f'{name}_results'),
+                                   checkpoint_path=str(tmp_path / f'{name}.checkpoint'), checkpoint_every=2)
+        game_manager.games_per_unit = 2
+        return game_manager
+    game_manager = new_game_manager('uninterrupted')
+    game_manager.run_n_games(3, rounds_per_game=2)
+    game_manager.run_n_games_and_rotate_strategies(5, rounds_per_game=2)
+
+    crashed = new_game_manager('crashed')
+    crashed.run_n_games(3, rounds_per_game=2)
+    with patch.object(scheduler, 'play_games', crash_on_call(scheduler.play_games, 7)), raises(Crash):
+        crashed.run_n_games_and_rotate_strategies(5, rounds_per_game=2)
+    resumed = GameManager.resume(str(tmp_path / 'crashed.checkpoint'))
+    assert_same_results(game_manager, resumed)
+    assert resumed.results_store.n_games == game_manager.results_store.n_games == 18
+    assert resumed.results_store.aggregate_wins() == game_manager.results_store.aggregate_wins()
+    assert resumed.plot_title == game_manager.plot_title
+
+    # a finished run has nothing left to do
+    assert_same_results(GameManager.resume(str(tmp_path / 'crashed.checkpoint')), game_manager)
+
+
+def test_GameManager_resume_schedule(tmp_path):
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    game_manager = GameManager(strategies, seed=6, keep_stats=True, common_random_numbers=True)
+    game_manager.games_per_unit = 2
+    game_manager.run_n_games_with_all_strategy_combinations(5, rounds_per_game=2)
+
+    crashed = GameManager(strategies, seed=6, keep_stats=True, common_random_numbers=True,
+                          checkpoint_path=str(tmp_path / 'checkpoint'), checkpoint_every=1)
+    crashed.games_per_unit = 2
+    with patch.object(scheduler, 'play_games', crash_on_call(scheduler.play_games, 6)), raises(Crash):
+        crashed.run_n_games_with_all_strategy_combinations(5, rounds_per_game=2)
+    assert len(crashed.stats) == 9
+    resumed = GameManager.resume(str(tmp_path / 'checkpoint'))
+    assert_same_results(game_manager, resumed)
+    for lineup, accumulators in game_manager.lineup_accumulators.items():
+        assert resumed.lineup_accumulators[lineup]['wins'].result() == accumulators['wins'].result()
+
+
+def test_GameManager_resume_converged(tmp_path):
+    def new_game_manager():
+        game_manager = GameManager([DefaultStrategy('1'), DefaultStrategy('2')], seed=7, keep_stats=True,
+                                   checkpoint_path=str(tmp_path / 'checkpoint'), checkpoint_every=3)
+        game_manager.games_per_unit = 2
+        return game_manager
+    game_manager = new_game_manager()
+    game_manager.run_games_until_converged(precision=0.01, n_games_per_rotation=5, max_games=40,
+                                           rounds_per_game=1)
+
+    crashed = new_game_manager()
+    with patch.object(scheduler, 'play_games', crash_on_call(scheduler.play_games, 14)), raises(Crash):
+        crashed.run_games_until_converged(precision=0.01, n_games_per_rotation=5, max_games=40, rounds_per_game=1)
+    resumed = GameManager.resume(str(tmp_path / 'checkpoint'))
+    assert_same_results(game_manager, resumed)
+    assert len(resumed.stats) == 40
+
+
+def test_GameManager_time_strategies(caplog):
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2')]
+    game_manager = GameManager(strategies, seed=8, common_random_numbers=True, time_strategies=True)
+    game_manager.run_n_games(6, rounds_per_game=2)
+    timings = game_manager.accumulators['timings'].result()
+    assert timings['engine']['turns'] > 0
+    assert timings['strategies']['1']['decide_direction']['calls'] > 0
+
+    # the same calls counted whether the games are played here or in worker processes
+    pooled_game_manager = GameManager(strategies, seed=8, common_random_numbers=True, time_strategies=True)
+    pooled_game_manager.games_per_unit = 2
+    pooled_game_manager.run_n_games(6, rounds_per_game=2, workers=2)
+    pooled_timings = pooled_game_manager.accumulators['timings'].result()
+    assert pooled_timings['engine']['turns'] == timings['engine']['turns']
+    for strategy_name, calls in timings['strategies'].items():
+        for callback, timing in calls.items():
+            assert pooled_timings['strategies'][strategy_name][callback]['calls'] == timing['calls']
+    assert 'Time spent per strategy callback' in caplog.text
+    assert 'timings' not in GameManager(strategies).accumulators
+
+
 class MockGameManager(GameManager):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._simulation_time = 'time'
         self.strategies_used = []
 
-    def run_n_games(self, n, rounds_per_game=3):
+    def run_n_games(self, n, rounds_per_game=3, first_game=0):
         self.strategies_used.append(copy(self.strategies))
 
 
@@ -58,12 +283,76 @@ def test_GameManager_run_n_games_and_rotate_strategies():
     assert game_manager.plot_title == 'Time: Rotated Strategies, 10 Games Per Rotation, 2 Rounds Per Game '
 
 
-# def test_GameManager_run_n_games_and_permute_strategies():
-#     assert False
-#
-#
-# def test_GameManager_run_n_games_with_all_strategy_combinations():
-#     assert False
+def test_GameManager_run_n_games_and_permute_strategies():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')]
+    game_manager = GameManager(strategies, seed=1, keep_stats=True)
+    game_manager._simulation_time = 'time'
+    game_manager.games_per_unit = 2
+    game_manager.run_n_games_and_permute_strategies(3, rounds_per_game=2)
+    assert len(game_manager.stats) == 6 * 3
+    assert set(game_manager.lineup_accumulators) == set(permutations(['1', '2', '3']))
+    for lineup, accumulators in game_manager.lineup_accumulators.items():
+        assert accumulators['scores'].result()[lineup[0]]['games'] == 3
+    assert game_manager.accumulators['scores'].result()['1']['games'] == 18
+    assert game_manager.plot_title == 'Time: Permuted Strategies, 3 Games Per Permutation, 2 Rounds Per Game'
+
+    other_game_manager = GameManager(strategies, seed=1, keep_stats=True, workers=2)
+    other_game_manager.games_per_unit = 2
+    other_game_manager.run_n_games_and_permute_strategies(3, rounds_per_game=2)
+    assert other_game_manager.stats == game_manager.stats
+
+
+def test_GameManager_run_n_games_with_all_strategy_combinations():
+    strategies = [DefaultStrategy(str(n)) for n in range(7)]
+    game_manager = GameManager(strategies, seed=1)
+    game_manager._simulation_time = 'time'
+    game_manager.run_n_games_with_all_strategy_combinations(1, rounds_per_game=1)
+    # 21 pairs + 35 of three + 35 of four + 21 of five + 7 of six
+    assert len(game_manager.lineup_accumulators) == 119
+    assert max(len(lineup) for lineup in game_manager.lineup_accumulators) == 6
+    assert game_manager.accumulators['scores'].result()['0']['games'] == 6 + 15 + 20 + 15 + 6
+    assert game_manager.plot_title == \
+        'Time: All Strategy Combinations, 1 Games Per Combination, 1 Rounds Per Game'
+
+
+class NeverCollectStrategy(DefaultStrategy):
+    @staticmethod
+    def tile_collect(player, board, others):
+        return False
+
+
+def test_GameManager_run_games_until_converged():
+    game_manager = GameManager([DefaultStrategy('1'), NeverCollectStrategy('never')], seed=0)
+    game_manager.run_n_games(10, rounds_per_game=1)
+    report = game_manager.run_games_until_converged(precision=0.01, n_games_per_rotation=10, max_games=1000,
+                                                    rounds_per_game=1)
+    assert report['reason'] == 'separated'
+    assert report['games'] % 20 == 0 and report['games'] < 1000
+    assert report['win_rates']['never']['high'] < report['win_rates']['1']['low']
+    assert game_manager.strategies[0].player_name == '1'
+    assert game_manager.accumulators['win_rates'].counts['1'][1] == report['games'] + 10
+    assert game_manager.plot_title.endswith(f"Rotated Strategies Until Converged, {report['games']} Games, 1 Rounds "
+                                            f"Per Game")
+
+    game_manager = GameManager([DefaultStrategy('1'), DefaultStrategy('2')], seed=0)
+    report = game_manager.run_games_until_converged(precision=0.01, n_games_per_rotation=10, max_games=50)
+    assert (report['reason'], report['games']) == ('budget', 40)
+
+    report = game_manager.run_games_until_converged(precision=0.5, n_games_per_rotation=10, max_games=10)
+    assert (report['reason'], report['games']) == ('precision', 20)
+    assert set(report['win_rates']['1']) == {'rate', 'low', 'high'}
+
+
+def test_GameManager_strategy_combinations_player_limits():
+    strategies = [DefaultStrategy(str(n)) for n in range(5)]
+    game_manager = GameManager(strategies, seed=1, min_players=3, max_players=3)
+    game_manager.run_n_games_with_all_strategy_combinations(1, rounds_per_game=1)
+    assert len(game_manager.lineup_accumulators) == 10
+    assert {len(lineup) for lineup in game_manager.lineup_accumulators} == {3}
+
+    game_manager = GameManager(strategies[:4], seed=1, max_players=3)
+    game_manager.run_n_games_and_permute_strategies(1, rounds_per_game=1)
+    assert len(game_manager.lineup_accumulators) == 4 * 3 * 2
 
 
 def test_GameManager_aggregate_wins(game_manager):
@@ -113,7 +402,8 @@ def test_GameManager_aggregate_wins(game_manager):
             }
         }
     ]
-    game_manager.stats = mock_stats
+    for game_stat in mock_stats:
+        game_manager.accumulators['wins'].update(game_stat)
     wins = game_manager.aggregate_wins()
     assert wins == {
         'strat1': 2,
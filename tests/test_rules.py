@@ -0,0 +1,95 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from ShallowOceanExpedition.components.batch_board import BatchBoard
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.components.strategy import DefaultStrategy, BatchDefaultStrategy
+from ShallowOceanExpedition.components.tiles import HOME
+from ShallowOceanExpedition.game_manager import GameManager
+from ShallowOceanExpedition.rules import RuleSet, DEFAULT_RULES, rules_from
+
+
+def test_RuleSet_compiled():
+    assert DEFAULT_RULES.layout == (HOME,) + ((1,),) * 5 + ((2,),) * 5 + ((3,),) * 5 + ((4,),) * 5
+    assert DEFAULT_RULES.value_lows == (0,) * 5 + (5,) * 5 + (10,) * 5 + (15,) * 5
+    assert DEFAULT_RULES.value_highs == (5,) * 5 + (10,) * 5 + (15,) * 5 + (20,) * 5
+    assert dict(DEFAULT_RULES.roll_distribution) == pytest.approx({2: 1 / 9, 3: 2 / 9, 4: 3 / 9, 5: 2 / 9, 6: 1 / 9})
+    rules = RuleSet(n_level_1=1, n_level_2=0, n_level_3=0, n_level_4=2, value_ranges={
+        1: range(1, 2), 2: range(2, 3), 3: range(3, 4), 4: range(10, 30)}, dice=(2, 4))
+    assert rules.layout == (HOME, (1,), (4,), (4,))
+    assert (rules.value_lows, rules.value_highs) == ((1, 10, 10), (2, 30, 30))
+    assert list(rules.roll_distribution) == [2, 3, 4, 5, 6]
+    assert sum(rules.roll_distribution.values()) == pytest.approx(1)
+
+
+@pytest.mark.parametrize('rules', [
+    {'oxygen': -1}, {'oxygen': 2.5}, {'n_level_2': -1}, {'value_ranges': {1: range(0, 5)}},
+    {'value_ranges': {1: range(0, 5), 2: range(5, 5), 3: range(1, 2), 4: range(1, 2)}}, {'dice': ()},
+    {'dice': (0, 3)}, {'min_players': 1}, {'min_players': 4, 'max_players': 3}
+])
+def test_RuleSet_invalid(rules):
+    with pytest.raises(ValueError):
+        RuleSet(**rules)
+
+
+def test_RuleSet_immutable():
+    with pytest.raises(AttributeError):
+        DEFAULT_RULES.oxygen = 10
+    with pytest.raises(AttributeError):
+        del DEFAULT_RULES.dice
+    with pytest.raises(TypeError):
+        DEFAULT_RULES.value_ranges[1] = range(0, 100)
+    assert DEFAULT_RULES.oxygen == 25
+
+
+def test_RuleSet_equality_and_pickle():
+    rules = RuleSet(oxygen=10, dice=[2, 2])
+    assert rules == RuleSet(oxygen=10, dice=(2, 2))
+    assert rules != DEFAULT_RULES
+    assert len({rules, RuleSet(oxygen=10, dice=(2, 2)), DEFAULT_RULES}) == 2
+    unpickled = pickle.loads(pickle.dumps(rules))
+    assert unpickled == rules and unpickled.layout == rules.layout
+
+
+def test_rules_from():
+    assert rules_from() is DEFAULT_RULES
+    rules = RuleSet(oxygen=10)
+    assert rules_from(rules) is rules
+    assert rules_from(oxygen=10) == rules
+    with pytest.raises(ValueError):
+        rules_from(rules, oxygen=10)
+    # rules used to be preceded by oxygen
+    with pytest.raises(TypeError, match='RuleSet'):
+        rules_from(20)
+
+
+def test_Board_rules():
+    rules = RuleSet(oxygen=12, n_level_1=2, n_level_2=0, n_level_3=0, n_level_4=0, dice=(1,), max_players=3)
+    boards = [Board([DefaultStrategy('1'), DefaultStrategy('2')], rules, seed=seed) for seed in range(3)]
+    assert all(board.rules is rules for board in boards)
+    board = boards[0]
+    assert (board.oxygen, board.tiles.levels) == (12, [HOME, (1,), (1,)])
+    assert board.players[0].roll() == 1
+    assert Board([DefaultStrategy('1'), DefaultStrategy('2')], seed=0, oxygen=12).rules.oxygen == 12
+    with pytest.raises(ValueError):
+        Board([DefaultStrategy(str(n)) for n in range(4)], rules)
+    with pytest.raises(ValueError):
+        Board([DefaultStrategy(str(n)) for n in range(7)])
+
+
+def test_BatchBoard_rules():
+    rules = RuleSet(n_level_1=0, n_level_2=0, n_level_3=3, n_level_4=0, dice=(1,), value_ranges={
+        1: range(0, 1), 2: range(0, 1), 3: range(40, 42), 4: range(0, 1)})
+    board = BatchBoard([BatchDefaultStrategy('1'), BatchDefaultStrategy('2')], 50, rules, seed=0)
+    assert board.tile_levels[:, 1:].tolist() == [[3, 3, 3]] * 50
+    assert set(board.tile_values[:, 1:].ravel()) == {40, 41}
+    assert board._calculate_new_positions(np.arange(50), np.zeros(50, dtype=int)).tolist() == [1] * 50
+
+
+def test_GameManager_rules():
+    game_manager = GameManager([DefaultStrategy('1'), DefaultStrategy('2')], oxygen=10)
+    assert game_manager.rules == RuleSet(oxygen=10)
+    assert game_manager.board_params == {'rules': game_manager.rules}
+    assert game_manager.new_board.rules is game_manager.new_board.rules is game_manager.rules
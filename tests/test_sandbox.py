@@ -0,0 +1,112 @@
+import pickle
+import sys
+from time import sleep, process_time
+
+import pytest
+
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.components.strategy import DefaultStrategy
+from ShallowOceanExpedition.sandbox import SandboxedStrategy, ForfeitStrategy
+
+
+class HangingStrategy(DefaultStrategy):
+    @staticmethod
+    def tile_collect(player, board, others):
+        sleep(10)
+
+
+class BusyStrategy(DefaultStrategy):
+    @staticmethod
+    def decide_direction(player, board, others):
+        start = process_time()
+        while process_time() - start < 0.01:
+            pass
+        return DefaultStrategy.decide_direction(player, board, others)
+
+
+class FailingStrategy(DefaultStrategy):
+    @staticmethod
+    def tile_drop(player, board, others):
+        raise KeyError('tiles')
+
+
+def play(strategies, seed=0, n_rounds=3):
+    board = Board(strategies, seed=seed)
+    for _ in range(n_rounds):
+        board.play_round()
+    return board.get_stats()
+
+
+def test_SandboxedStrategy_same_decisions():
+    sandboxed = SandboxedStrategy(DefaultStrategy('1'), decision_timeout=5)
+    assert play([sandboxed, DefaultStrategy('2')]) == play([DefaultStrategy('1'), DefaultStrategy('2')])
+    assert (sandboxed.timeouts, sandboxed.errors, sandboxed.games_over_budget) == (0, 0, 0)
+    sandboxed.close()
+    assert sandboxed._process is None
+
+
+def test_SandboxedStrategy_timeout():
+    sandboxed = SandboxedStrategy(HangingStrategy('1'), decision_timeout=0.05, cpu_budget=0.12)
+    # times out, falling back to DefaultStrategy, until the timeouts use up the budget
+    assert play([sandboxed, DefaultStrategy('2')], n_rounds=1) == play(
+        [DefaultStrategy('1'), DefaultStrategy('2')], n_rounds=1)
+    assert sandboxed.timeouts == 3
+    assert sandboxed.games_over_budget == 1
+    assert sandboxed._process is None
+
+    # the budget is per game, including games at a reused board
+    board = Board([sandboxed, DefaultStrategy('2')], seed=0)
+    board.play_round()
+    assert (sandboxed.timeouts, sandboxed.games_over_budget) == (6, 2)
+    board.reset()
+    board.play_round()
+    assert sandboxed.games_over_budget == 3
+
+
+def test_SandboxedStrategy_cpu_budget():
+    sandboxed = SandboxedStrategy(BusyStrategy('1'), decision_timeout=5, cpu_budget=0.005,
+                                  fallback=ForfeitStrategy('1'))
+    stats = play([sandboxed, DefaultStrategy('2')], n_rounds=1)
+    assert sandboxed.games_over_budget == 1
+    assert sandboxed.timeouts == 0
+    # forfeited after the first decision, turning back without picking up anything
+    assert stats['1']['score'] == 0
+    sandboxed.close()
+
+
+def test_SandboxedStrategy_errors():
+    sandboxed = SandboxedStrategy(FailingStrategy('1'), decision_timeout=5)
+    assert play([sandboxed, DefaultStrategy('2')]) == play([DefaultStrategy('1'), DefaultStrategy('2')])
+    assert sandboxed.errors > 0
+    sandboxed.close()
+
+
+def test_SandboxedStrategy_pickle():
+    sandboxed = SandboxedStrategy(DefaultStrategy('1'))
+    play([sandboxed, DefaultStrategy('2')], n_rounds=1)
+    assert sandboxed._process is not None
+    copied = pickle.loads(pickle.dumps(sandboxed))
+    assert copied._process is None and copied.player_name == '1'
+    assert play([copied, DefaultStrategy('2')]) == play([DefaultStrategy('1'), DefaultStrategy('2')])
+    copied.close()
+    sandboxed.close()
+
+
+def test_SandboxedStrategy_import_path(tmp_path, monkeypatch):
+    (tmp_path / 'submitted_strategy.py').write_text(
+        'from ShallowOceanExpedition.components.strategy import DefaultStrategy\n\n\n'
+        'class SubmittedStrategy(DefaultStrategy):\n    pass\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    sandboxed = SandboxedStrategy('submitted_strategy:SubmittedStrategy', decision_timeout=5, player_name='1')
+    assert sandboxed._process is not None
+    assert play([sandboxed, DefaultStrategy('2')]) == play([DefaultStrategy('1'), DefaultStrategy('2')])
+    # only imported in the strategy's process
+    assert 'submitted_strategy' not in sys.modules
+    sandboxed.close()
+
+    with pytest.raises(ImportError):
+        SandboxedStrategy('submitted_strategy:NoStrategy', player_name='1')
+    with pytest.raises(ImportError):
+        SandboxedStrategy('ShallowOceanExpedition.components.board:Board', player_name='1')
+    with pytest.raises(ValueError, match='player_name is required'):
+        SandboxedStrategy('submitted_strategy:SubmittedStrategy')
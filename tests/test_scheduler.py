@@ -0,0 +1,74 @@
+from ShallowOceanExpedition.components.strategy import DefaultStrategy
+from ShallowOceanExpedition.scheduler import Scheduler, all_seatings, all_lineups, lineups_including, play_games
+from ShallowOceanExpedition.utils.accumulators import WinCounter
+
+
+def test_all_seatings():
+    assert all_seatings([1, 2, 3]) == [(1, 2, 3), (1, 3, 2), (2, 1, 3), (2, 3, 1), (3, 1, 2), (3, 2, 1)]
+    assert len(all_seatings(list(range(7)))) == 7 * 6 * 5 * 4 * 3 * 2
+    assert all(len(seating) == 6 for seating in all_seatings(list(range(7))))
+    assert len(all_seatings([1, 2, 3], max_players=2)) == 6
+    assert all_seatings([1, 2], min_players=3) == []
+
+
+def test_all_lineups():
+    assert all_lineups([1, 2, 3]) == [(1, 2), (1, 3), (2, 3), (1, 2, 3)]
+    assert len(all_lineups(list(range(8)))) == 28 + 56 + 70 + 56 + 28
+    assert all_lineups([1, 2, 3, 4], max_players=2) == [(1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)]
+    assert all_lineups([1, 2, 3, 4], min_players=3, max_players=3) == [(1, 2, 3), (1, 2, 4), (1, 3, 4), (2, 3, 4)]
+
+
+def test_lineups_including():
+    assert lineups_including(4, (1, 2)) == [(1, 4), (4, 1), (2, 4), (4, 2), (1, 2, 4), (2, 4, 1), (4, 1, 2)]
+    assert lineups_including(1, ()) == []
+    assert all(len(lineup) <= 3 for lineup in lineups_including(9, tuple(range(5)), max_players=3))
+    assert {len(lineup) for lineup in lineups_including(9, tuple(range(5)), min_players=3, max_players=4)} == {3, 4}
+
+
+def test_Scheduler_work_units():
+    scheduler = Scheduler([['a', 'b'], ['b', 'a']], 5, games_per_unit=2, seed=0)
+    assert [(work_unit.lineup_index, work_unit.n_games) for work_unit in scheduler.work_units] == [
+        (0, 2), (0, 2), (0, 1), (1, 2), (1, 2), (1, 1)
+    ]
+    assert scheduler.n_games == 10
+    assert len({work_unit.seed for work_unit in scheduler.work_units}) == 6
+    assert Scheduler([['a', 'b'], ['b', 'a']], 5, games_per_unit=2, seed=0).work_units == scheduler.work_units
+    assert [work_unit.first_game for work_unit in scheduler.work_units] == [0, 2, 4, 0, 2, 4]
+    assert [work_unit.first_game for work_unit in Scheduler([['a']], 3, 2, first_game=10).work_units] == [10, 12]
+
+
+def test_Scheduler_run():
+    one, two, three = DefaultStrategy('1'), DefaultStrategy('2'), DefaultStrategy('3')
+    scheduler = Scheduler([(one, two), (three, two, one)], 3, games_per_unit=2, seed=0)
+    results = list(scheduler.run({}, 2, {'wins': WinCounter()}, keep_stats=True))
+    assert [(lineup, n_games) for lineup, n_games, _, _ in results] == [
+        (('1', '2'), 2), (('1', '2'), 1), (('3', '2', '1'), 2), (('3', '2', '1'), 1)
+    ]
+    for lineup, n_games, accumulators, stats in results:
+        assert len(stats) == n_games
+        assert all(list(game_stats) == list(lineup) for game_stats in stats)
+        assert set(accumulators['wins'].result()) == set(lineup)
+
+    pooled_results = list(scheduler.run({}, 2, {'wins': WinCounter()}, keep_stats=True, workers=2))
+    assert [stats for _, _, _, stats in pooled_results] == [stats for _, _, _, stats in results]
+
+
+def test_play_games():
+    strategies = [DefaultStrategy('1'), DefaultStrategy('2')]
+    accumulators, stats = play_games(strategies, {}, 3, 2, 5, {'wins': WinCounter()}, keep_stats=True)
+    assert len(stats) == 3
+    assert all(len(game_stat['1']['deaths']) == 2 for game_stat in stats)
+    assert set(accumulators['wins'].result()) == {'1', '2'}
+    assert play_games(strategies, {}, 3, 2, 5, {}, keep_stats=True)[1] == stats
+    assert play_games(strategies, {}, 3, 2, 5, {})[1] == []
+
+
+def test_play_games_common_seed():
+    one, two = DefaultStrategy('1'), DefaultStrategy('2')
+    stats = play_games([one, two], {}, 4, 2, 5, {}, keep_stats=True, common_seed=7)[1]
+    # the same games replayed with the seats swapped, the players are identical so they swap results
+    swapped_stats = play_games([two, one], {}, 4, 2, 6, {}, keep_stats=True, common_seed=7)[1]
+    assert [(game_stats['1'], game_stats['2']) for game_stats in stats] == [
+        (game_stats['2'], game_stats['1']) for game_stats in swapped_stats]
+    assert play_games([one, two], {}, 2, 2, 6, {}, keep_stats=True, common_seed=7, first_game=2)[1] == stats[2:]
+    assert play_games([one, two], {}, 4, 2, 5, {}, keep_stats=True)[1] != stats
@@ -0,0 +1,140 @@
+import json
+import threading
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import urlopen, Request
+
+import pytest
+
+from ShallowOceanExpedition.scheduler import Scheduler
+from ShallowOceanExpedition.server import GameServer, load_strategy
+
+DEFAULT_STRATEGY = 'ShallowOceanExpedition.components.strategy:DefaultStrategy'
+
+
+def test_load_strategy():
+    strategy = load_strategy(DEFAULT_STRATEGY, 'a')
+    assert strategy.player_name == 'a'
+    with pytest.raises(TypeError):
+        load_strategy('ShallowOceanExpedition.components.board:Board', 'a')
+    with pytest.raises(AttributeError):
+        load_strategy('ShallowOceanExpedition.components.strategy:NoStrategy', 'a')
+
+
+def test_GameServer_submit(tmp_path):
+    server = GameServer(str(tmp_path), n_games=3, rounds_per_game=1, seed=0)
+    assert server.submit(DEFAULT_STRATEGY, 'a') == [
+        {'name': 'a', 'wins': 0, 'games': 0, 'win_rate': 0.0, 'mean_score': 0.0}
+    ]
+    leaderboard = server.submit(DEFAULT_STRATEGY, 'b')
+    assert {entry['name']: entry['games'] for entry in leaderboard} == {'a': 6, 'b': 6}
+
+    with mock.patch('ShallowOceanExpedition.server.Scheduler', wraps=Scheduler) as scheduler:
+        leaderboard = server.submit(DEFAULT_STRATEGY, 'c')
+    lineups = scheduler.call_args[0][0]
+    assert all('c' in [strategy.player_name for strategy in lineup] for lineup in lineups)
+    assert {entry['name']: entry['games'] for entry in leaderboard} == {'a': 6 + 6 + 9, 'b': 6 + 6 + 9, 'c': 21}
+    assert [entry['win_rate'] for entry in leaderboard] == sorted([entry['win_rate'] for entry in leaderboard],
+                                                                  reverse=True)
+    assert server.results_store.n_games == 6 + 6 + 6 + 9
+    with pytest.raises(ValueError):
+        server.submit(DEFAULT_STRATEGY, 'c')
+
+    restarted_server = GameServer(str(tmp_path), n_games=3, rounds_per_game=1)
+    assert restarted_server.leaderboard() == leaderboard
+    assert restarted_server.results_store.n_games == server.results_store.n_games
+
+
+def test_GameServer_player_limits(tmp_path):
+    server = GameServer(str(tmp_path), n_games=1, rounds_per_game=1, seed=0, min_players=3, max_players=3)
+    server.submit(DEFAULT_STRATEGY, 'a')
+    assert {entry['games'] for entry in server.submit(DEFAULT_STRATEGY, 'b')} == {0}
+    with mock.patch('ShallowOceanExpedition.server.Scheduler', wraps=Scheduler) as scheduler:
+        server.submit(DEFAULT_STRATEGY, 'c')
+    assert {len(lineup) for lineup in scheduler.call_args[0][0]} == {3}
+
+
+def test_GameServer_leaderboard_during_submit(tmp_path):
+    server = GameServer(str(tmp_path), n_games=2, rounds_per_game=1, seed=0)
+    server.submit(DEFAULT_STRATEGY, 'a')
+    leaderboard = server.leaderboard()
+    playing, finish = threading.Event(), threading.Event()
+    play = server._play
+
+    def slow_play(lineups):
+        playing.set()
+        finish.wait(5)
+        return play(lineups)
+
+    with mock.patch.object(server, '_play', slow_play):
+        submission = threading.Thread(target=server.submit, args=(DEFAULT_STRATEGY, 'b'))
+        submission.start()
+        assert playing.wait(5)
+        # not held up by the submission, which only shows once its games are played
+        assert server.leaderboard() == leaderboard
+        finish.set()
+        submission.join(5)
+    assert sorted(entry['name'] for entry in server.leaderboard()) == ['a', 'b']
+
+
+def test_GameServer_failed_submit(tmp_path):
+    server = GameServer(str(tmp_path), n_games=2, rounds_per_game=1, seed=0)
+    server.submit(DEFAULT_STRATEGY, 'a')
+    server.submit(DEFAULT_STRATEGY, 'b')
+    leaderboard = server.leaderboard()
+    n_games = server.results_store.n_games
+    play = server._play
+
+    def failing_play(lineups):
+        play(lineups)
+        raise RuntimeError('strategy failed')
+
+    with mock.patch.object(server, '_play', failing_play), pytest.raises(RuntimeError):
+        server.submit(DEFAULT_STRATEGY, 'c')
+    # the games played before it failed are dropped
+    assert server.results_store.n_games == n_games
+    assert server.leaderboard() == leaderboard
+
+    restarted_server = GameServer(str(tmp_path), n_games=2, rounds_per_game=1)
+    assert restarted_server.leaderboard() == leaderboard
+    assert restarted_server.results_store.n_games == n_games
+    assert restarted_server.results_store.aggregate_wins() == {
+        entry['name']: entry['wins'] for entry in leaderboard}
+
+
+def test_GameServer_sandboxed(tmp_path):
+    server = GameServer(str(tmp_path / 'sandboxed'), n_games=2, rounds_per_game=1, seed=0, sandboxed=True,
+                        decision_timeout=5)
+    server.submit(DEFAULT_STRATEGY, 'a')
+    leaderboard = server.submit(DEFAULT_STRATEGY, 'b')
+    assert all(type(strategy).__name__ == 'SandboxedStrategy' for strategy in server.strategies.values())
+    with pytest.raises(ImportError):
+        server.submit('ShallowOceanExpedition.components.strategy:NoStrategy', 'c')
+    assert 'c' not in server.strategies
+
+    unsandboxed_server = GameServer(str(tmp_path / 'unsandboxed'), n_games=2, rounds_per_game=1, seed=0)
+    unsandboxed_server.submit(DEFAULT_STRATEGY, 'a')
+    assert unsandboxed_server.submit(DEFAULT_STRATEGY, 'b') == leaderboard
+
+
+def test_GameServer_http(tmp_path):
+    http_server = GameServer(str(tmp_path), n_games=2, rounds_per_game=1).make_http_server(port=0)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{http_server.server_port}'
+    try:
+        for name in ['a', 'b']:
+            body = json.dumps({'name': name, 'strategy': DEFAULT_STRATEGY}).encode()
+            request = Request(f'{url}/strategies', data=body)
+            with urlopen(request) as response:
+                assert response.status == 201
+        with urlopen(f'{url}/leaderboard') as response:
+            assert {entry['name']: entry['games'] for entry in json.load(response)} == {'a': 4, 'b': 4}
+        with pytest.raises(HTTPError) as error:
+            urlopen(Request(f'{url}/strategies', data=json.dumps({'name': 'a'}).encode()))
+        assert error.value.code == 400
+        with pytest.raises(HTTPError) as error:
+            urlopen(f'{url}/nothing')
+        assert error.value.code == 404
+    finally:
+        http_server.shutdown()
+        http_server.server_close()
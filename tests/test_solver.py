@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.components.decision_table import DecisionTableStrategy
+from ShallowOceanExpedition.components.strategy import DefaultStrategy
+from ShallowOceanExpedition.rules import RuleSet
+from ShallowOceanExpedition.solver import solve
+
+SMALL_RULES = RuleSet(oxygen=6, n_level_1=2, n_level_2=1, n_level_3=1, n_level_4=1)
+
+
+@pytest.fixture
+def strategies():
+    return [DefaultStrategy('1'), DecisionTableStrategy('2', drop_level='highest')]
+
+
+def test_solve_distributions(strategies):
+    result = solve(strategies, rules=SMALL_RULES)
+    assert set(result) == {'1', '2'}
+    for player_result in result.values():
+        assert sum(player_result['scores'].values()) == pytest.approx(1)
+        assert player_result['score'] == pytest.approx(
+            sum(score * probability for score, probability in player_result['scores'].items()))
+        assert len(player_result['deaths']) == 3
+        assert all(0 <= probability <= 1 for probability in player_result['deaths'] + [player_result['win']])
+
+
+def test_solve_no_oxygen(strategies):
+    result = solve(strategies, rules=RuleSet(oxygen=0))
+    for player_result in result.values():
+        assert player_result['scores'] == {0: 1.0}
+        assert player_result['win'] == 0
+        assert player_result['deaths'] == [1.0, 1.0, 1.0]
+    assert solve(strategies, rounds_per_game=0)['1']['deaths'] == []
+
+
+def test_solve_players():
+    with pytest.raises(ValueError):
+        solve([DefaultStrategy('1')])
+
+
+def test_solve_matches_monte_carlo(strategies):
+    exact = solve(strategies, rules=SMALL_RULES)
+    n_games = 4000
+    scores = {'1': [], '2': []}
+    wins = {'1': 0, '2': 0}
+    deaths = {'1': np.zeros(3), '2': np.zeros(3)}
+    board = Board(strategies, rules=SMALL_RULES, seed=0)
+    for n_game in range(n_games):
+        if n_game:
+            board.reset()
+        for _ in range(3):
+            board.play_round()
+        for name, stats in board.get_stats().items():
+            scores[name].append(stats['score'])
+            wins[name] += stats['rank'] == 1
+            deaths[name] += stats['deaths']
+    for name in scores:
+        player_scores = np.array(scores[name])
+        assert abs(player_scores.mean() - exact[name]['score']) < 4 * player_scores.std() / np.sqrt(n_games)
+        win_rate = wins[name] / n_games
+        assert abs(win_rate - exact[name]['win']) < 4 * np.sqrt(win_rate * (1 - win_rate) / n_games)
+        for death_rate, exact_death_rate in zip(deaths[name] / n_games, exact[name]['deaths']):
+            standard_error = np.sqrt(exact_death_rate * (1 - exact_death_rate) / n_games)
+            assert abs(death_rate - exact_death_rate) < 4 * standard_error + 1e-3
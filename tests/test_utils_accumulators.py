@@ -0,0 +1,90 @@
+from statistics import mean, variance
+
+import pytest
+
+from ShallowOceanExpedition.utils.accumulators import WinCounter, RankHistogram, ScoreMoments, DeathsPerRound, \
+    WinRates, default_accumulators, wilson_interval
+
+GAME_STATS = [
+    {'a': {'score': 10, 'rank': 1, 'deaths': [False, True]}, 'b': {'score': 0, 'rank': None, 'deaths': [True, True]}},
+    {'a': {'score': 5, 'rank': 2, 'deaths': [True, False]}, 'b': {'score': 7, 'rank': 1, 'deaths': [False, True]}},
+    {'a': {'score': 3, 'rank': 1, 'deaths': [True, True, False]}, 'b': {'score': 0, 'rank': None,
+                                                                        'deaths': [True, True, True]}},
+]
+
+
+def accumulate(accumulator, game_stats):
+    for game_stat in game_stats:
+        accumulator.update(game_stat)
+    return accumulator
+
+
+@pytest.mark.parametrize('accumulator_type', [WinCounter, RankHistogram, ScoreMoments, DeathsPerRound,
+                                              WinRates])
+def test_Accumulator_merge(accumulator_type):
+    merged = accumulate(accumulator_type(), GAME_STATS[:1])
+    merged.merge(accumulate(accumulator_type(), GAME_STATS[1:]))
+    merged.merge(accumulator_type())
+    expected = accumulate(accumulator_type(), GAME_STATS).result()
+    assert_results_equal(merged.result(), expected)
+
+    empty = accumulator_type()
+    empty.merge(accumulate(accumulator_type(), GAME_STATS))
+    assert_results_equal(empty.result(), expected)
+
+
+def assert_results_equal(result, expected):
+    assert result.keys() == expected.keys()
+    for strategy_name, strategy_result in result.items():
+        if isinstance(strategy_result, dict):
+            assert strategy_result == {key: pytest.approx(value) for key, value in expected[strategy_name].items()}
+        else:
+            assert strategy_result == pytest.approx(expected[strategy_name])
+
+
+def test_WinCounter():
+    assert accumulate(WinCounter(), GAME_STATS).result() == {'a': 2, 'b': 1}
+
+
+def test_RankHistogram():
+    assert accumulate(RankHistogram(), GAME_STATS).result() == {'a': {1: 2, 2: 1}, 'b': {None: 2, 1: 1}}
+
+
+def test_ScoreMoments():
+    result = accumulate(ScoreMoments(), GAME_STATS).result()
+    assert result['a']['games'] == 3
+    assert result['a']['mean'] == pytest.approx(mean([10, 5, 3]))
+    assert result['a']['variance'] == pytest.approx(variance([10, 5, 3]))
+    assert accumulate(ScoreMoments(), GAME_STATS[:1]).result()['a']['variance'] == 0
+
+
+def test_DeathsPerRound():
+    result = accumulate(DeathsPerRound(), GAME_STATS).result()
+    assert result['a'] == pytest.approx([2 / 3, 2 / 3, 0])
+    assert result['b'] == pytest.approx([2 / 3, 1, 1 / 3])
+
+
+def test_WinRates():
+    win_rates = accumulate(WinRates(), GAME_STATS)
+    assert win_rates.result() == {'a': 2 / 3, 'b': 1 / 3}
+    assert win_rates.intervals() == {'a': wilson_interval(2, 3), 'b': wilson_interval(1, 3)}
+
+    earlier = accumulate(WinRates(), GAME_STATS[:1])
+    assert win_rates.since(earlier).result() == {'a': 1 / 2, 'b': 1 / 2}
+    assert win_rates.since(win_rates).result() == {}
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(50, 100)
+    assert (low + high) / 2 == pytest.approx(0.5)
+    assert (low, high) == pytest.approx((0.4038, 0.5962), abs=1e-4)
+    low, high = wilson_interval(0, 10)
+    assert low == 0.0 and 0 < high < 0.35
+    assert wilson_interval(500, 1000)[1] - wilson_interval(500, 1000)[0] < high - low
+
+
+def test_default_accumulators():
+    accumulators = default_accumulators()
+    assert set(accumulators) == {'wins', 'win_rates', 'ranks', 'scores', 'deaths'}
+    assert accumulators['wins'].empty_copy() is not accumulators['wins']
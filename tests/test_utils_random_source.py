@@ -0,0 +1,66 @@
+from ShallowOceanExpedition.utils.random_source import RandomSource, game_random_source
+
+
+def test_RandomSource_roll():
+    random_source = RandomSource(seed=0, chunk_size=10)
+    rolls = [random_source.roll() for _ in range(100)]
+    assert set(rolls) == {2, 3, 4, 5, 6}
+
+
+def test_RandomSource_roll_dice():
+    random_source = RandomSource(seed=0, chunk_size=10)
+    assert set(random_source.roll((1, 1, 1)) for _ in range(20)) == {3}
+    assert set(random_source.roll((6,)) for _ in range(100)) == {1, 2, 3, 4, 5, 6}
+    assert set(random_source.roll() for _ in range(100)) == {2, 3, 4, 5, 6}
+
+
+def test_RandomSource_integers():
+    random_source = RandomSource(seed=0, chunk_size=10)
+    assert random_source.integers([], []) == []
+    integers = random_source.integers([5] * 100, [10] * 100)
+    assert set(integers) == {5, 6, 7, 8, 9}
+
+
+def test_RandomSource_reproducible():
+    random_source, other_random_source = RandomSource(seed=1, chunk_size=7), RandomSource(seed=1, chunk_size=7)
+    assert [random_source.roll() for _ in range(20)] == [other_random_source.roll() for _ in range(20)]
+    assert random_source.integers([0] * 20, [3] * 20) == other_random_source.integers([0] * 20, [3] * 20)
+
+    assert [RandomSource(seed=2).roll() for _ in range(20)] != [random_source.roll() for _ in range(20)]
+
+
+def test_RandomSource_streams_independent():
+    random_source, other_random_source = RandomSource(seed=3), RandomSource(seed=3)
+    for _ in range(50):
+        random_source.roll()
+    assert random_source.integers([0] * 20, [100] * 20) == other_random_source.integers([0] * 20, [100] * 20)
+
+
+def test_RandomSource_snapshot():
+    random_source = RandomSource(seed=4, chunk_size=8)
+    random_source.roll()
+    random_source.integers([0], [3])
+    snapshot = random_source.snapshot()
+
+    def draws():
+        # enough to draw new chunks, with the dice changing part way
+        return ([random_source.roll() for _ in range(20)], [random_source.roll((6,)) for _ in range(5)],
+                random_source.integers([0, 5], [5, 10]))
+
+    expected = draws()
+    random_source.restore(snapshot)
+    assert draws() == expected
+    random_source.restore(snapshot)
+    assert draws() == expected
+    other_random_source = RandomSource(seed=5, chunk_size=8)
+    other_random_source.restore(snapshot)
+    random_source = other_random_source
+    assert draws() == expected
+
+
+def test_game_random_source():
+    def draws(random_source):
+        return [random_source.roll() for _ in range(20)], random_source.integers([0] * 20, [100] * 20)
+    assert draws(game_random_source(4, 0)) == draws(game_random_source(4, 0))
+    assert draws(game_random_source(4, 0)) != draws(game_random_source(4, 1))
+    assert draws(game_random_source(4, 0)) != draws(game_random_source(5, 0))
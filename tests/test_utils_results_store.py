@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from ShallowOceanExpedition.utils.results_store import ResultsStore
+
+GAME_STATS = [
+    {'a': {'score': 10, 'rank': 1, 'deaths': [False, True]}, 'b': {'score': 0, 'rank': None, 'deaths': [True, True]}},
+    {'b': {'score': 7, 'rank': 1, 'deaths': [False, True]}, 'a': {'score': 5, 'rank': 2, 'deaths': [True, False]}},
+    {'a': {'score': 3, 'rank': 1, 'deaths': [True, True, False]}, 'c': {'score': 0, 'rank': None,
+                                                                        'deaths': [True, True, True]}},
+]
+
+
+def test_ResultsStore_append_and_read(tmp_path):
+    with ResultsStore(str(tmp_path), buffer_size=2) as store:
+        for game_stats in GAME_STATS:
+            store.append(game_stats)
+        # only the first block has been written
+        assert store.n_games == 2
+        assert store.column('game').tolist() == [0, 0, 1, 1]
+
+    store = ResultsStore(str(tmp_path))
+    assert store.strategies == ['a', 'b', 'c']
+    assert store.n_games == 3
+    assert store.column('game').tolist() == [0, 0, 1, 1, 2, 2]
+    assert store.column('seat').tolist() == [0, 1, 0, 1, 0, 1]
+    assert store.column('strategy').tolist() == [0, 1, 1, 0, 0, 2]
+    assert store.column('score').tolist() == [10, 0, 7, 5, 3, 0]
+    assert store.column('rank').tolist() == [1, 0, 1, 2, 1, 0]
+    assert store.column('deaths').tolist() == [0b10, 0b11, 0b10, 0b01, 0b011, 0b111]
+    assert store.column('n_rounds').tolist() == [2, 2, 2, 2, 3, 3]
+    assert isinstance(store.column('score'), np.memmap)
+
+
+def test_ResultsStore_reopen_appends(tmp_path):
+    with ResultsStore(str(tmp_path)) as store:
+        store.append(GAME_STATS[0])
+    with ResultsStore(str(tmp_path)) as store:
+        store.append(GAME_STATS[2])
+    store = ResultsStore(str(tmp_path))
+    assert store.column('game').tolist() == [0, 0, 1, 1]
+    assert store.strategies == ['a', 'b', 'c']
+
+
+def test_ResultsStore_truncates_incomplete_block(tmp_path):
+    with ResultsStore(str(tmp_path)) as store:
+        store.append(GAME_STATS[0])
+    with open(str(tmp_path / 'score.bin'), 'ab') as column_file:
+        column_file.write(b'\x01\x02')
+    store = ResultsStore(str(tmp_path))
+    assert (tmp_path / 'score.bin').stat().st_size == 2 * 4
+    assert store.column('score').tolist() == [10, 0]
+
+
+def test_ResultsStore_aggregate_wins(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    assert store.aggregate_wins() == {}
+    for game_stats in GAME_STATS:
+        store.append(game_stats)
+    store.flush()
+    assert store.aggregate_wins(chunk_size=4) == {'a': 2, 'b': 1, 'c': 0}
+    assert [len(chunk) for chunk, in store.iter_chunks('game', chunk_size=4)] == [4, 2]
+
+
+def test_ResultsStore_mark_and_rewind(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append(GAME_STATS[0])
+    mark = store.mark()
+    assert mark == (1, 2, 2)
+    store.append(GAME_STATS[2])
+    store.flush()
+    store.append(GAME_STATS[1])
+    store.rewind(mark)
+    assert (store.n_games, store.strategies) == (1, ['a', 'b'])
+    store.append(GAME_STATS[1])
+    store.flush()
+    store = ResultsStore(str(tmp_path))
+    assert store.column('game').tolist() == [0, 0, 1, 1]
+    assert store.column('score').tolist() == [10, 0, 7, 5]
+
+
+def test_ResultsStore_read_only(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ResultsStore(str(tmp_path / 'missing'), read_only=True)
+    assert not (tmp_path / 'missing').exists()
+
+    with ResultsStore(str(tmp_path)) as store:
+        store.append(GAME_STATS[0])
+    with open(str(tmp_path / 'score.bin'), 'ab') as column_file:
+        column_file.write(b'\x01\x02')
+    store = ResultsStore(str(tmp_path), read_only=True)
+    # a block still being written is left alone
+    assert (tmp_path / 'score.bin').stat().st_size == 2 * 4 + 2
+    assert store.column('score').tolist() == [10, 0]
+    assert store.aggregate_wins() == {'a': 1, 'b': 0}
+    with pytest.raises(ValueError):
+        store.append(GAME_STATS[1])
+    with pytest.raises(ValueError):
+        store.rewind((0, 0, 0))
+
+
+def test_ResultsStore_max_rounds(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append({'a': {'score': 0, 'rank': None, 'deaths': [True] * 32}})
+    store.flush()
+    assert store.column('deaths').tolist() == [2 ** 32 - 1]
+    with pytest.raises(ValueError):
+        store.append({'a': {'score': 0, 'rank': None, 'deaths': [True] * 33}})
@@ -0,0 +1,60 @@
+from time import sleep
+
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.components.strategy import DefaultStrategy, CALLBACKS
+from ShallowOceanExpedition.utils.timings import CallTimings
+
+
+class SlowStrategy(DefaultStrategy):
+    @staticmethod
+    def tile_collect(player, board, others):
+        sleep(0.001)
+        return DefaultStrategy.tile_collect(player, board, others)
+
+
+def play(timings=None):
+    board = Board([DefaultStrategy('fast'), SlowStrategy('slow')], seed=0, timings=timings)
+    n_turns = 0
+    for _ in range(3):
+        while not board._take_turn():
+            n_turns += 1
+        n_turns += 1
+        board._end_round()
+    return board.get_stats(), n_turns
+
+
+def test_CallTimings_board():
+    timings = CallTimings()
+    stats, n_turns = play(timings)
+    assert (stats, n_turns) == play()
+
+    result = timings.result()
+    assert result['engine']['turns'] == n_turns
+    assert set(result['strategies']) == {'fast', 'slow'}
+    for strategy_name in ('fast', 'slow'):
+        assert set(result['strategies'][strategy_name]) == set(CALLBACKS)
+    slow_collect = result['strategies']['slow']['tile_collect']
+    assert slow_collect['calls'] > 0
+    assert slow_collect['seconds'] >= 0.001 * slow_collect['calls']
+    assert result['strategies']['fast']['tile_collect']['seconds'] < slow_collect['seconds']
+    # callback time is not counted as engine time
+    assert result['engine']['seconds'] < slow_collect['seconds']
+    n_decisions = sum(callback['calls'] for calls in result['strategies'].values() for callback in calls.values())
+    assert n_decisions > n_turns
+
+
+def test_CallTimings_merge():
+    timings, other_timings = CallTimings(), CallTimings()
+    play(timings)
+    play(other_timings)
+    merged = timings.empty_copy()
+    merged.merge(timings)
+    merged.merge(other_timings)
+    result, other_result = timings.result(), merged.result()
+    assert other_result['engine']['turns'] == 2 * result['engine']['turns']
+    assert other_result['strategies']['slow']['tile_drop']['calls'] == \
+        2 * result['strategies']['slow']['tile_drop']['calls']
+
+    report = merged.report().splitlines()
+    assert len(report) == 1 + 2 * len(CALLBACKS) + 1
+    assert report[-1].split()[:3] == ['(engine)', '_take_turn', str(other_result['engine']['turns'])]
@@ -0,0 +1,73 @@
+import pytest
+
+from ShallowOceanExpedition.components.board import Board
+from ShallowOceanExpedition.components.strategy import DefaultStrategy
+from ShallowOceanExpedition.components.views import state_key
+from ShallowOceanExpedition.utils.transpositions import TranspositionCache
+
+
+def test_TranspositionCache_get_put():
+    cache = TranspositionCache(max_size=2)
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    cache.put('b', None)
+    assert cache.get('a') == 1
+    assert cache.get('b', 'default') is None
+    assert 'a' in cache and len(cache) == 2
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'size': 2, 'evictions': 0}
+
+    # evicts the least recently used
+    cache.get('a')
+    cache.put('c', 3)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    cache.put('a', 4)
+    cache.put('d', 5)
+    assert 'c' not in cache and cache.get('a') == 4
+    assert cache.evictions == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    with pytest.raises(ValueError):
+        TranspositionCache(max_size=0)
+    assert TranspositionCache().hit_rate == 0
+
+
+def test_TranspositionCache_lookup():
+    cache = TranspositionCache()
+    evaluations = []
+
+    def evaluate():
+        evaluations.append(1)
+        return None
+
+    assert cache.lookup('a', evaluate) is None
+    assert cache.lookup('a', evaluate) is None
+    assert len(evaluations) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+class CachedStrategy(DefaultStrategy):
+    def __init__(self, player_name, cache):
+        super().__init__(player_name)
+        self.cache = cache
+
+    def decide_direction(self, player, board, others):
+        return self.cache.lookup(('direction', state_key(player, board, others)),
+                                 lambda: DefaultStrategy.decide_direction(player, board, others))
+
+
+def test_TranspositionCache_strategy():
+    cache = TranspositionCache(max_size=1000)
+    board = Board([CachedStrategy('1', cache), DefaultStrategy('2')], seed=0)
+    other_board = Board([DefaultStrategy('1'), DefaultStrategy('2')], seed=0)
+    for n_game in range(20):
+        if n_game:
+            board.reset()
+            other_board.reset()
+        for _ in range(3):
+            board.play_round()
+            other_board.play_round()
+        assert board.get_stats() == other_board.get_stats()
+    # early turns repeat across games
+    assert cache.hits > 0
+    assert len(cache) <= 1000